@@ -0,0 +1,131 @@
+"""
+Бенчмарк профиля API-воркеров (API_PROFILE): процессорное время и память на запрос
+с полным набором middleware/приложений и в облегчённом профиле.
+
+Запросы идут через WSGI-приложение в процессе (как у воркера gunicorn). Каждый профиль
+запускается в отдельном процессе: сначала --requests запросов для замера CPU (time.process_time),
+затем столько же под tracemalloc — пик выделенной за запрос памяти. RSS процесса — после загрузки
+Django и после всех запросов. Кэш списков не очищается: замеряются накладные расходы фреймворка.
+Запуск из корня репозитория (нужна БД из DATABASE_URL с номерами, см. benchmarks/datagen.py):
+    python benchmarks/api_profile.py --requests 2000
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+PROFILES = {
+    "полный": {"API_PROFILE": "False"},
+    "API_PROFILE": {"API_PROFILE": "True"},
+}
+
+URLS = ["/rooms/list/?limit=50", "/rooms/stats/", "/metrics"]
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_requests(requests: int, urls: list[str]) -> dict:
+    """Замеры профиля (выполняется в дочернем процессе)."""
+    sys.path.insert(0, str(SRC))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.config.settings")
+    os.environ.setdefault("METRICS_TOKEN", "benchmark")
+
+    from core.wsgi import application
+
+    startup_rss = max_rss_mb()
+
+    def start_response(status, headers):
+        assert status.startswith("200"), status
+
+    def request(url: str) -> None:
+        path, _, query = url.partition("?")
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "HTTP_HOST": "localhost",
+            "HTTP_ACCEPT": "application/json",
+            "HTTP_AUTHORIZATION": f"Bearer {os.environ['METRICS_TOKEN']}",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": sys.stderr,
+        }
+        response = application(environ, start_response)
+        for _ in response:
+            pass
+        response.close()
+
+    for url in urls * 10:  # прогрев: кэш списков, соединение с БД
+        request(url)
+
+    cpu = {url: [] for url in urls}
+    for i in range(requests):
+        url = urls[i % len(urls)]
+        started = time.process_time()
+        request(url)
+        cpu[url].append((time.process_time() - started) * 1_000_000)
+
+    memory = {url: [] for url in urls}
+    tracemalloc.start()
+    for i in range(requests):
+        url = urls[i % len(urls)]
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        request(url)
+        memory[url].append((tracemalloc.get_traced_memory()[1] - before) / 1024)
+    tracemalloc.stop()
+
+    return {
+        "startup_rss_mb": startup_rss,
+        "rss_mb": max_rss_mb(),
+        "cpu_us": {url: statistics.median(values) for url, values in cpu.items()},
+        "peak_kb": {url: statistics.median(values) for url, values in memory.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="запросов в каждом профиле")
+    parser.add_argument("--urls", nargs="+", default=URLS, help="пути запросов (по кругу)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_requests(args.requests, args.urls)))
+        return
+
+    results = {}
+    for name, env in PROFILES.items():
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", "--requests", str(args.requests), "--urls", *args.urls],
+            env={**os.environ, "DEBUG": "False", **env},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results[name] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{'':36}" + "".join(f"{name:>16}" for name in results))
+    for url in args.urls:
+        print(f"{'CPU, мкс ' + url:36}" + "".join(f"{result['cpu_us'][url]:16.0f}" for result in results.values()))
+        print(f"{'память, КБ ' + url:36}" + "".join(f"{result['peak_kb'][url]:16.1f}" for result in results.values()))
+    print(f"{'RSS после загрузки, МБ':36}" + "".join(f"{r['startup_rss_mb']:16.1f}" for r in results.values()))
+    print(f"{'RSS после запросов, МБ':36}" + "".join(f"{r['rss_mb']:16.1f}" for r in results.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Микробенчмарки сериализаторов: ModelSerializer + JSONRenderer, быстрый путь
+(FastSerializer + json_dumps) и проверка входных данных на создание.
+
+Запуск из корня репозитория (нужны pytest-benchmark и БД из DATABASE_URL):
+    pytest -c benchmarks/pytest.ini benchmarks -k serializer --benchmark-json=bench.json
+"""
+
+from datetime import timedelta
+
+import pytest
+from conftest import BENCH_TODAY
+from rest_framework.renderers import JSONRenderer
+
+from bookings.models import Booking
+from bookings.serializers import (
+    BookingBulkCreateSerializer,
+    BookingCreateSerializer,
+    BookingFastSerializer,
+    BookingSerializer,
+)
+from core.renderers import json_dumps
+from rooms.models import Room
+from rooms.serializers import RoomCreateSerializer, RoomFastSerializer, RoomSerializer
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def rooms(dataset):
+    return Room.objects.order_by("-created_at", "-id")
+
+
+@pytest.fixture
+def room_bookings(busiest_room):
+    return Booking.objects.filter(room_id=busiest_room).order_by("date_start", "id")
+
+
+@pytest.mark.benchmark(group="serializers: rooms/list")
+class TestRoomListSerializers:
+    def test_model_serializer(self, benchmark, rooms):
+        benchmark(lambda: JSONRenderer().render(RoomSerializer(list(rooms), many=True).data))
+
+    def test_fast_serializer(self, benchmark, rooms):
+        benchmark(lambda: json_dumps(RoomFastSerializer.serialize(rooms)))
+
+
+@pytest.mark.benchmark(group="serializers: bookings/list")
+class TestBookingListSerializers:
+    def test_model_serializer(self, benchmark, room_bookings):
+        benchmark(lambda: JSONRenderer().render(BookingSerializer(list(room_bookings), many=True).data))
+
+    def test_fast_serializer(self, benchmark, room_bookings):
+        benchmark(lambda: json_dumps(BookingFastSerializer.serialize(room_bookings)))
+
+
+@pytest.mark.benchmark(group="serializers: create")
+class TestCreateSerializers:
+    def test_room_create(self, benchmark):
+        def validate():
+            serializer = RoomCreateSerializer(data={"description": "Бенчмарк", "price": "5000.00"})
+            assert serializer.is_valid()
+
+        benchmark(validate)
+
+    def test_booking_create(self, benchmark, dataset):
+        data = {"room": dataset.room_ids[0], "date_start": BENCH_TODAY, "date_end": BENCH_TODAY + timedelta(days=2)}
+
+        def validate():
+            serializer = BookingCreateSerializer(data=data)
+            assert serializer.is_valid()
+
+        benchmark(validate)
+
+    def test_booking_bulk_create(self, benchmark, dataset):
+        data = [
+            {"room": room_id, "date_start": BENCH_TODAY, "date_end": BENCH_TODAY + timedelta(days=2)}
+            for room_id in dataset.room_ids[:1000]
+        ]
+
+        def validate():
+            serializer = BookingBulkCreateSerializer(data=data, many=True)
+            assert serializer.is_valid()
+
+        benchmark(validate)
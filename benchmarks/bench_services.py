@@ -0,0 +1,110 @@
+"""
+Микробенчмарки методов RoomService и BookingService на данных datagen.
+
+Запуск из корня репозитория (нужны pytest-benchmark и БД из DATABASE_URL):
+    pytest -c benchmarks/pytest.ini benchmarks --benchmark-json=bench.json
+"""
+
+from datetime import timedelta
+
+import pytest
+from conftest import BENCH_TODAY
+
+from bookings.models import Booking
+from bookings.services import BookingService
+from rooms import transfer
+from rooms.models import Room
+from rooms.services import ROOM_ORDERINGS, RoomService
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = pytest.mark.django_db
+
+PAGE_SIZE = 50
+
+
+@pytest.mark.benchmark(group="rooms")
+class TestRoomService:
+    def test_create_room(self, benchmark, dataset):
+        benchmark(RoomService.create_room, description="Бенчмарк", price=5000)
+
+    def test_delete_room(self, benchmark, dataset):
+        def setup():
+            room = Room.objects.create(description="Бенчмарк", price=5000)
+            return (room.id,), {}
+
+        benchmark.pedantic(RoomService.delete_room, setup=setup, rounds=200)
+
+    @pytest.mark.parametrize("sort_by", [None, *ROOM_ORDERINGS])
+    def test_get_rooms(self, benchmark, dataset, sort_by):
+        rooms = benchmark(RoomService.get_rooms, sort_by)
+        assert len(rooms) >= len(dataset.room_ids)
+
+    @pytest.mark.parametrize("sort_by", ["price_asc", "date_desc"])
+    def test_get_rooms_page(self, benchmark, dataset, sort_by):
+        cursor = RoomService.get_rooms_page(sort_by, None, PAGE_SIZE).next_cursor
+        page = benchmark(RoomService.get_rooms_page, sort_by, cursor, PAGE_SIZE)
+        assert len(page.items) == PAGE_SIZE
+
+    def test_get_available_rooms_page(self, benchmark, dataset):
+        # Неделя в разгар сезона: большинство броней окна данных приходится на лето
+        date_start = BENCH_TODAY.replace(month=7, day=10)
+
+        def search():
+            return RoomService.get_available_rooms_page(
+                date_start, date_start + timedelta(days=7), price_max=10_000, sort_by="price_asc", limit=PAGE_SIZE
+            )
+
+        assert benchmark(search).items
+
+    def test_import_rooms(self, benchmark, dataset):
+        rows = [{"description": f"Импорт {i}", "price": str(1000 + i)} for i in range(1000)]
+        result = benchmark(RoomService.import_rooms, rows)
+        assert result.created == len(rows)
+
+    def test_export_rooms_csv(self, benchmark, dataset):
+        def export():
+            return sum(len(chunk) for chunk in transfer.export_csv())
+
+        assert benchmark(export)
+
+
+@pytest.mark.benchmark(group="bookings")
+class TestBookingService:
+    def test_create_booking(self, benchmark, dataset, free_dates):
+        room_id = dataset.room_ids[0]
+
+        def setup():
+            return (room_id, *next(free_dates)), {}
+
+        benchmark.pedantic(BookingService.create_booking, setup=setup, rounds=500)
+
+    def test_create_bookings(self, benchmark, dataset, free_dates):
+        # Пакет из 100 броней: по одной на номер
+        room_ids = dataset.room_ids[:100]
+
+        def setup():
+            date_start, date_end = next(free_dates)
+            items = [{"room": room_id, "date_start": date_start, "date_end": date_end} for room_id in room_ids]
+            return (items,), {}
+
+        benchmark.pedantic(BookingService.create_bookings, setup=setup, rounds=50)
+
+    def test_delete_booking(self, benchmark, dataset, free_dates):
+        room_id = dataset.room_ids[0]
+
+        def setup():
+            date_start, date_end = next(free_dates)
+            booking = Booking.objects.create(room_id=room_id, date_start=date_start, date_end=date_end)
+            return (booking.id,), {}
+
+        benchmark.pedantic(BookingService.delete_booking, setup=setup, rounds=200)
+
+    def test_get_room_bookings(self, benchmark, busiest_room):
+        assert benchmark(BookingService.get_room_bookings, busiest_room)
+
+    def test_get_room_bookings_page(self, benchmark, busiest_room):
+        assert benchmark(BookingService.get_room_bookings_page, busiest_room, None, PAGE_SIZE).items
+
+    def test_get_room_bookings_version(self, benchmark, busiest_room):
+        benchmark(BookingService.get_room_bookings_version, busiest_room)
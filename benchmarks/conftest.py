@@ -0,0 +1,51 @@
+import os
+from datetime import date, timedelta
+
+import datagen
+import pytest
+from django.core.cache import cache
+
+# Размер данных для микробенчмарков (переопределяется переменными окружения)
+BENCH_ROOMS = int(os.environ.get("BENCH_ROOMS", 2000))
+BENCH_BOOKINGS = int(os.environ.get("BENCH_BOOKINGS", 50_000))
+BENCH_SEED = int(os.environ.get("BENCH_SEED", 42))
+
+# Опорная дата данных фиксирована, чтобы результаты разных дней были сравнимы
+BENCH_TODAY = date(2026, 1, 15)
+
+
+@pytest.fixture(scope="session")
+def dataset(django_db_setup, django_db_blocker):
+    """Номера и брони из datagen, один раз на сессию в тестовой БД."""
+    with django_db_blocker.unblock():
+        return datagen.seed(BENCH_ROOMS, BENCH_BOOKINGS, BENCH_SEED, BENCH_TODAY)
+
+
+@pytest.fixture
+def busiest_room(dataset):
+    """Номер с наибольшим числом броней (худший случай для bookings/list)."""
+    from django.db.models import Count
+
+    from rooms.models import Room
+
+    return Room.objects.annotate(n=Count("bookings")).order_by("-n", "id").values_list("id", flat=True).first()
+
+
+@pytest.fixture
+def free_dates():
+    """Генератор непересекающихся периодов далеко за окном данных (для бенчмарков записи)."""
+
+    def periods():
+        start = BENCH_TODAY + timedelta(days=datagen.WINDOW_FUTURE_DAYS + 30)
+        while True:
+            yield start, start + timedelta(days=1)
+            start += timedelta(days=1)
+
+    return periods()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,126 @@
+"""
+Бенчмарк соединений с БД: задержка GET rooms/list/ (p50/p99) без постоянных соединений,
+с постоянными соединениями (CONN_MAX_AGE) и с пулом psycopg 3 (если установлен psycopg[pool]).
+
+Запросы идут через WSGI-приложение в процессе, поэтому Django, как под gunicorn, закрывает
+или переиспользует соединение в конце каждого запроса. Кэш списка очищается перед каждым
+запросом (вне замера), чтобы ответ строился из БД.
+
+Каждый режим запускается в отдельном процессе с нужными переменными окружения.
+Запуск из корня репозитория (нужна БД из DATABASE_URL):
+    python benchmarks/connections.py --requests 2000 --seed 200
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from importlib.util import find_spec
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+MODES = {
+    "без постоянных соединений": {"DB_CONN_MAX_AGE": "0", "DB_POOL": "False"},
+    "CONN_MAX_AGE=60": {"DB_CONN_MAX_AGE": "60", "DB_POOL": "False"},
+    "пул psycopg 3": {"DB_POOL": "True"},
+}
+
+
+def run_requests(requests: int, url: str) -> list[float]:
+    """Задержки запросов в миллисекундах (выполняется в дочернем процессе)."""
+    sys.path.insert(0, str(SRC))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.config.settings")
+
+    from django.core.cache import cache
+
+    from core.wsgi import application
+
+    def start_response(status, headers):
+        assert status.startswith("200"), status
+
+    host = os.environ.get("BENCH_HOST", "localhost")
+    path, _, query = url.partition("?")
+    latencies = []
+    for i in range(requests + 10):
+        cache.clear()
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SERVER_NAME": host,
+            "SERVER_PORT": "80",
+            "HTTP_HOST": host,
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": sys.stderr,
+        }
+        started = time.perf_counter()
+        response = application(environ, start_response)
+        for _ in response:
+            pass
+        response.close()  # request_finished: закрытие или возврат соединения
+        if i >= 10:  # первые запросы — прогрев
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def seed(rooms: int) -> list[int]:
+    sys.path.insert(0, str(SRC))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.config.settings")
+    import django
+
+    django.setup()
+    from rooms.models import Room
+
+    created = Room.objects.bulk_create(Room(description=f"Бенчмарк {i}", price=1000 + i) for i in range(rooms))
+    return [room.id for room in created]
+
+
+def cleanup(room_ids: list[int]) -> None:
+    from rooms.models import Room
+
+    Room.objects.filter(id__in=room_ids).delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="запросов в каждом режиме")
+    parser.add_argument("--url", default="/rooms/list/?limit=50", help="путь запроса")
+    parser.add_argument("--seed", type=int, default=0, help="создать столько номеров на время замера")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_requests(args.requests, args.url)))
+        return
+
+    room_ids = seed(args.seed) if args.seed else []
+    try:
+        print(f"GET {args.url}, {args.requests} запросов в режиме")
+        for name, env in MODES.items():
+            if env.get("DB_POOL") == "True" and find_spec("psycopg_pool") is None:
+                print(f"{name:28} пропущен: не установлен psycopg[pool]")
+                continue
+
+            output = subprocess.run(
+                [sys.executable, __file__, "--worker", "--requests", str(args.requests), "--url", args.url],
+                env={**os.environ, **env},
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            latencies = json.loads(output.strip().splitlines()[-1])
+            percentiles = statistics.quantiles(latencies, n=100)
+            print(f"{name:28} p50: {percentiles[49]:7.2f} мс  p99: {percentiles[98]:7.2f} мс")
+    finally:
+        if room_ids:
+            cleanup(room_ids)
+
+
+if __name__ == "__main__":
+    main()
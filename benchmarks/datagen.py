@@ -0,0 +1,181 @@
+"""
+Генератор данных для бенчмарков: N номеров и M броней с реалистичным распределением.
+
+Номера: категории с разной ценой (логнормальный разброс вокруг базовой цены категории),
+описание из Faker (ru_RU), дата добавления — за последние два года.
+Брони: популярность номера тем выше, чем ниже цена; даты заезда — в окне от полугода назад
+до года вперёд с летним пиком и пиком на выходные; длительность — чаще 1-3 ночи, реже неделя
+и больше. Брони одного номера не пересекаются (как требует ограничение БД).
+
+Одинаковые --seed и --today дают одинаковые данные. Запись идёт через COPY FROM STDIN.
+Запуск из корня репозитория (данные пишутся в БД из DATABASE_URL):
+    python benchmarks/datagen.py --rooms 2000 --bookings 50000 --seed 42
+"""
+
+import argparse
+import csv
+import io
+import math
+import os
+import random
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.config.settings")
+
+# Категория номера: (название, базовая цена за ночь, доля номеров)
+ROOM_CATEGORIES = [
+    ("Эконом", 2500, 0.25),
+    ("Стандарт", 4000, 0.40),
+    ("Комфорт", 6500, 0.20),
+    ("Полулюкс", 10000, 0.10),
+    ("Люкс", 18000, 0.05),
+]
+
+# Длительность брони в ночах и её вероятность
+STAY_NIGHTS = [(1, 0.22), (2, 0.22), (3, 0.17), (4, 0.11), (5, 0.08), (7, 0.10), (10, 0.05), (14, 0.05)]
+
+# Окно дат заезда относительно --today
+WINDOW_PAST_DAYS = 180
+WINDOW_FUTURE_DAYS = 365
+
+
+@dataclass
+class Dataset:
+    """Созданные данные: id номеров (в порядке создания) и количество броней."""
+
+    room_ids: list[int]
+    bookings: int
+
+
+def generate_rooms(count: int, rng: random.Random, fake, today: date) -> list[tuple[str, float, datetime]]:
+    """Строки номеров: (описание, цена, дата добавления)."""
+    names, prices, weights = zip(*ROOM_CATEGORIES, strict=False)
+    added_since = datetime.combine(today, time(), tzinfo=timezone.utc) - timedelta(days=730)
+    rooms = []
+    for category in rng.choices(range(len(names)), weights=weights, k=count):
+        price = round(prices[category] * rng.lognormvariate(0, 0.2), -1)
+        beds = rng.choice(["одна двуспальная кровать", "две односпальные кровати", "двуспальная кровать и диван"])
+        description = f"{names[category]}, {beds}. {fake.sentence(nb_words=8)}"
+        rooms.append((description, price, added_since + timedelta(seconds=rng.randrange(730 * 86400))))
+    return rooms
+
+
+def day_weight(day: date) -> float:
+    """Относительная вероятность заезда в этот день: летний пик и пятница-суббота."""
+    season = 1 + 0.6 * math.exp(-(((day.timetuple().tm_yday - 196) / 45) ** 2))
+    return season * (1.4 if day.weekday() in (4, 5) else 1.0)
+
+
+def generate_bookings(
+    rooms: list[tuple[int, float]], count: int, rng: random.Random, today: date
+) -> list[tuple[int, date, date]]:
+    """Непересекающиеся брони номеров: (room_id, date_start, date_end).
+
+    rooms — пары (id, цена). Броней может получиться меньше count, если номеру
+    досталось больше броней, чем дней в окне.
+    """
+    window_start = today - timedelta(days=WINDOW_PAST_DAYS)
+    days = [window_start + timedelta(days=i) for i in range(WINDOW_PAST_DAYS + WINDOW_FUTURE_DAYS)]
+    weights = [day_weight(day) for day in days]
+    nights, nights_weights = zip(*STAY_NIGHTS, strict=False)
+
+    per_room = [0] * len(rooms)
+    for index in rng.choices(range(len(rooms)), weights=[1 / price for _, price in rooms], k=count):
+        per_room[index] += 1
+
+    bookings = []
+    for (room_id, _), room_count in zip(rooms, per_room, strict=False):
+        if not room_count:
+            continue
+        # Взвешенная выборка дней заезда без повторений (Efraimidis-Spirakis): k наибольших u^(1/w)
+        keys = sorted(range(len(days)), key=lambda i: rng.random() ** (1 / weights[i]), reverse=True)
+        starts = sorted(days[i] for i in keys[:room_count])
+        for date_start, next_start in zip(starts, [*starts[1:], None], strict=False):
+            date_end = date_start + timedelta(days=rng.choices(nights, weights=nights_weights)[0])
+            if next_start is not None and date_end > next_start:
+                date_end = next_start  # гость уезжает к заезду следующего
+            bookings.append((room_id, date_start, date_end))
+    return bookings
+
+
+def copy_rows(table: str, columns: list[str], rows) -> None:
+    from django.db import connection
+
+    from core.db import copy_from
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        copy_from(cursor, f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def seed(rooms: int, bookings: int, seed: int = 42, today: date | None = None) -> Dataset:
+    """Создаёт rooms номеров и до bookings броней (Django должен быть настроен)."""
+    from django.db import transaction
+    from faker import Faker
+
+    from bookings.models import Booking
+    from rooms.models import Room
+
+    rng = random.Random(seed)
+    fake = Faker("ru_RU")
+    fake.seed_instance(seed)
+    today = today or date.today()
+
+    with transaction.atomic():
+        last_id = Room.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        room_rows = generate_rooms(rooms, rng, fake, today)
+        copy_rows(Room._meta.db_table, ["description", "price", "created_at"], room_rows)
+        room_ids = list(Room.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True))
+
+        booking_rows = generate_bookings(
+            [(room_id, price) for room_id, (_, price, _) in zip(room_ids, room_rows, strict=False)],
+            bookings,
+            rng,
+            today,
+        )
+        # Бронь создана за 0-60 дней до заезда, но не позже сегодняшнего дня
+        now = datetime.combine(today, time(12), tzinfo=timezone.utc)
+        copy_rows(
+            Booking._meta.db_table,
+            ["room_id", "date_start", "date_end", "created_at"],
+            (
+                (
+                    room_id,
+                    date_start,
+                    date_end,
+                    min(now, datetime.combine(date_start, time(12), tzinfo=timezone.utc))
+                    - timedelta(days=rng.randrange(60), seconds=rng.randrange(86400)),
+                )
+                for room_id, date_start, date_end in booking_rows
+            ),
+        )
+    return Dataset(room_ids=room_ids, bookings=len(booking_rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=2000, help="количество номеров")
+    parser.add_argument("--bookings", type=int, default=50_000, help="количество броней")
+    parser.add_argument("--seed", type=int, default=42, help="зерно генератора")
+    parser.add_argument("--today", type=date.fromisoformat, default=None, help="опорная дата (по умолчанию сегодня)")
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+
+    dataset = seed(args.rooms, args.bookings, args.seed, args.today)
+    print(
+        f"Создано номеров: {len(dataset.room_ids)} (id {dataset.room_ids[0]}-{dataset.room_ids[-1]}), "
+        f"броней: {dataset.bookings}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""
+HTTP-профиль нагрузки на запущенный сервер: смесь чтений и записи по шести основным эндпоинтам.
+
+N клиентов (asyncio, keep-alive, без сторонних библиотек) в течение --duration секунд выполняют
+операции профиля PROFILE с заданными весами. Для каждой операции считаются запросы в секунду,
+коды ответов, ошибки (5xx и сетевые) и задержка p50/p90/p99. Ответ 400 на пересечение
+броней — ожидаемый исход, а не ошибка. Созданные за прогон брони и номера удаляются в конце.
+
+Результат пишется в JSON вместе с хешем коммита; два результата сравниваются --compare.
+Данные для сервера готовит benchmarks/datagen.py. Запуск из корня репозитория:
+    python benchmarks/datagen.py --rooms 2000 --bookings 50000
+    python benchmarks/load.py --url http://localhost:8000 --duration 60 --concurrency 32 --output before.json
+    python benchmarks/load.py --compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+# Режимы сортировки rooms/list
+SORT_MODES = ["price_asc", "price_desc", "date_asc", "date_desc"]
+
+
+class HTTPConnection:
+    """Одно keep-alive соединение HTTP/1.1 (переоткрывается после Connection: close и ошибок)."""
+
+    def __init__(self, base_url: str):
+        url = urlsplit(base_url)
+        if url.scheme != "http":
+            raise ValueError("Поддерживается только http://")
+        self.host, self.port = url.hostname, url.port or 80
+        self.host_header = url.netloc
+        self.prefix = url.path.rstrip("/")
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, body=None) -> tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            return await self._request(method, path, body)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _request(self, method: str, path: str, body) -> tuple[int, bytes]:
+        payload = b"" if body is None else json.dumps(body).encode()
+        head = f"{method} {self.prefix}{path} HTTP/1.1\r\nHost: {self.host_header}\r\nAccept: application/json\r\n"
+        if body is not None:
+            head += "Content-Type: application/json\r\n"
+        self.writer.write(f"{head}Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Сервер закрыл соединение")
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            content = bytearray()
+            while size := int((await self.reader.readline()).split(b";")[0], 16):
+                content += await self.reader.readexactly(size)
+                await self.reader.readline()
+            await self.reader.readline()
+        elif "content-length" in headers:
+            content = await self.reader.readexactly(int(headers["content-length"]))
+        elif status in (204, 304) or method == "HEAD":
+            content = b""
+        else:
+            content, keep_alive = await self.reader.read(), False  # тело до закрытия соединения
+
+        if not keep_alive:
+            self.close()
+        return status, bytes(content)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+@dataclass
+class State:
+    """Общие данные клиентов: номера сервера и объекты, созданные за прогон."""
+
+    room_ids: list[int]
+    created_rooms: list[int] = field(default_factory=list)
+    created_bookings: list[int] = field(default_factory=list)
+    all_created_rooms: list[int] = field(default_factory=list)
+    all_created_bookings: list[int] = field(default_factory=list)
+
+
+def random_period(rng: random.Random, today: date) -> tuple[str, str]:
+    date_start = today + timedelta(days=rng.randint(1, 365))
+    return date_start.isoformat(), (date_start + timedelta(days=rng.choice([1, 1, 2, 2, 3, 4, 7]))).isoformat()
+
+
+async def list_rooms_page(conn, rng, state, today):
+    return (await conn.request("GET", f"/rooms/list/?sort_by={rng.choice(SORT_MODES)}&limit=50"))[0]
+
+
+async def list_rooms_full(conn, rng, state, today):
+    return (await conn.request("GET", f"/rooms/list/?sort_by={rng.choice(SORT_MODES)}"))[0]
+
+
+async def list_room_bookings(conn, rng, state, today):
+    return (await conn.request("GET", f"/bookings/list/{rng.choice(state.room_ids)}/"))[0]
+
+
+async def create_booking(conn, rng, state, today):
+    date_start, date_end = random_period(rng, today)
+    status, content = await conn.request(
+        "POST",
+        "/bookings/create/",
+        {"room": rng.choice(state.room_ids), "date_start": date_start, "date_end": date_end},
+    )
+    if status == 201:
+        booking_id = json.loads(content)["booking_id"]
+        state.created_bookings.append(booking_id)
+        state.all_created_bookings.append(booking_id)
+    return status
+
+
+async def delete_booking(conn, rng, state, today):
+    if not state.created_bookings:
+        return await create_booking(conn, rng, state, today)
+    booking_id = state.created_bookings.pop(rng.randrange(len(state.created_bookings)))
+    return (await conn.request("DELETE", f"/bookings/delete/{booking_id}/"))[0]
+
+
+async def create_room(conn, rng, state, today):
+    status, content = await conn.request(
+        "POST", "/rooms/create/", {"description": "Нагрузочный тест", "price": str(rng.randint(20, 200) * 100)}
+    )
+    if status == 201:
+        room_id = json.loads(content)["room_id"]
+        state.created_rooms.append(room_id)
+        state.all_created_rooms.append(room_id)
+    return status
+
+
+async def delete_room(conn, rng, state, today):
+    if not state.created_rooms:
+        return await create_room(conn, rng, state, today)
+    return (await conn.request("DELETE", f"/rooms/delete/{state.created_rooms.pop()}/"))[0]
+
+
+# Операция профиля: (вес, функция). Чтения — около 70% запросов
+PROFILE = {
+    "GET rooms/list (страница)": (30, list_rooms_page),
+    "GET rooms/list (весь список)": (5, list_rooms_full),
+    "GET bookings/list": (35, list_room_bookings),
+    "POST bookings/create": (18, create_booking),
+    "DELETE bookings/delete": (8, delete_booking),
+    "POST rooms/create": (2, create_room),
+    "DELETE rooms/delete": (2, delete_room),
+}
+
+
+@dataclass
+class Stats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+
+async def client(base_url: str, rng: random.Random, state: State, stats, started: float, warmup: float, until: float):
+    conn = HTTPConnection(base_url)
+    names = list(PROFILE)
+    weights = [weight for weight, _ in PROFILE.values()]
+    today = date.today()
+    try:
+        while (now := time.perf_counter()) < until:
+            name = rng.choices(names, weights=weights)[0]
+            try:
+                status = await PROFILE[name][1](conn, rng, state, today)
+            except (OSError, ValueError, asyncio.IncompleteReadError):
+                status = None
+            if now - started < warmup:
+                continue
+            result = stats[name]
+            result.latencies.append((time.perf_counter() - now) * 1000)
+            result.statuses[str(status)] += 1
+            if status is None or status >= 500:
+                result.errors += 1
+    finally:
+        conn.close()
+
+
+def summarize(stats: dict[str, Stats], seconds: float) -> dict:
+    results = {}
+    for name, result in sorted(stats.items()):
+        percentiles = statistics.quantiles(result.latencies, n=100) if len(result.latencies) > 1 else [0.0] * 99
+        results[name] = {
+            "requests": len(result.latencies),
+            "rps": round(len(result.latencies) / seconds, 2),
+            "errors": result.errors,
+            "statuses": dict(sorted(result.statuses.items())),
+            "latency_ms": {
+                "mean": round(statistics.fmean(result.latencies), 3) if result.latencies else 0.0,
+                "p50": round(percentiles[49], 3),
+                "p90": round(percentiles[89], 3),
+                "p99": round(percentiles[98], 3),
+                "max": round(max(result.latencies, default=0.0), 3),
+            },
+        }
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def cleanup(base_url: str, state: State) -> None:
+    """Удаляет брони и номера, созданные за прогон (вне замера)."""
+    conn = HTTPConnection(base_url)
+    try:
+        for booking_id in state.all_created_bookings:
+            await conn.request("DELETE", f"/bookings/delete/{booking_id}/")
+        for room_id in state.all_created_rooms:
+            await conn.request("DELETE", f"/rooms/delete/{room_id}/")
+    finally:
+        conn.close()
+
+
+async def run(args) -> dict:
+    conn = HTTPConnection(args.url)
+    try:
+        status, content = await conn.request("GET", "/rooms/list/?sort_by=date_asc")
+    finally:
+        conn.close()
+    if status != 200:
+        raise SystemExit(f"GET rooms/list/ вернул {status}")
+    room_ids = [room["id"] for room in json.loads(content)]
+    if not room_ids:
+        raise SystemExit("На сервере нет номеров: подготовьте данные benchmarks/datagen.py")
+
+    state = State(room_ids=room_ids)
+    stats = defaultdict(Stats)
+    started = time.perf_counter()
+    until = started + args.warmup + args.duration
+    try:
+        await asyncio.gather(
+            *(
+                client(args.url, random.Random(args.seed + i), state, stats, started, args.warmup, until)
+                for i in range(args.concurrency)
+            )
+        )
+    finally:
+        if not args.keep:
+            await cleanup(args.url, state)
+
+    results = summarize(stats, args.duration)
+    requests = sum(result["requests"] for result in results.values())
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "url": args.url,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "rooms": len(room_ids),
+            "profile": {name: weight for name, (weight, _) in PROFILE.items()},
+        },
+        "total": {
+            "requests": requests,
+            "rps": round(requests / args.duration, 2),
+            "errors": sum(result["errors"] for result in results.values()),
+        },
+        "results": results,
+    }
+
+
+def print_results(report: dict) -> None:
+    print(f"{'операция':30} {'req/s':>9} {'p50, мс':>9} {'p90, мс':>9} {'p99, мс':>9} {'ошибок':>7}  коды")
+    for name, result in report["results"].items():
+        latency = result["latency_ms"]
+        statuses = " ".join(f"{code}:{n}" for code, n in result["statuses"].items())
+        print(
+            f"{name:30} {result['rps']:9.1f} {latency['p50']:9.2f} {latency['p90']:9.2f} {latency['p99']:9.2f} "
+            f"{result['errors']:7}  {statuses}"
+        )
+    total = report["total"]
+    print(f"{'всего':30} {total['rps']:9.1f} {'':29} {total['errors']:7}")
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """Изменение req/s и задержек между двумя результатами (в процентах)."""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    def change(old: float, new: float) -> str:
+        return f"{(new - old) / old * 100:+7.1f}%" if old else "       —"
+
+    print(f"до: {before.get('commit')}  после: {after.get('commit')}")
+    print(f"{'операция':30} {'req/s':>9} {'p50':>9} {'p99':>9}")
+    for name, new in after["results"].items():
+        old = before["results"].get(name)
+        if old is None:
+            continue
+        print(
+            f"{name:30} {change(old['rps'], new['rps']):>9} "
+            f"{change(old['latency_ms']['p50'], new['latency_ms']['p50']):>9} "
+            f"{change(old['latency_ms']['p99'], new['latency_ms']['p99']):>9}"
+        )
+    print(f"{'всего':30} {change(before['total']['rps'], after['total']['rps']):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="адрес сервера (префикс пути допускается)")
+    parser.add_argument("--duration", type=float, default=60.0, help="длительность замера, с")
+    parser.add_argument("--warmup", type=float, default=5.0, help="прогрев перед замером, с")
+    parser.add_argument("--concurrency", type=int, default=32, help="количество одновременных клиентов")
+    parser.add_argument("--seed", type=int, default=42, help="зерно генератора операций")
+    parser.add_argument("--output", help="файл JSON с результатами")
+    parser.add_argument("--keep", action="store_true", help="не удалять созданные за прогон брони и номера")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="сравнить два файла результатов")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = asyncio.run(run(args))
+    print_results(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Результаты записаны в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
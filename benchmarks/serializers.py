@@ -0,0 +1,100 @@
+"""
+Бенчмарк сериализации списков: ModelSerializer + JSONRenderer против быстрого пути
+(FastSerializer из values_list() + json_dumps).
+
+Тестовые данные создаются в транзакции, которая откатывается в конце.
+Запуск из корня репозитория (нужна БД из DATABASE_URL):
+    python benchmarks/serializers.py --rows 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from bookings.models import Booking  # noqa: E402
+from bookings.serializers import BookingFastSerializer, BookingSerializer  # noqa: E402
+from core.renderers import json_dumps  # noqa: E402
+from rooms.models import Room  # noqa: E402
+from rooms.serializers import RoomFastSerializer, RoomSerializer  # noqa: E402
+
+
+class Rollback(Exception):
+    """Откат транзакции с тестовыми данными."""
+
+
+def seed(rows: int) -> Room:
+    Room.objects.bulk_create(Room(description=f"Номер {i}", price=1000 + i % 5000) for i in range(rows))
+    room = Room.objects.first()
+    Booking.objects.bulk_create(
+        Booking(
+            room=room,
+            date_start=date(2025, 1, 1) + timedelta(days=2 * i),
+            date_end=date(2025, 1, 2) + timedelta(days=2 * i),
+        )
+        for i in range(rows)
+    )
+    return room
+
+
+def measure(func, seconds: float) -> float:
+    """Количество вызовов func в секунду."""
+    func()  # прогрев
+    calls, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        func()
+        calls += 1
+    return calls / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="количество номеров и броней")
+    parser.add_argument("--seconds", type=float, default=5.0, help="длительность замера каждого варианта")
+    args = parser.parse_args()
+
+    try:
+        with transaction.atomic():
+            room = seed(args.rows)
+            rooms = Room.objects.order_by("-created_at", "-id")
+            bookings = Booking.objects.filter(room=room).order_by("date_start", "id")
+
+            cases = {
+                "rooms/list": (
+                    lambda: JSONRenderer().render(RoomSerializer(list(rooms), many=True).data),
+                    lambda: json_dumps(RoomFastSerializer.serialize(rooms)),
+                ),
+                "bookings/list": (
+                    lambda: JSONRenderer().render(BookingSerializer(list(bookings), many=True).data),
+                    lambda: json_dumps(BookingFastSerializer.serialize(bookings)),
+                ),
+            }
+
+            print(f"{args.rows} строк, замер по {args.seconds} с")
+            for name, (before, after) in cases.items():
+                assert before() == after(), f"{name}: вывод быстрого пути отличается"
+                before_rps = measure(before, args.seconds)
+                after_rps = measure(after, args.seconds)
+                print(
+                    f"{name:14} до: {before_rps:8.2f} req/s  после: {after_rps:8.2f} req/s  x{after_rps / before_rps:.1f}"
+                )
+
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == "__main__":
+    main()
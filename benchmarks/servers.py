@@ -0,0 +1,116 @@
+"""
+Бенчмарк серверов: профиль нагрузки benchmarks/load.py против manage.py runserver и gunicorn
+(core/gunicorn_config.py) с воркерами sync, gthread и uvicorn (если установлен uvicorn).
+
+Каждый сервер запускается на свободном порту с DEBUG=False и переменными окружения текущего
+процесса (GUNICORN_WORKERS и прочие можно задать как обычно), после прогона останавливается.
+Данные для серверов готовит benchmarks/datagen.py. Запуск из корня репозитория:
+    python benchmarks/servers.py --duration 30 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from importlib.util import find_spec
+from pathlib import Path
+
+from load import HTTPConnection, print_results, run
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+GUNICORN = [sys.executable, "-m", "gunicorn", "-c", "python:core.gunicorn_config"]
+
+SERVERS = {
+    "runserver": ([sys.executable, "manage.py", "runserver", "--noreload"], {}),
+    "gunicorn sync": (GUNICORN, {"GUNICORN_WORKER_CLASS": "sync"}),
+    "gunicorn gthread": (GUNICORN, {"GUNICORN_WORKER_CLASS": "gthread"}),
+    "gunicorn uvicorn": (GUNICORN, {"GUNICORN_WORKER_CLASS": "uvicorn"}),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_ready(url: str, timeout: float = 30.0) -> None:
+    """Ждёт, пока сервер ответит 200 на rooms/list/."""
+    deadline = time.monotonic() + timeout
+    while True:
+        conn = HTTPConnection(url)
+        try:
+            status, _ = await conn.request("GET", "/rooms/list/?limit=1")
+            if status == 200:
+                return
+        except OSError:
+            pass
+        finally:
+            conn.close()
+        if time.monotonic() > deadline:
+            raise SystemExit(f"Сервер {url} не ответил за {timeout:.0f} с")
+        await asyncio.sleep(0.2)
+
+
+def bench_server(name: str, args) -> dict:
+    command, env = SERVERS[name]
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    if name == "runserver":
+        command = [*command, f"127.0.0.1:{port}"]
+    env = {**os.environ, "DEBUG": "False", "GUNICORN_BIND": f"127.0.0.1:{port}", **env}
+
+    server = subprocess.Popen(command, cwd=SRC, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_ready(url))
+        load_args = argparse.Namespace(
+            url=url,
+            duration=args.duration,
+            warmup=args.warmup,
+            concurrency=args.concurrency,
+            seed=args.seed,
+            keep=False,
+        )
+        return asyncio.run(run(load_args))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30.0, help="длительность замера каждого сервера, с")
+    parser.add_argument("--warmup", type=float, default=5.0, help="прогрев перед замером, с")
+    parser.add_argument("--concurrency", type=int, default=32, help="количество одновременных клиентов")
+    parser.add_argument("--seed", type=int, default=42, help="зерно генератора операций")
+    parser.add_argument("--servers", nargs="+", choices=list(SERVERS), default=list(SERVERS), help="серверы")
+    parser.add_argument("--output", help="файл JSON с результатами всех серверов")
+    args = parser.parse_args()
+
+    reports = {}
+    for name in args.servers:
+        if "uvicorn" in name and find_spec("uvicorn") is None:
+            print(f"{name}: пропущен, не установлен uvicorn\n")
+            continue
+        print(f"== {name}")
+        reports[name] = bench_server(name, args)
+        print_results(reports[name])
+        print()
+
+    print(f"{'сервер':20} {'req/s':>9} {'ошибок':>7}")
+    for name, report in reports.items():
+        print(f"{name:20} {report['total']['rps']:9.1f} {report['total']['errors']:7}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"Результаты записаны в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Бенчмарк запуска воркера: время от старта интерпретатора до ответа на первый запрос.
+
+Каждый замер — новый процесс Python (холодный старт, как у нового воркера). Этапы:
+настройки (core.config.settings), django.setup(), WSGI-приложение с URL-резолвером,
+прогрев core/warmup.py (warm_app + соединение с БД) и первый запрос GET rooms/list/ —
+без прогрева и после него. Профили: полный и API_PROFILE=True.
+
+--importtime N дополнительно печатает N самых долгих импортов верхнего уровня
+(python -X importtime, накопленное время). Запуск из корня репозитория (нужна БД из DATABASE_URL):
+    python benchmarks/startup.py --runs 5 --importtime 15
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+PROFILES = {
+    "полный": {"API_PROFILE": "False"},
+    "API_PROFILE": {"API_PROFILE": "True"},
+}
+
+URL = "/rooms/list/?limit=50"
+
+STAGES = ["настройки", "django.setup()", "WSGI + URL", "прогрев", "первый запрос"]
+
+
+def first_request(application) -> float:
+    path, _, query = URL.partition("?")
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "HTTP_HOST": "localhost",
+        "HTTP_ACCEPT": "application/json",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+    }
+
+    def start_response(status, headers):
+        assert status.startswith("200"), status
+
+    started = time.perf_counter()
+    response = application(environ, start_response)
+    for _ in response:
+        pass
+    response.close()
+    return time.perf_counter() - started
+
+
+def run_worker(warm: bool) -> dict:
+    """Этапы запуска в миллисекундах (выполняется в дочернем процессе)."""
+    sys.path.insert(0, str(SRC))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.config.settings")
+    stages = {}
+
+    started = time.perf_counter()
+    import core.config.settings  # noqa: F401
+
+    stages["настройки"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    import django
+
+    django.setup()
+    stages["django.setup()"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+
+    application = get_wsgi_application()
+    _ = get_resolver().url_patterns
+    stages["WSGI + URL"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if warm:
+        from core.warmup import warm_app, warm_connections
+
+        warm_app()
+        warm_connections()
+    stages["прогрев"] = time.perf_counter() - started
+
+    stages["первый запрос"] = first_request(application)
+    return {stage: seconds * 1000 for stage, seconds in stages.items()}
+
+
+def measure(env: dict, warm: bool, runs: int) -> dict:
+    """Медианы этапов и полного времени процесса (с запуском интерпретатора) по runs запускам."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", *(["--warm"] if warm else [])],
+            env={**os.environ, "DEBUG": "False", **env},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        total = (time.perf_counter() - started) * 1000
+        samples.append({**json.loads(output.strip().splitlines()[-1]), "процесс целиком": total})
+    return {stage: statistics.median(sample[stage] for sample in samples) for stage in samples[0]}
+
+
+def top_imports(env: dict, limit: int) -> list[tuple[float, str]]:
+    """Самые долгие импорты верхнего уровня при загрузке приложения (мс, модуль)."""
+    script = (
+        f"import sys; sys.path.insert(0, {str(SRC)!r}); import django; django.setup(); "
+        "from django.core.wsgi import get_wsgi_application; from django.urls import get_resolver; "
+        "get_wsgi_application(); get_resolver().url_patterns"
+    )
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        env={**os.environ, "DEBUG": "False", "DJANGO_SETTINGS_MODULE": "core.config.settings", **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not name.startswith("  "):  # вложенные импорты — с дополнительным отступом
+            imports.append((int(cumulative) / 1000, name.strip()))
+    return sorted(imports, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="запусков процесса на вариант (медиана)")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="показать N самых долгих импортов")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--warm", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.warm)))
+        return
+
+    results = {}
+    for name, env in PROFILES.items():
+        results[f"{name}"] = measure(env, warm=False, runs=args.runs)
+        results[f"{name} + прогрев"] = measure(env, warm=True, runs=args.runs)
+
+    print(f"{'мс (медиана)':20}" + "".join(f"{name:>24}" for name in results))
+    for stage in [*STAGES, "процесс целиком"]:
+        print(f"{stage:20}" + "".join(f"{result[stage]:24.1f}" for result in results.values()))
+
+    if args.importtime:
+        for name, env in PROFILES.items():
+            print(f"\nСамые долгие импорты ({name}):")
+            for milliseconds, module in top_imports(env, args.importtime):
+                print(f"{milliseconds:8.1f} мс  {module}")
+
+
+if __name__ == "__main__":
+    main()
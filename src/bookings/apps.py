@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BookingsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "bookings"
+
+    def ready(self):
+        # Индекс занятости обновляется сигналами, только если он включён
+        if settings.OCCUPANCY_INDEX_ENABLED:
+            from .signals import connect_signals
+
+            connect_signals()
@@ -0,0 +1,130 @@
+"""
+Async-версии views бронирований для запуска под ASGI (uvicorn).
+
+Те же URL, параметры и формат ответов, что в views.py; подключаются в urls.py,
+когда включён ASYNC_VIEWS_ENABLED (core/asgi.py включает его сам).
+"""
+
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+
+from core.async_views import async_api_view, json_response
+from core.idempotency import idempotent
+from core.pagination import InvalidCursorError, parse_limit
+from core.streaming import STREAM_CHUNK_SIZE, astream_rows, get_stream_format
+from rooms.models import Room
+
+from .models import Booking
+from .serializers import (
+    BookingCalendarParamsSerializer,
+    BookingCreateSerializer,
+    BookingFastSerializer,
+    BookingSerializer,
+    BookingUpdateSerializer,
+)
+from .services import BookingDatesError, BookingOverlapError, BookingService
+from .views import bookings_validators, calendar_data, is_history
+
+
+@async_api_view(["POST"])
+@idempotent("booking-create")
+async def create_booking(request):
+    """Создание новой брони."""
+    # room проверяется как id без запроса к БД: существование номера проверяет сам INSERT
+    serializer = BookingCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        booking = await BookingService.acreate_booking(
+            room_id=serializer.validated_data["room"],
+            date_start=serializer.validated_data["date_start"],
+            date_end=serializer.validated_data["date_end"],
+        )
+    except Room.DoesNotExist as e:
+        # Формат ошибки поля, как у views.create_booking
+        return json_response({"room": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+    except BookingOverlapError as e:
+        return json_response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return json_response({"booking_id": booking.id}, status=status.HTTP_201_CREATED)
+
+
+@async_api_view(["DELETE"])
+async def delete_booking(request, booking_id):
+    """Удаление брони."""
+    try:
+        await BookingService.adelete_booking(booking_id)
+    except Booking.DoesNotExist:
+        return json_response({"error": "Бронь не найдена"}, status=status.HTTP_404_NOT_FOUND)
+    return json_response(status=status.HTTP_204_NO_CONTENT)
+
+
+@async_api_view(["PATCH"])
+async def update_booking(request, booking_id):
+    """Изменение дат брони (ответы — как у views.update_booking)."""
+    serializer = BookingUpdateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        booking = await BookingService.aupdate_booking(booking_id, **serializer.validated_data)
+    except Booking.DoesNotExist:
+        return json_response({"error": "Бронь не найдена"}, status=status.HTTP_404_NOT_FOUND)
+    except BookingDatesError as e:
+        return json_response({"non_field_errors": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+    except BookingOverlapError as e:
+        return json_response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return json_response(BookingSerializer(booking).data)
+
+
+@async_api_view(["GET"])
+async def list_room_bookings(request, room_id):
+    """Получение списка броней для номера (условные запросы, страницы и поток — как в views.list_room_bookings)."""
+    try:
+        version = await BookingService.aget_room_bookings_version(room_id)
+    except Room.DoesNotExist:
+        return json_response({"error": "Комната не найдена"}, status=status.HTTP_404_NOT_FOUND)
+
+    validators = bookings_validators(request.GET, room_id, version)
+    history = is_history(request.GET)
+    not_modified = get_conditional_response(request, etag=validators["ETag"])
+    if not_modified is not None:
+        for header, value in validators.items():
+            not_modified[header] = value
+        return not_modified
+
+    try:
+        stream_format = get_stream_format(request.GET)
+        if stream_format:
+            bookings = BookingService.get_room_bookings_queryset(room_id, history)
+            response = astream_rows(
+                BookingFastSerializer.aiter_rows(bookings, chunk_size=STREAM_CHUNK_SIZE), stream_format
+            )
+            for header, value in validators.items():
+                response[header] = value
+            return response
+
+        if "limit" in request.GET or "cursor" in request.GET:
+            page = await BookingService.aget_room_bookings_page(
+                room_id, request.GET.get("cursor"), parse_limit(request.GET.get("limit")), history
+            )
+            data = {"results": BookingFastSerializer.serialize_objects(page.items), "next": page.next_cursor}
+        else:
+            data = await BookingFastSerializer.aserialize(BookingService.get_room_bookings_queryset(room_id, history))
+    except (ValueError, InvalidCursorError) as e:
+        return json_response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return json_response(data, headers=validators)
+
+
+@async_api_view(["GET"])
+async def bookings_calendar(request):
+    """Календарь броней нескольких номеров за период (ответ — как у views.bookings_calendar)."""
+    params = BookingCalendarParamsSerializer(data=request.GET)
+    if not params.is_valid():
+        return json_response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    calendar = await BookingService.aget_calendar(**params.validated_data)
+    return json_response(calendar_data(**params.validated_data, calendar=calendar))
@@ -0,0 +1,53 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bookings import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит в архив (bookings_booking_archive) разделы броней старше окна хранения "
+        "и создаёт разделы на будущие месяцы"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=settings.BOOKINGS_RETENTION_MONTHS,
+            help="сколько месяцев дат выезда до текущего оставлять в основной таблице",
+        )
+        parser.add_argument(
+            "--ahead-months",
+            type=int,
+            default=settings.BOOKING_PARTITIONS_AHEAD_MONTHS,
+            help="на сколько месяцев вперёд создавать разделы",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="только показать, что будет сделано")
+
+    def handle(self, *args, **options):
+        current = date.today().replace(day=1)
+        before = partitions.add_months(current, -options["retention_months"])
+
+        if options["dry_run"]:
+            existing = {partition.date_from for partition in partitions.list_partitions()}
+            for offset in range(options["ahead_months"]):
+                month = partitions.add_months(current, offset)
+                if month not in existing:
+                    self.stdout.write(f"Будет создан раздел {partitions.partition_name(month)}")
+            for partition in partitions.list_partitions():
+                if partition.date_to <= before:
+                    self.stdout.write(f"Будет перенесён в архив раздел {partition.name}")
+            return
+
+        for partition in partitions.ensure_partitions(options["ahead_months"]):
+            self.stdout.write(f"Создан раздел {partition.name}")
+
+        archived = partitions.archive_partitions(before)
+        for partition in archived:
+            self.stdout.write(f"Перенесён в архив раздел {partition.name}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Брони с выездом раньше {before} в архиве, разделов перенесено: {len(archived)}")
+        )
@@ -0,0 +1,53 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.models import Booking
+from bookings.occupancy import OccupancyIndex, occupancy_index
+
+
+class Command(BaseCommand):
+    help = "Строит индекс занятости номеров из БД и сверяет его ответы с PostgreSQL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="сверить маски и выборочные проверки с БД")
+        parser.add_argument("--samples", type=int, default=1000, help="сколько случайных проверок периода сделать")
+
+    def handle(self, *args, **options):
+        # Индекс живёт в памяти процесса: команда строит собственную копию,
+        # веб-процессы перестраивают свою при первом обращении и при сдвиге горизонта
+        index = OccupancyIndex(horizon_days=occupancy_index.horizon_days)
+        index.rebuild()
+
+        stats = index.stats()
+        self.stdout.write(
+            f"Горизонт: {stats['base']} + {stats['horizon_days']} дн.; номеров: {stats['rooms']}; "
+            f"занятых ночей: {stats['booked_nights']}; память под маски: {stats['bytes']} байт"
+        )
+
+        if not options["check"]:
+            return
+
+        mismatched = index.check_consistency()
+        if mismatched:
+            raise CommandError(f"Маски расходятся с БД для номеров: {mismatched[:20]}")
+
+        room_ids = list(Booking.objects.values_list("room_id", flat=True).distinct()[:10_000])
+        if not room_ids:
+            self.stdout.write(self.style.SUCCESS("Броней нет, проверять нечего"))
+            return
+
+        errors = 0
+        for _ in range(options["samples"]):
+            room_id = random.choice(room_ids)
+            date_start = index.base + timedelta(days=random.randrange(index.horizon_days - 30))
+            date_end = date_start + timedelta(days=random.randint(1, 30))
+            expected = not Booking.objects.filter(room_id=room_id).overlapping(date_start, date_end).exists()
+            if index.is_free(room_id, date_start, date_end) != expected:
+                errors += 1
+                self.stderr.write(f"Номер #{room_id}, {date_start}..{date_end}: индекс {not expected}, БД {expected}")
+
+        if errors:
+            raise CommandError(f"Расхождений с БД: {errors} из {options['samples']}")
+        self.stdout.write(self.style.SUCCESS(f"Индекс согласован с БД ({options['samples']} проверок)"))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0002_booking_room_dates_no_overlap"),
+        ("rooms", "0001_initial"),
+    ]
+
+    operations = [
+        # Сначала составной индекс, затем удаление одиночного индекса FK, который он заменяет
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(fields=["room", "date_start", "date_end"], name="booking_room_dates_idx"),
+        ),
+        migrations.AlterField(
+            model_name="booking",
+            name="room",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="bookings",
+                to="rooms.room",
+                verbose_name="Номер",
+            ),
+        ),
+    ]
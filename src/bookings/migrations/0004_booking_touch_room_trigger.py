@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:03
+
+from django.db import migrations
+
+# Любое изменение броней (через сервис, ORM, bulk-операции или сырой SQL) увеличивает
+# Room.bookings_version и обновляет Room.bookings_changed_at затронутых номеров.
+# Триггеры уровня оператора: один UPDATE номеров на весь INSERT/UPDATE/DELETE броней
+TOUCH_ROOMS_SQL = """
+CREATE FUNCTION bookings_touch_rooms() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE rooms_room SET bookings_version = bookings_version + 1, bookings_changed_at = now()
+        WHERE id IN (SELECT room_id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE rooms_room SET bookings_version = bookings_version + 1, bookings_changed_at = now()
+        WHERE id IN (SELECT room_id FROM old_rows);
+    ELSE
+        UPDATE rooms_room SET bookings_version = bookings_version + 1, bookings_changed_at = now()
+        WHERE id IN (SELECT room_id FROM new_rows UNION SELECT room_id FROM old_rows);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bookings_touch_rooms_insert
+    AFTER INSERT ON bookings_booking REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bookings_touch_rooms();
+
+CREATE TRIGGER bookings_touch_rooms_update
+    AFTER UPDATE ON bookings_booking REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bookings_touch_rooms();
+
+CREATE TRIGGER bookings_touch_rooms_delete
+    AFTER DELETE ON bookings_booking REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bookings_touch_rooms();
+"""
+
+DROP_TOUCH_ROOMS_SQL = """
+DROP TRIGGER IF EXISTS bookings_touch_rooms_insert ON bookings_booking;
+DROP TRIGGER IF EXISTS bookings_touch_rooms_update ON bookings_booking;
+DROP TRIGGER IF EXISTS bookings_touch_rooms_delete ON bookings_booking;
+DROP FUNCTION IF EXISTS bookings_touch_rooms();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0003_booking_room_dates_idx"),
+        ("rooms", "0003_room_bookings_version"),
+    ]
+
+    operations = [
+        migrations.RunSQL(TOUCH_ROOMS_SQL, reverse_sql=DROP_TOUCH_ROOMS_SQL),
+    ]
@@ -0,0 +1,202 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:05
+
+from datetime import date
+
+from django.db import migrations
+
+# Таблица броней секционируется по date_end (раздел на месяц): запросы текущих броней и проверка
+# пересечения читают только разделы с нужными датами выезда, старые разделы команда archive_bookings
+# переносит в bookings_booking_archive. Брони копируются в новую таблицу один раз при миграции.
+#
+# Первичный ключ секционированной таблицы обязан включать ключ секционирования: в БД он (id, date_end),
+# id по-прежнему выдаёт последовательность, и для Django первичным ключом остаётся id.
+# Exclusion constraint на секционированной таблице PostgreSQL не поддерживает (в PG 17 — только
+# с равенством по ключу секционирования), поэтому пересечения броней номера запрещает триггер.
+
+TABLE = "bookings_booking"
+OLD_TABLE = "bookings_booking_unpartitioned"
+ARCHIVE_TABLE = "bookings_booking_archive"
+DEFAULT_PARTITION = "bookings_booking_default"
+SEQUENCE = "bookings_booking_id_seq"
+
+# Разделы создаются на столько месяцев вперёд (дальше — команда archive_bookings)
+PARTITIONS_AHEAD_MONTHS = 24
+
+# Проверка пересечения вместо exclusion constraint: брони одного номера проверяются по очереди
+# (advisory-блокировка номера до конца транзакции), ошибка — тот же SQLSTATE 23P01, что у constraint.
+# Свежий снимок на каждый запрос функции (READ COMMITTED) видит брони, зафиксированные до блокировки.
+# id <> NEW.id — при переносе строки в другой раздел UPDATE триггер срабатывает и на вставку.
+CHECK_OVERLAP_SQL = f"""
+CREATE FUNCTION bookings_check_overlap() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('{TABLE}'), mod(NEW.room_id, 2147483647)::integer);
+    IF EXISTS (
+        SELECT 1 FROM {TABLE}
+        WHERE room_id = NEW.room_id AND date_end > NEW.date_start AND date_start < NEW.date_end AND id <> NEW.id
+    ) THEN
+        RAISE EXCEPTION 'conflicting key value violates exclusion constraint "booking_room_dates_no_overlap"'
+            USING ERRCODE = 'exclusion_violation', CONSTRAINT = 'booking_room_dates_no_overlap';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bookings_check_overlap
+    BEFORE INSERT OR UPDATE ON {TABLE}
+    FOR EACH ROW EXECUTE FUNCTION bookings_check_overlap();
+"""
+
+# Триггеры уровня оператора из bookings 0004 и reports 0001 (функции уже есть, таблица новая)
+STATEMENT_TRIGGERS_SQL = "".join(
+    f"""
+CREATE TRIGGER {function}_insert
+    AFTER INSERT ON {TABLE} REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+
+CREATE TRIGGER {function}_update
+    AFTER UPDATE ON {TABLE} REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+
+CREATE TRIGGER {function}_delete
+    AFTER DELETE ON {TABLE} REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+"""
+    for function in ("bookings_touch_rooms", "reports_booked_nights")
+)
+
+# Архив: отсоединённые разделы присоединяются к нему без копирования строк
+CREATE_ARCHIVE_SQL = f"""
+CREATE TABLE {ARCHIVE_TABLE} (LIKE {TABLE}, PRIMARY KEY (id, date_end)) PARTITION BY RANGE (date_end);
+CREATE INDEX booking_archive_room_dates_idx ON {ARCHIVE_TABLE} (room_id, date_start, date_end);
+"""
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_fk_name(schema_editor, table: str) -> str:
+    with schema_editor.connection.cursor() as cursor:
+        constraints = schema_editor.connection.introspection.get_constraints(cursor, table)
+    return next(name for name, constraint in constraints.items() if constraint["foreign_key"])
+
+
+def partition_bookings(apps, schema_editor):
+    fk_name = get_fk_name(schema_editor, TABLE)
+    execute = schema_editor.execute
+
+    execute(f"ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}")
+    execute(f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT {TABLE}_pkey TO {OLD_TABLE}_pkey")
+    execute(f"ALTER TABLE {OLD_TABLE} DROP CONSTRAINT booking_room_dates_no_overlap")
+    execute("DROP INDEX booking_room_dates_idx")
+
+    # Identity-столбцы в секционированных таблицах PG 16 не поддерживает — id из обычной последовательности
+    execute(f"CREATE SEQUENCE {TABLE}_partitioned_id_seq")
+    execute(
+        f"""
+        CREATE TABLE {TABLE} (
+            id bigint NOT NULL DEFAULT nextval('{TABLE}_partitioned_id_seq'),
+            room_id bigint NOT NULL,
+            date_start date NOT NULL,
+            date_end date NOT NULL,
+            created_at timestamp with time zone NOT NULL,
+            CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, date_end)
+        ) PARTITION BY RANGE (date_end)
+        """
+    )
+    execute(f"ALTER SEQUENCE {TABLE}_partitioned_id_seq OWNED BY {TABLE}.id")
+
+    # Месячные разделы от самой ранней даты выезда до PARTITIONS_AHEAD_MONTHS вперёд;
+    # брони вне них (очень старые или очень далёкие) попадают в раздел по умолчанию
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT min(date_end) FROM {OLD_TABLE}")
+        earliest = cursor.fetchone()[0]
+    current = date.today().replace(day=1)
+    month = min(earliest.replace(day=1), current) if earliest else current
+    # Индексы разделов создаются заранее с читаемыми именами (booking_room_dates_idx_pYYYY_MM):
+    # индекс основной таблицы присоединяет их, а не создаёт свои с автоматическими именами
+    partitions = {}
+    while month < add_months(current, PARTITIONS_AHEAD_MONTHS):
+        partitions[f"p{month:%Y_%m}"] = f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        month = add_months(month, 1)
+    partitions["default"] = "DEFAULT"
+    for suffix, bounds in partitions.items():
+        execute(f"CREATE TABLE {TABLE}_{suffix} PARTITION OF {TABLE} {bounds}")
+        execute(f"CREATE INDEX booking_room_dates_idx_{suffix} ON {TABLE}_{suffix} (room_id, date_start, date_end)")
+
+    execute(f"CREATE INDEX booking_room_dates_idx ON {TABLE} (room_id, date_start, date_end)")
+    execute(
+        f"INSERT INTO {TABLE} (id, room_id, date_start, date_end, created_at) "
+        f"SELECT id, room_id, date_start, date_end, created_at FROM {OLD_TABLE}"
+    )
+    execute(f"SELECT setval('{TABLE}_partitioned_id_seq', (SELECT coalesce(max(id), 0) + 1 FROM {TABLE}), false)")
+    execute(
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT {fk_name} FOREIGN KEY (room_id) REFERENCES rooms_room (id) "
+        "DEFERRABLE INITIALLY DEFERRED"
+    )
+
+    execute(f"DROP TABLE {OLD_TABLE}")
+    execute(f"ALTER SEQUENCE {TABLE}_partitioned_id_seq RENAME TO {SEQUENCE}")
+
+    execute(CHECK_OVERLAP_SQL)
+    execute(STATEMENT_TRIGGERS_SQL)
+    execute(CREATE_ARCHIVE_SQL)
+
+
+def unpartition_bookings(apps, schema_editor):
+    """Обратно в обычную таблицу с exclusion constraint (архивные брони возвращаются в неё)."""
+    fk_name = get_fk_name(schema_editor, TABLE)
+    execute = schema_editor.execute
+
+    execute(f"ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}")
+    execute(f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT {TABLE}_pkey TO {OLD_TABLE}_pkey")
+    execute(f"ALTER SEQUENCE {SEQUENCE} RENAME TO {TABLE}_partitioned_id_seq")
+    execute("DROP INDEX booking_room_dates_idx")
+
+    execute(
+        f"""
+        CREATE TABLE {TABLE} (
+            id bigint NOT NULL PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
+            room_id bigint NOT NULL,
+            date_start date NOT NULL,
+            date_end date NOT NULL,
+            created_at timestamp with time zone NOT NULL
+        )
+        """
+    )
+    execute(
+        f"INSERT INTO {TABLE} (id, room_id, date_start, date_end, created_at) "
+        f"SELECT id, room_id, date_start, date_end, created_at FROM {OLD_TABLE} "
+        f"UNION ALL SELECT id, room_id, date_start, date_end, created_at FROM {ARCHIVE_TABLE}"
+    )
+    execute(
+        f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), (SELECT coalesce(max(id), 0) + 1 FROM {TABLE}), false)"
+    )
+    execute(f"CREATE INDEX booking_room_dates_idx ON {TABLE} (room_id, date_start, date_end)")
+    execute(
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT booking_room_dates_no_overlap "
+        "EXCLUDE USING gist (INT8RANGE(room_id, room_id, '[]') WITH =, DATERANGE(date_start, date_end) WITH &&)"
+    )
+    execute(
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT {fk_name} FOREIGN KEY (room_id) REFERENCES rooms_room (id) "
+        "DEFERRABLE INITIALLY DEFERRED"
+    )
+
+    execute(f"DROP TABLE {OLD_TABLE}, {ARCHIVE_TABLE}")
+    execute("DROP FUNCTION bookings_check_overlap()")
+    execute(STATEMENT_TRIGGERS_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0004_booking_touch_room_trigger"),
+        ("reports", "0001_booked_night"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(partition_bookings, unpartition_bookings)],
+            state_operations=[migrations.RemoveConstraint(model_name="booking", name="booking_room_dates_no_overlap")],
+        ),
+    ]
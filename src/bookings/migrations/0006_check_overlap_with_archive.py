@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 23:50
+
+from django.db import migrations
+
+# Разделы, перенесённые в архив (команда archive_bookings), основная таблица больше не содержит:
+# новая бронь с датами архивного месяца попала бы в раздел по умолчанию без проверки пересечения
+# с архивными бронями. Проверка читает и архив: условие date_end > NEW.date_start отсекает архивные
+# разделы с более ранними датами выезда, поэтому для текущих броней архив не читается вовсе.
+
+TABLE = "bookings_booking"
+ARCHIVE_TABLE = "bookings_booking_archive"
+
+CHECK_OVERLAP_SQL = """
+CREATE OR REPLACE FUNCTION bookings_check_overlap() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('{table}'), mod(NEW.room_id, 2147483647)::integer);
+    IF EXISTS (
+        SELECT 1 FROM {table}
+        WHERE room_id = NEW.room_id AND date_end > NEW.date_start AND date_start < NEW.date_end AND id <> NEW.id
+        {archive}
+    ) THEN
+        RAISE EXCEPTION 'conflicting key value violates exclusion constraint "booking_room_dates_no_overlap"'
+            USING ERRCODE = 'exclusion_violation', CONSTRAINT = 'booking_room_dates_no_overlap';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ARCHIVE_CHECK = f"""UNION ALL
+        SELECT 1 FROM {ARCHIVE_TABLE}
+        WHERE room_id = NEW.room_id AND date_end > NEW.date_start AND date_start < NEW.date_end"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0005_partition_booking_by_date_end"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CHECK_OVERLAP_SQL.format(table=TABLE, archive=ARCHIVE_CHECK),
+            CHECK_OVERLAP_SQL.format(table=TABLE, archive=""),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:40
+
+from django.db import migrations
+
+# Room.bookings_changed_at больше никто не читает (списки броней отдают только ETag по версии),
+# поэтому триггер увеличивает только Room.bookings_version. Сам столбец удаляет миграция rooms 0004.
+TOUCH_ROOMS_SQL = """
+CREATE OR REPLACE FUNCTION bookings_touch_rooms() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE rooms_room SET bookings_version = bookings_version + 1{changed_at}
+        WHERE id IN (SELECT room_id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE rooms_room SET bookings_version = bookings_version + 1{changed_at}
+        WHERE id IN (SELECT room_id FROM old_rows);
+    ELSE
+        UPDATE rooms_room SET bookings_version = bookings_version + 1{changed_at}
+        WHERE id IN (SELECT room_id FROM new_rows UNION SELECT room_id FROM old_rows);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0006_check_overlap_with_archive"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            TOUCH_ROOMS_SQL.format(changed_at=""),
+            reverse_sql=TOUCH_ROOMS_SQL.format(changed_at=", bookings_changed_at = now()"),
+        ),
+    ]
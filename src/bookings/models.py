@@ -3,21 +3,43 @@ from django.db import models
 from rooms.models import Room  # Импортируем модель Room
 
 
+class BookingQuerySet(models.QuerySet):
+    def overlapping(self, date_start, date_end):
+        """Брони, пересекающиеся с периодом [date_start, date_end)."""
+        return self.filter(date_start__lt=date_end, date_end__gt=date_start)
+
+    def current(self, day):
+        """Текущие и будущие брони: выезд не раньше day (читаются только разделы с этими датами выезда)."""
+        return self.filter(date_end__gte=day)
+
+
 class Booking(models.Model):
     room = models.ForeignKey(
         Room,
         on_delete=models.CASCADE,  # Если номер удалят, все его брони тоже удалятся
         related_name="bookings",  # Позволит легко получить все брони номера: room.bookings.all()
         verbose_name="Номер",
+        db_index=False,  # Поиск по room_id обслуживает составной индекс booking_room_dates_idx
     )
     date_start = models.DateField(verbose_name="Дата заезда")
     date_end = models.DateField(verbose_name="Дата выезда")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания брони")
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Бронь"
         verbose_name_plural = "Брони"
         ordering = ["date_start"]  # Сортировка по умолчанию: по дате заезда
+        indexes = [
+            # Фильтр по номеру + сортировка/диапазон по датам: брони номера читаются уже упорядоченными,
+            # а проверка пересечения дат покрывается индексом целиком (index-only scan)
+            models.Index(fields=["room", "date_start", "date_end"], name="booking_room_dates_idx"),
+        ]
+        # Таблица секционирована по date_end (миграция 0005). Пересекающиеся брони одного номера
+        # запрещает триггер bookings_check_overlap: exclusion constraint на секционированной таблице
+        # PostgreSQL не поддерживает. Ошибка та же — SQLSTATE 23P01 (exclusion_violation). С миграции 0006
+        # триггер проверяет и архив: бронь с датами архивного месяца попадает в раздел по умолчанию.
 
     def __str__(self):
         return f"Бронь #{self.id} (Номер #{self.room_id})"
@@ -0,0 +1,155 @@
+"""
+Индекс занятости номеров в памяти процесса.
+
+Для каждого номера хранится битовая маска по дням на скользящем горизонте
+(по умолчанию 2 года от даты построения): бит N установлен, если ночь base + N
+занята. Проверка пересечения — одна операция AND над целым числом без обращения к БД.
+
+Индекс локален для процесса: изменения, сделанные другими процессами, он не
+видит. Поэтому он включается настройкой OCCUPANCY_INDEX_ENABLED и только позволяет
+пропустить работу, когда говорит «свободно» (пакетное создание броней не делает
+отдельный запрос пересечений). Отказы в бронировании и поиск свободных номеров
+всегда решает PostgreSQL: пересечения запрещает триггер bookings_check_overlap.
+"""
+
+import threading
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
+
+from .models import Booking
+
+# Через сколько дней после построения горизонт сдвигается (индекс перестраивается от текущей даты)
+REBASE_AFTER_DAYS = 30
+
+
+class OccupancyIndex:
+    """Битовые маски занятых ночей по номерам."""
+
+    def __init__(self, horizon_days: int):
+        self.horizon_days = horizon_days
+        self.base: date | None = None  # Первая ночь горизонта; None — индекс ещё не построен
+        self._rooms: dict[int, int] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def is_built(self) -> bool:
+        return self.base is not None
+
+    def _mask(self, date_start: date, date_end: date) -> int | None:
+        """Маска ночей [date_start, date_end) или None, если период выходит за горизонт."""
+        start = (date_start - self.base).days
+        end = (date_end - self.base).days
+        if start < 0 or end > self.horizon_days:
+            return None
+        return ((1 << (end - start)) - 1) << start
+
+    def _clipped_mask(self, date_start: date, date_end: date, base: date | None = None) -> int:
+        """Маска части брони, попадающей в горизонт (0, если не попадает совсем)."""
+        base = base or self.base
+        start = max((date_start - base).days, 0)
+        end = min((date_end - base).days, self.horizon_days)
+        if start >= end:
+            return 0
+        return ((1 << (end - start)) - 1) << start
+
+    def _load(self, base: date, room_id: int | None = None) -> dict[int, int]:
+        """Маски номеров из БД (всех или одного) для горизонта, начинающегося с base."""
+        horizon_end = base + timedelta(days=self.horizon_days)
+        bookings = Booking.objects.filter(date_end__gt=base, date_start__lt=horizon_end)
+        if room_id is not None:
+            bookings = bookings.filter(room_id=room_id)
+
+        rooms = defaultdict(int)
+        rows = bookings.values_list("room_id", "date_start", "date_end").iterator(chunk_size=10_000)
+        for booked_room_id, date_start, date_end in rows:
+            rooms[booked_room_id] |= self._clipped_mask(date_start, date_end, base)
+        return dict(rooms)
+
+    def rebuild(self, base: date | None = None) -> None:
+        """Полностью перестраивает индекс из БД; горизонт начинается с base (по умолчанию — сегодня)."""
+        base = base or date.today()
+        rooms = self._load(base)
+        with self._lock:
+            self.base = base
+            self._rooms = rooms
+
+    def _is_stale(self) -> bool:
+        return not self.is_built or (date.today() - self.base).days > REBASE_AFTER_DAYS
+
+    def ensure_built(self) -> None:
+        """Строит индекс при первом обращении и сдвигает горизонт, когда он устарел."""
+        if self._is_stale():
+            with self._lock:
+                if self._is_stale():
+                    self.rebuild()
+
+    def add(self, room_id: int, date_start: date, date_end: date) -> None:
+        """Отмечает ночи новой брони занятыми."""
+        if not self.is_built:
+            return
+        with self._lock:
+            self._rooms[room_id] = self._rooms.get(room_id, 0) | self._clipped_mask(date_start, date_end)
+
+    def remove(self, room_id: int, date_start: date, date_end: date) -> None:
+        """Освобождает ночи удалённой брони (брони одного номера не пересекаются, поэтому это безопасно)."""
+        if not self.is_built:
+            return
+        with self._lock:
+            self._rooms[room_id] = self._rooms.get(room_id, 0) & ~self._clipped_mask(date_start, date_end)
+
+    def refresh_room(self, room_id: int) -> None:
+        """Перечитывает маску одного номера из БД (после изменения брони, когда старые даты неизвестны)."""
+        if not self.is_built:
+            return
+        with self._lock:
+            self._rooms[room_id] = self._load(self.base, room_id).get(room_id, 0)
+
+    def remove_room(self, room_id: int) -> None:
+        """Удаляет номер из индекса."""
+        with self._lock:
+            self._rooms.pop(room_id, None)
+
+    def is_free(self, room_id: int, date_start: date, date_end: date) -> bool | None:
+        """Свободен ли номер на период; None — индекс не может ответить (период вне горизонта)."""
+        if not self.is_built:
+            return None
+        mask = self._mask(date_start, date_end)
+        if mask is None:
+            return None
+        return not self._rooms.get(room_id, 0) & mask
+
+    def check_consistency(self) -> list[int]:
+        """Сверяет индекс с БД; возвращает id номеров, у которых маски расходятся."""
+        if not self.is_built:
+            return []
+        expected = self._load(self.base)
+        with self._lock:
+            actual = dict(self._rooms)
+        room_ids = set(expected) | set(actual)
+        return sorted(room_id for room_id in room_ids if expected.get(room_id, 0) != actual.get(room_id, 0))
+
+    def stats(self) -> dict:
+        """Размер индекса: номера, занятые ночи, память под маски."""
+        with self._lock:
+            masks = list(self._rooms.values())
+        return {
+            "base": self.base,
+            "horizon_days": self.horizon_days,
+            "rooms": len(masks),
+            "booked_nights": sum(mask.bit_count() for mask in masks),
+            "bytes": sum((mask.bit_length() + 7) // 8 for mask in masks),
+        }
+
+
+# Индекс процесса (используется, только если включён OCCUPANCY_INDEX_ENABLED)
+occupancy_index = OccupancyIndex(horizon_days=settings.OCCUPANCY_HORIZON_DAYS)
+
+
+def get_occupancy_index() -> OccupancyIndex | None:
+    """Индекс занятости, если он включён в настройках (строится при первом обращении)."""
+    if not settings.OCCUPANCY_INDEX_ENABLED:
+        return None
+    occupancy_index.ensure_built()
+    return occupancy_index
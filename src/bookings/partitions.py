@@ -0,0 +1,159 @@
+"""
+Разделы таблицы броней (секционирование по месяцу даты выезда, миграция 0005) и архив.
+
+Каждый месяц date_end — отдельный раздел bookings_booking_pYYYY_MM; брони вне созданных
+разделов попадают в раздел по умолчанию. Разделы, все брони которых закончились раньше
+окна хранения, отсоединяются от основной таблицы и присоединяются к bookings_booking_archive:
+строки не копируются, а запросы текущих броней и проверка пересечений их больше не читают.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date
+
+from django.db import connection, transaction
+
+from rooms.models import Room
+
+from .models import Booking
+
+TABLE = Booking._meta.db_table
+ARCHIVE_TABLE = f"{TABLE}_archive"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+# Индекс броней номера по датам (Booking.Meta.indexes) и имена его индексов в разделах
+ROOM_DATES_INDEX = "booking_room_dates_idx"
+
+BOUNDS_RE = re.compile(r"FOR VALUES FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+# Разделы таблицы с их границами (pg_get_expr: "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')")
+PARTITIONS_SQL = """
+    SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = %s::regclass
+"""
+
+# Индекс раздела, созданный PostgreSQL для индекса основной таблицы
+PARTITION_INDEX_SQL = """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    JOIN pg_index ON pg_index.indexrelid = child.oid
+    WHERE pg_inherits.inhparent = %s::regclass AND pg_index.indrelid = %s::regclass
+"""
+
+# Версии броней номеров раздела: DETACH/ATTACH не вызывают триггер bookings_touch_rooms,
+# а списки ?history=1 (ETag без даты) после архивации теряют брони раздела
+TOUCH_ROOMS_SQL = f"""
+    UPDATE {Room._meta.db_table} SET bookings_version = bookings_version + 1
+    WHERE id IN (SELECT DISTINCT room_id FROM {{partition}})
+"""
+
+
+@dataclass(frozen=True)
+class Partition:
+    """Раздел броней с датой выезда в [date_from, date_to)."""
+
+    name: str
+    date_from: date
+    date_to: date
+
+
+def add_months(month: date, months: int) -> date:
+    """Первое число месяца, отстоящего от month на months месяцев."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month:%Y_%m}"
+
+
+def list_partitions(table: str = TABLE) -> list[Partition]:
+    """Месячные разделы таблицы (основной или архива) по возрастанию дат, без раздела по умолчанию."""
+    with connection.cursor() as cursor:
+        cursor.execute(PARTITIONS_SQL, [table])
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bounds in rows:
+        match = BOUNDS_RE.fullmatch(bounds)
+        if match:
+            partitions.append(Partition(name, date.fromisoformat(match[1]), date.fromisoformat(match[2])))
+    return sorted(partitions, key=lambda partition: partition.date_from)
+
+
+def _create_partition_table(cursor, partition: Partition) -> None:
+    """CREATE TABLE ... PARTITION OF; индекс раздела получает имя как в миграции 0005 (для планов EXPLAIN)."""
+    cursor.execute(
+        f"CREATE TABLE {partition.name} PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{partition.date_from}') TO ('{partition.date_to}')"
+    )
+    cursor.execute(PARTITION_INDEX_SQL, [ROOM_DATES_INDEX, partition.name])
+    (index,) = cursor.fetchone()
+    cursor.execute(f"ALTER INDEX {index} RENAME TO {ROOM_DATES_INDEX}_{partition.name.removeprefix(TABLE + '_')}")
+
+
+def create_partition(month: date) -> Partition:
+    """Создаёт раздел месяца; брони этого месяца из раздела по умолчанию переносятся в него.
+
+    Раздел по умолчанию на время переноса отсоединяется: PostgreSQL не даёт создать раздел,
+    пока подходящие ему строки лежат в разделе по умолчанию.
+    """
+    partition = Partition(partition_name(month), month, add_months(month, 1))
+    in_range = f"date_end >= '{partition.date_from}' AND date_end < '{partition.date_to}'"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})")
+        if not cursor.fetchone()[0]:
+            _create_partition_table(cursor, partition)
+            return partition
+
+        cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}")
+        _create_partition_table(cursor, partition)
+        # Вставка прямо в раздел: триггеры уровня оператора основной таблицы (версии номеров,
+        # агрегаты отчётов) не срабатывают — брони не меняются, только переезжают
+        cursor.execute(f"INSERT INTO {partition.name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}")
+        cursor.execute(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}")
+        cursor.execute(f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+    return partition
+
+
+def ensure_partitions(months_ahead: int, today: date | None = None) -> list[Partition]:
+    """Создаёт недостающие разделы от текущего месяца на months_ahead месяцев вперёд; возвращает созданные."""
+    current = (today or date.today()).replace(day=1)
+    existing = {partition.date_from for partition in list_partitions()}
+    return [
+        create_partition(month)
+        for month in (add_months(current, offset) for offset in range(months_ahead))
+        if month not in existing
+    ]
+
+
+def archive_partitions(before: date) -> list[Partition]:
+    """Переносит в архив разделы с датами выезда раньше before; возвращает перенесённые.
+
+    Версии броней номеров перенесённых разделов увеличиваются в той же транзакции.
+
+    Внешний ключ на номера с архивного раздела снимается: архив — снимок истории,
+    удаление номера его не затрагивает.
+    """
+    archived = []
+    for partition in list_partitions():
+        if partition.date_to > before:
+            break
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(TOUCH_ROOMS_SQL.format(partition=partition.name))
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {partition.name}")
+            cursor.execute(
+                "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'", [partition.name]
+            )
+            for (constraint,) in cursor.fetchall():
+                cursor.execute(f'ALTER TABLE {partition.name} DROP CONSTRAINT "{constraint}"')
+            cursor.execute(
+                f"ALTER TABLE {ARCHIVE_TABLE} ATTACH PARTITION {partition.name} "
+                f"FOR VALUES FROM ('{partition.date_from}') TO ('{partition.date_to}')"
+            )
+        archived.append(partition)
+    return archived
@@ -1,12 +1,21 @@
+from collections.abc import AsyncIterator, Iterable, Iterator
+
+from django.db.models import QuerySet
+
 # Импорт модуля сериализаторов из Django REST Framework
 from rest_framework import serializers
 
-from rooms.models import Room
+from core.fast_serializers import format_date, format_datetime, output_timezone
+from core.serializers import CommaSeparatedIdsField, ItemErrorsListSerializer
+from core.streaming import STREAM_CHUNK_SIZE, aiterate
 
-# Импорт модели Room из указанного пути (приложение rooms в директории src)
 # Импорт модели Booking из текущего пакета (файл models.py в той же директории)
 from .models import Booking
 
+# Ограничения календаря броней bookings/calendar/: номеров в запросе и дней в периоде
+MAX_CALENDAR_ROOMS = 500
+MAX_CALENDAR_DAYS = 366
+
 
 class BookingSerializer(serializers.ModelSerializer):
     """Сериализатор для модели Booking (бронь)."""
@@ -30,12 +39,70 @@ class BookingSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
 
+class BookingFastSerializer:
+    """Быстрый сериализатор броней только для чтения.
+
+    Строит словари прямо из кортежей values_list(), минуя ModelSerializer.
+    Результат совпадает с BookingSerializer(bookings, many=True).data.
+    """
+
+    # room в values_list() — это room_id, как у PrimaryKeyRelatedField
+    fields = BookingSerializer.Meta.fields
+
+    @classmethod
+    def iter_rows(cls, queryset: QuerySet, chunk_size: int | None = None) -> Iterator[dict]:
+        """Словари броней по одной; chunk_size — чтение серверным курсором порциями."""
+        rows = queryset.values_list(*cls.fields)
+        if chunk_size:
+            rows = rows.iterator(chunk_size=chunk_size)
+        return cls._format(rows)
+
+    @classmethod
+    def aiter_rows(cls, queryset: QuerySet, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[dict]:
+        """Асинхронный вариант iter_rows (см. RoomFastSerializer.aiter_rows)."""
+        return aiterate(cls.iter_rows(queryset, chunk_size=chunk_size), chunk_size)
+
+    @classmethod
+    def _format(cls, rows: Iterable[tuple]) -> Iterator[dict]:
+        tz = output_timezone()
+        for id_, room_id, date_start, date_end, created_at in rows:
+            yield {
+                "id": id_,
+                "room": room_id,
+                "date_start": format_date(date_start),
+                "date_end": format_date(date_end),
+                "created_at": format_datetime(created_at, tz),
+            }
+
+    @classmethod
+    def serialize(cls, queryset: QuerySet) -> list[dict]:
+        """Список словарей всех броней queryset."""
+        return list(cls.iter_rows(queryset))
+
+    @classmethod
+    def serialize_objects(cls, bookings: Iterable[Booking]) -> list[dict]:
+        """Список словарей уже загруженных броней (например, страницы keyset-пагинации)."""
+        return list(cls._format((b.id, b.room_id, b.date_start, b.date_end, b.created_at) for b in bookings))
+
+    @classmethod
+    async def aserialize(cls, queryset: QuerySet) -> list[dict]:
+        """Асинхронный вариант serialize."""
+        rows = [row async for row in queryset.values_list(*cls.fields)]
+        return list(cls._format(rows))
+
+
 class BookingCreateSerializer(serializers.ModelSerializer):
-    """Сериализатор для создания брони."""
+    """Сериализатор для создания брони.
+
+    room — просто id без запроса к БД: существование номера проверяет сервис
+    (INSERT брони, для пакета — один запрос на все номера).
+    """
 
     # Этот сериализатор используется только для СОЗДАНИЯ новых бронирований
     # Содержит пользовательскую валидацию для проверки корректности дат
 
+    room = serializers.IntegerField(min_value=1)
+
     class Meta:
         # Указываем модель Booking для сериализации
         model = Booking
@@ -58,9 +125,47 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         # Если валидация прошла успешно - возвращаем данные
         return data
 
-    def validate_room(self, room):
-        """Проверяет, что номер существует."""
-        # room уже будет объектом Room после первичной валидации
-        if not Room.objects.filter(id=room.id).exists():
-            raise serializers.ValidationError("Номер с указанным ID не существует")
-        return room
+
+class BookingBulkCreateSerializer(BookingCreateSerializer):
+    """Элемент пакетного создания броней (используется с many=True): ошибки — по элементам."""
+
+    class Meta(BookingCreateSerializer.Meta):
+        list_serializer_class = ItemErrorsListSerializer
+
+
+class BookingUpdateSerializer(serializers.Serializer):
+    """Изменение дат брони (PATCH): можно передать одну из дат, другая останется прежней.
+
+    Порядок дат, когда передана только одна, проверяет сервис: прежние даты читает тот же запрос,
+    что изменяет бронь.
+    """
+
+    date_start = serializers.DateField(required=False)
+    date_end = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError("Нужно указать date_start и/или date_end")
+        if "date_start" in data and "date_end" in data and data["date_start"] >= data["date_end"]:
+            raise serializers.ValidationError("Дата окончания должна быть позже даты начала")
+        return data
+
+
+class BookingCalendarParamsSerializer(serializers.Serializer):
+    """Параметры календаря броней (query string bookings/calendar/)."""
+
+    room_ids = CommaSeparatedIdsField(
+        max_ids=MAX_CALENDAR_ROOMS,
+        error_messages={"max_ids": "Не больше {max_ids} номеров в одном запросе"},
+        help_text="id номеров через запятую",
+    )
+    date_start = serializers.DateField()
+    date_end = serializers.DateField()
+
+    def validate(self, data):
+        """Проверка периода."""
+        if data["date_start"] >= data["date_end"]:
+            raise serializers.ValidationError("Дата окончания должна быть позже даты начала")
+        if (data["date_end"] - data["date_start"]).days > MAX_CALENDAR_DAYS:
+            raise serializers.ValidationError(f"Период календаря не может быть длиннее {MAX_CALENDAR_DAYS} дней")
+        return data
@@ -1,32 +1,409 @@
+from datetime import date
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from core.pagination import Page, apaginate, paginate
+from rooms import cache as rooms_cache
 from rooms.models import Room
 
 from .models import Booking
+from .occupancy import get_occupancy_index
+from .partitions import ARCHIVE_TABLE
+
+OVERLAP_ERROR_MESSAGE = "Номер уже забронирован на указанные даты"
+DATES_ERROR_MESSAGE = "Дата окончания должна быть позже даты начала"
+
+# SQLSTATE пересечения броней (exclusion_violation): его выдаёт триггер bookings_check_overlap
+# (миграции 0005, 0006), проверяющий брони номера в основной таблице и в архиве
+EXCLUSION_VIOLATION = "23P01"
+
+# SQLSTATE serialization_failure: FOR UPDATE строки, которую параллельная транзакция перенесла
+# в другой раздел, не перечитывает её, а завершается этой ошибкой
+SERIALIZATION_FAILURE = "40001"
+
+# Сколько раз update_booking повторяет запрос после SERIALIZATION_FAILURE
+UPDATE_BOOKING_ATTEMPTS = 3
+
+BOOKING_FIELDS = [field.attname for field in Booking._meta.concrete_fields]
+
+# Бронь вставляется одним запросом: строка появляется, только если номер существует,
+# а пересечение дат отсекает триггер bookings_check_overlap в самой БД
+INSERT_BOOKING_SQL = f"""
+    INSERT INTO {Booking._meta.db_table} (room_id, date_start, date_end, created_at)
+    SELECT id, %s, %s, %s FROM {Room._meta.db_table} WHERE id = %s
+    RETURNING {", ".join(BOOKING_FIELDS)}
+"""
+
+# Удаление брони одним запросом: RETURNING заменяет предварительную проверку существования
+# и отдаёт даты для индекса занятости
+DELETE_BOOKING_SQL = f"DELETE FROM {Booking._meta.db_table} WHERE id = %s RETURNING room_id, date_start, date_end"
+
+# Изменение дат брони одним запросом. old — текущая строка (заодно проверка существования),
+# заблокированная FOR UPDATE: параллельное изменение той же брони ждёт фиксации первого, и old
+# перечитывается уже с его датами — иначе не переданная дата затёрла бы чужое изменение.
+# new — итоговые даты (не переданная дата остаётся прежней) и свободен ли номер на них: NOT EXISTS
+# по другим броням номера (сама бронь исключена по id) выполняется как подзапрос по индексу
+# booking_room_dates_idx только в разделах с подходящими датами выезда. UPDATE применяется, только
+# если даты корректны и номер свободен. Строка ищется только по id: условие по дате выезда
+# проверялось бы по версии строки из снимка запроса и отбросило бы строку, изменённую параллельно.
+# Последний SELECT возвращает строку и тогда, когда UPDATE отклонён: прежние даты, итоговые
+# и поля обновлённой брони (NULL, если отклонён).
+UPDATE_BOOKING_SQL = f"""
+    WITH old AS (
+        SELECT id, room_id, date_start, date_end FROM {Booking._meta.db_table} WHERE id = %(id)s FOR UPDATE
+    ), new AS (
+        SELECT old.*, dates.new_start, dates.new_end, NOT EXISTS (
+            SELECT 1 FROM {Booking._meta.db_table} other
+            WHERE other.room_id = old.room_id AND other.id <> old.id
+              AND other.date_start < dates.new_end AND other.date_end > dates.new_start
+        ) AS is_free
+        FROM old, LATERAL (
+            SELECT coalesce(%(date_start)s::date, old.date_start) AS new_start,
+                   coalesce(%(date_end)s::date, old.date_end) AS new_end
+        ) dates
+    ), updated AS (
+        UPDATE {Booking._meta.db_table} b SET date_start = new.new_start, date_end = new.new_end
+        FROM new
+        WHERE b.id = %(id)s AND new.new_start < new.new_end AND new.is_free
+        RETURNING {", ".join(f"b.{field}" for field in BOOKING_FIELDS)}
+    )
+    SELECT new.room_id, new.date_start, new.date_end, new.new_start, new.new_end,
+           {", ".join(f"updated.{field}" for field in BOOKING_FIELDS)}
+    FROM new LEFT JOIN updated ON true
+"""
+
+# Сколько раз пакет вставляется заново, если параллельная бронь заняла даты его элементов
+BULK_CREATE_ATTEMPTS = 3
+
+# Какие элементы пакета пересекаются с уже существующими бронями: один запрос на весь пакет,
+# каждый элемент проверяется по индексу booking_room_dates_idx. Архив проверяется, как и в триггере
+# bookings_check_overlap: для текущих дат его разделы отсекаются условием по date_end
+BULK_OVERLAP_SQL = f"""
+    SELECT item.idx
+    FROM unnest(%s::int[], %s::bigint[], %s::date[], %s::date[]) AS item(idx, room_id, date_start, date_end)
+    WHERE EXISTS (
+        SELECT 1 FROM {Booking._meta.db_table} booking
+        WHERE booking.room_id = item.room_id AND booking.date_start < item.date_end AND booking.date_end > item.date_start
+    ) OR EXISTS (
+        SELECT 1 FROM {ARCHIVE_TABLE} booking
+        WHERE booking.room_id = item.room_id AND booking.date_start < item.date_end AND booking.date_end > item.date_start
+    )
+"""
+
+# Брони номеров за период одним запросом. LEFT JOIN от номеров отличает номер без броней от
+# несуществующего; брони ищутся по индексу booking_room_dates_idx только в разделах с датой выезда
+# после начала периода. Даты — сразу смещениями в днях от начала периода
+CALENDAR_SQL = f"""
+    SELECT room.id, booking.id, booking.date_start - %(date_start)s, booking.date_end - %(date_start)s
+    FROM {Room._meta.db_table} room
+    LEFT JOIN {Booking._meta.db_table} booking
+      ON booking.room_id = room.id AND booking.date_start < %(date_end)s AND booking.date_end > %(date_start)s
+    WHERE room.id = ANY(%(room_ids)s)
+    ORDER BY room.id, booking.date_start
+"""
+
+# Порядок броней номера: по дате заезда, id — для однозначности keyset-пагинации
+BOOKING_ORDERING = ["date_start", "id"]
+
+
+class BookingOverlapError(Exception):
+    """Номер уже забронирован на пересекающиеся даты."""
+
+
+class BookingDatesError(ValueError):
+    """Дата выезда не позже даты заезда."""
 
 
 class BookingService:
     """Сервис для работы с бронированиями."""
 
     @staticmethod
-    def create_booking(room_id: int, date_start: str, date_end: str) -> Booking:
-        """Создание новой брони."""
-        # Проверяем, существует ли номер
-        room = Room.objects.get(id=room_id)
+    def create_booking(room_id: int, date_start: date, date_end: date) -> Booking:
+        """Создание новой брони.
+
+        Один INSERT без предварительных SELECT: параллельные запросы не могут
+        забронировать номер дважды, потому что пересечения запрещены в БД. Индекс занятости
+        здесь не проверяется: он локален для процесса и не видит броней, удалённых другими
+        воркерами, поэтому отказ всегда решает БД.
+        """
+        try:
+            # Savepoint, чтобы ошибка вставки не ломала внешнюю транзакцию
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(INSERT_BOOKING_SQL, [date_start, date_end, timezone.now(), room_id])
+                row = cursor.fetchone()
+        except IntegrityError as e:
+            if getattr(e.__cause__, "pgcode", None) == EXCLUSION_VIOLATION:
+                raise BookingOverlapError(OVERLAP_ERROR_MESSAGE) from e
+            raise
 
-        overlapping_bookings = Booking.objects.filter(room=room, date_start__lt=date_end, date_end__gt=date_start)
-        if overlapping_bookings.exists():
-            raise Exception("Номер уже забронирован на указанные даты")
+        if row is None:
+            raise Room.DoesNotExist("Номер с указанным ID не существует")
 
-        # Создаем бронь
-        booking = Booking.objects.create(room=room, date_start=date_start, date_end=date_end)
+        booking = Booking.from_db(connection.alias, BOOKING_FIELDS, row)
+        # Закэшированная статистика цен свободных номеров на эти даты устаревает после фиксации транзакции
+        transaction.on_commit(partial(rooms_cache.invalidate_availability, [(date_start, date_end)]))
+        occupancy = get_occupancy_index()
+        if occupancy is not None:
+            # Raw INSERT не вызывает post_save, поэтому индекс обновляем явно (после фиксации транзакции)
+            transaction.on_commit(lambda: occupancy.add(booking.room_id, booking.date_start, booking.date_end))
         return booking
 
+    @staticmethod
+    async def acreate_booking(room_id: int, date_start: date, date_end: date) -> Booking:
+        """Асинхронное создание брони.
+
+        Вставка идёт сырым SQL через курсор, а у курсоров Django нет асинхронного API,
+        поэтому create_booking выполняется в потоке для синхронного кода (как и запросы async ORM).
+        """
+        return await sync_to_async(BookingService.create_booking)(room_id, date_start, date_end)
+
+    @staticmethod
+    def create_bookings(items: list[dict], atomic: bool = True) -> list[Booking | Exception | None]:
+        """Пакетное создание броней; items — словари {room, date_start, date_end}.
+
+        Возвращает список той же длины: созданная бронь или ошибка элемента
+        (Room.DoesNotExist, BookingOverlapError). При atomic=True ошибка любого элемента
+        отменяет весь пакет, и на месте корректных элементов возвращается None;
+        при atomic=False создаются все корректные элементы.
+
+        Пересечения внутри пакета выявляются в памяти (из пересекающихся элементов
+        создаётся первый), с существующими бронями — одним запросом, вставка —
+        одним bulk_create в транзакции. Если параллельная бронь заняла даты элемента
+        между проверкой и вставкой, пересечения проверяются заново и пакет вставляется
+        без отклонённых элементов.
+        """
+        results: list[Booking | Exception | None] = [None] * len(items)
+
+        room_ids = {item["room"] for item in items}
+        existing_rooms = set(Room.objects.filter(id__in=room_ids).values_list("id", flat=True))
+
+        # Пересечения внутри пакета: элемент сравнивается с уже принятыми элементами того же номера
+        accepted: dict[int, list[tuple[date, date]]] = {}
+        for index, item in enumerate(items):
+            room_id, date_start, date_end = item["room"], item["date_start"], item["date_end"]
+            if room_id not in existing_rooms:
+                results[index] = Room.DoesNotExist("Номер с указанным ID не существует")
+            elif any(start < date_end and end > date_start for start, end in accepted.get(room_id, [])):
+                results[index] = BookingOverlapError(OVERLAP_ERROR_MESSAGE)
+            else:
+                accepted.setdefault(room_id, []).append((date_start, date_end))
+
+        candidates = [index for index, result in enumerate(results) if result is None]
+        occupancy = get_occupancy_index()
+        # Если индекс занятости считает свободными все элементы, отдельный запрос пересечений
+        # не нужен: брони, созданные другими процессами, всё равно отсечёт триггер при вставке.
+        # Занятым по индексу элемент не отклоняется — это решает только запрос к БД
+        all_free = occupancy is not None and all(
+            occupancy.is_free(items[index]["room"], items[index]["date_start"], items[index]["date_end"])
+            for index in candidates
+        )
+        if candidates and not all_free:
+            BookingService.mark_overlaps(items, candidates, results)
+
+        for attempt in range(1, BULK_CREATE_ATTEMPTS + 1):
+            to_create = [index for index, result in enumerate(results) if result is None]
+            if not to_create or (atomic and len(to_create) < len(items)):
+                return results
+
+            bookings = [
+                Booking(
+                    room_id=items[index]["room"],
+                    date_start=items[index]["date_start"],
+                    date_end=items[index]["date_end"],
+                )
+                for index in to_create
+            ]
+            try:
+                with transaction.atomic():
+                    Booking.objects.bulk_create(bookings)
+                break
+            except IntegrityError as e:
+                if getattr(e.__cause__, "pgcode", None) != EXCLUSION_VIOLATION:
+                    raise
+                # Конкурентная бронь появилась между проверкой и вставкой (её отсёк триггер, savepoint
+                # откатил весь пакет): пересечения проверяются заново, и вставка повторяется без них
+                if not BookingService.mark_overlaps(items, to_create, results) or attempt == BULK_CREATE_ATTEMPTS:
+                    raise BookingOverlapError(OVERLAP_ERROR_MESSAGE) from e
+
+        for index, booking in zip(to_create, bookings, strict=True):
+            results[index] = booking
+
+        periods = [(booking.date_start, booking.date_end) for booking in bookings]
+        transaction.on_commit(partial(rooms_cache.invalidate_availability, periods))
+        if occupancy is not None:
+            # bulk_create не вызывает post_save, поэтому индекс обновляем явно
+            def add_to_index():
+                for booking in bookings:
+                    occupancy.add(booking.room_id, booking.date_start, booking.date_end)
+
+            transaction.on_commit(add_to_index)
+        return results
+
+    @staticmethod
+    def mark_overlaps(items: list[dict], indexes: list[int], results: list) -> int:
+        """Отмечает BookingOverlapError элементы items[indexes], пересекающиеся с бронями в БД (один запрос).
+
+        Возвращает количество отмеченных элементов.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                BULK_OVERLAP_SQL,
+                [
+                    indexes,
+                    [items[index]["room"] for index in indexes],
+                    [items[index]["date_start"] for index in indexes],
+                    [items[index]["date_end"] for index in indexes],
+                ],
+            )
+            overlapping = [index for (index,) in cursor.fetchall()]
+        for index in overlapping:
+            results[index] = BookingOverlapError(OVERLAP_ERROR_MESSAGE)
+        return len(overlapping)
+
     @staticmethod
     def delete_booking(booking_id: int) -> None:
-        """Удаление брони."""
-        Booking.objects.filter(id=booking_id).delete()
+        """Удаление брони одним DELETE ... RETURNING; для несуществующей — Booking.DoesNotExist."""
+        with connection.cursor() as cursor:
+            cursor.execute(DELETE_BOOKING_SQL, [booking_id])
+            row = cursor.fetchone()
+
+        if row is None:
+            raise Booking.DoesNotExist("Бронь не найдена")
+
+        transaction.on_commit(partial(rooms_cache.invalidate_availability, [row[1:]]))
+        occupancy = get_occupancy_index()
+        if occupancy is not None:
+            # Raw DELETE не вызывает post_delete, поэтому индекс обновляем явно (после фиксации транзакции)
+            transaction.on_commit(lambda: occupancy.remove(*row))
+
+    @staticmethod
+    async def adelete_booking(booking_id: int) -> None:
+        """Асинхронное удаление брони (сырой SQL выполняется в потоке для синхронного кода)."""
+        await sync_to_async(BookingService.delete_booking)(booking_id)
+
+    @staticmethod
+    def update_booking(booking_id: int, date_start: date | None = None, date_end: date | None = None) -> Booking:
+        """Изменение дат брони одним UPDATE ... WHERE NOT EXISTS; не переданная дата остаётся прежней.
+
+        Пересечение с другими бронями номера проверяется в том же запросе (сама бронь исключена),
+        поэтому между проверкой и изменением номер не может занять никто другой. Параллельное
+        изменение, которое успело зафиксироваться, отсекает триггер bookings_check_overlap,
+        а параллельные изменения одной брони выполняются по очереди (строка блокируется).
+        Несуществующая бронь — Booking.DoesNotExist, пересечение — BookingOverlapError,
+        выезд не позже заезда — BookingDatesError.
+        """
+        params = {"id": booking_id, "date_start": date_start, "date_end": date_end}
+        for attempt in range(1, UPDATE_BOOKING_ATTEMPTS + 1):
+            try:
+                # Savepoint, чтобы ошибка триггера не ломала внешнюю транзакцию
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(UPDATE_BOOKING_SQL, params)
+                    row = cursor.fetchone()
+                break
+            except IntegrityError as e:
+                if getattr(e.__cause__, "pgcode", None) == EXCLUSION_VIOLATION:
+                    raise BookingOverlapError(OVERLAP_ERROR_MESSAGE) from e
+                raise
+            except OperationalError as e:
+                # Бронь перенесли в другой раздел, пока запрос ждал блокировку: новый запрос
+                # (READ COMMITTED — новый снимок) найдёт её на новом месте
+                if getattr(e.__cause__, "pgcode", None) != SERIALIZATION_FAILURE or attempt == UPDATE_BOOKING_ATTEMPTS:
+                    raise
+
+        if row is None:
+            raise Booking.DoesNotExist("Бронь не найдена")
+        room_id, old_start, old_end, new_start, new_end, *fields = row
+        if new_start >= new_end:
+            raise BookingDatesError(DATES_ERROR_MESSAGE)
+        if fields[0] is None:
+            raise BookingOverlapError(OVERLAP_ERROR_MESSAGE)
+
+        booking = Booking.from_db(connection.alias, BOOKING_FIELDS, fields)
+        periods = [(old_start, old_end), (new_start, new_end)]
+        transaction.on_commit(partial(rooms_cache.invalidate_availability, periods))
+        occupancy = get_occupancy_index()
+        if occupancy is not None:
+            # Raw UPDATE не вызывает post_save, поэтому индекс обновляем явно (после фиксации транзакции)
+            def move_in_index():
+                occupancy.remove(room_id, old_start, old_end)
+                occupancy.add(room_id, new_start, new_end)
+
+            transaction.on_commit(move_in_index)
+        return booking
+
+    @staticmethod
+    async def aupdate_booking(booking_id: int, date_start: date | None = None, date_end: date | None = None) -> Booking:
+        """Асинхронное изменение дат брони (сырой SQL выполняется в потоке для синхронного кода)."""
+        return await sync_to_async(BookingService.update_booking)(booking_id, date_start, date_end)
+
+    @staticmethod
+    def get_calendar(room_ids: list[int], date_start: date, date_end: date) -> dict[int, dict[str, list[int]]]:
+        """Брони номеров, пересекающиеся с периодом [date_start, date_end), одним запросом.
+
+        Для каждого существующего номера из room_ids (несуществующих в результате нет) — колонки
+        броней в порядке дат заезда: booking_ids, start и end — смещения дат заезда и выезда
+        в днях от date_start (у броней, выходящих за период, меньше 0 или больше длины периода).
+        """
+        calendar: dict[int, dict[str, list[int]]] = {}
+        with connection.cursor() as cursor:
+            cursor.execute(CALENDAR_SQL, {"room_ids": room_ids, "date_start": date_start, "date_end": date_end})
+            for room_id, booking_id, start, end in cursor.fetchall():
+                room = calendar.get(room_id)
+                if room is None:
+                    room = calendar[room_id] = {"booking_ids": [], "start": [], "end": []}
+                if booking_id is not None:
+                    room["booking_ids"].append(booking_id)
+                    room["start"].append(start)
+                    room["end"].append(end)
+        return calendar
+
+    @staticmethod
+    async def aget_calendar(room_ids: list[int], date_start: date, date_end: date) -> dict[int, dict[str, list[int]]]:
+        """Асинхронный вариант get_calendar (сырой SQL выполняется в потоке для синхронного кода)."""
+        return await sync_to_async(BookingService.get_calendar)(room_ids, date_start, date_end)
+
+    @staticmethod
+    def get_room_bookings_version(room_id: int) -> int:
+        """Версия броней номера (одно чтение строки номера по PK).
+
+        Заодно проверяет существование номера: для несуществующего — Room.DoesNotExist.
+        """
+        return Room.objects.values_list("bookings_version", flat=True).get(id=room_id)
+
+    @staticmethod
+    async def aget_room_bookings_version(room_id: int) -> int:
+        """Асинхронный вариант get_room_bookings_version."""
+        return await Room.objects.values_list("bookings_version", flat=True).aget(id=room_id)
+
+    @staticmethod
+    def get_room_bookings_queryset(room_id: int, history: bool = False) -> QuerySet[Booking]:
+        """Queryset броней номера в порядке дат заезда.
+
+        По умолчанию — только текущие и будущие брони (выезд сегодня или позже): запрос читает
+        лишь разделы таблицы с такими датами выезда. history=True — все брони основной таблицы.
+        """
+        bookings = Booking.objects.filter(room_id=room_id)
+        if not history:
+            bookings = bookings.current(timezone.localdate())
+        return bookings.order_by(*BOOKING_ORDERING)
+
+    @staticmethod
+    def get_room_bookings(room_id: int, history: bool = False) -> list[Booking]:
+        """Получение списка броней для конкретного номера (по умолчанию — текущие и будущие)."""
+        return list(BookingService.get_room_bookings_queryset(room_id, history))
+
+    @staticmethod
+    def get_room_bookings_page(room_id: int, cursor: str | None, limit: int, history: bool = False) -> Page:
+        """Получение одной страницы броней номера (keyset-пагинация по дате заезда)."""
+        return paginate(BookingService.get_room_bookings_queryset(room_id, history), BOOKING_ORDERING, cursor, limit)
 
     @staticmethod
-    def get_room_bookings(room_id: int) -> list[Booking]:
-        """Получение списка броней для конкретного номера."""
-        bookings = Booking.objects.filter(room_id=room_id).order_by("date_start")
-        return list(bookings)
+    async def aget_room_bookings_page(room_id: int, cursor: str | None, limit: int, history: bool = False) -> Page:
+        """Асинхронный вариант get_room_bookings_page."""
+        return await apaginate(
+            BookingService.get_room_bookings_queryset(room_id, history), BOOKING_ORDERING, cursor, limit
+        )
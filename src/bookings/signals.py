@@ -0,0 +1,47 @@
+"""
+Обновление индекса занятости (bookings/occupancy.py) при изменении броней через ORM.
+
+Обработчики подключаются только при OCCUPANCY_INDEX_ENABLED: любой получатель
+post_delete заставляет Django перед удалением выбирать строки из БД.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from rooms.models import Room
+
+from .models import Booking
+from .occupancy import occupancy_index
+
+# Индекс меняется только после фиксации транзакции, чтобы откат не оставлял в нём лишних броней
+
+
+def booking_saved(sender, instance, created, **kwargs):
+    room_id, date_start, date_end = instance.room_id, instance.date_start, instance.date_end
+    if created:
+        transaction.on_commit(lambda: occupancy_index.add(room_id, date_start, date_end))
+    else:
+        # Прежние даты неизвестны — перечитываем маску номера целиком
+        transaction.on_commit(lambda: occupancy_index.refresh_room(room_id))
+
+
+def booking_deleted(sender, instance, **kwargs):
+    room_id, date_start, date_end = instance.room_id, instance.date_start, instance.date_end
+    transaction.on_commit(lambda: occupancy_index.remove(room_id, date_start, date_end))
+
+
+def room_deleted(sender, instance, **kwargs):
+    room_id = instance.id
+    transaction.on_commit(lambda: occupancy_index.remove_room(room_id))
+
+
+def connect_signals():
+    post_save.connect(booking_saved, sender=Booking, dispatch_uid="occupancy_booking_saved")
+    post_delete.connect(booking_deleted, sender=Booking, dispatch_uid="occupancy_booking_deleted")
+    post_delete.connect(room_deleted, sender=Room, dispatch_uid="occupancy_room_deleted")
+
+
+def disconnect_signals():
+    post_save.disconnect(sender=Booking, dispatch_uid="occupancy_booking_saved")
+    post_delete.disconnect(sender=Booking, dispatch_uid="occupancy_booking_deleted")
+    post_delete.disconnect(sender=Room, dispatch_uid="occupancy_room_deleted")
@@ -1,9 +1,20 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
+# Под ASGI основные эндпоинты обслуживают async-views (те же URL и ответы);
+# WSGI-воркеры их не импортируют
+if settings.ASYNC_VIEWS_ENABLED:
+    from . import async_views as api
+else:
+    api = views
+
 urlpatterns = [
-    path("create/", views.create_booking, name="booking-create"),
-    path("delete/<int:booking_id>/", views.delete_booking, name="booking-delete"),
-    path("list/<int:room_id>/", views.list_room_bookings, name="booking-list"),
+    path("create/", api.create_booking, name="booking-create"),
+    path("bulk_create/", views.bulk_create_bookings, name="booking-bulk-create"),
+    path("update/<int:booking_id>/", api.update_booking, name="booking-update"),
+    path("delete/<int:booking_id>/", api.delete_booking, name="booking-delete"),
+    path("list/<int:room_id>/", api.list_room_bookings, name="booking-list"),
+    path("calendar/", api.bookings_calendar, name="booking-calendar"),
 ]
@@ -1,24 +1,47 @@
+import hashlib
+from datetime import date
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
 # Импорт необходимых модулей из Django REST Framework
 from rest_framework import status  # HTTP статусы (200, 201, 404, etc.)
 from rest_framework.decorators import api_view  # Декоратор для создания API view
 from rest_framework.response import Response  # Класс для формирования HTTP ответов
 
+from core.idempotency import idempotent
+from core.pagination import parse_limit
+from core.serializers import BULK_MODES
+from core.streaming import STREAM_CHUNK_SIZE, get_stream_format, stream_rows
 from rooms.models import Room
 
 from .models import Booking
 
 # Импорт сериализаторов из текущего пакета
-from .serializers import BookingCreateSerializer, BookingSerializer
+from .serializers import (
+    BookingBulkCreateSerializer,
+    BookingCalendarParamsSerializer,
+    BookingCreateSerializer,
+    BookingFastSerializer,
+    BookingSerializer,
+    BookingUpdateSerializer,
+)
 
 # Импорт сервисного слоя для бизнес-логики бронирований
-from .services import BookingService
+from .services import BookingDatesError, BookingOverlapError, BookingService
+
+# Максимальный размер пакета bookings/bulk_create/
+BULK_CREATE_MAX_ITEMS = 1000
 
 
 @api_view(["POST"])  # Разрешаем только POST запросы к этой функции
+@idempotent("booking-create")  # Повтор с тем же Idempotency-Key получает сохранённый ответ
 def create_booking(request):
     """Создание новой брони."""
 
-    # Создаем сериализатор с данными из запроса
+    # Создаем сериализатор с данными из запроса. room проверяется как id без запроса к БД:
+    # существование номера проверяет сам INSERT (бронь вставляется только для существующего номера)
     serializer = BookingCreateSerializer(data=request.data)
 
     # Проверяем валидность данных (вызывает метод validate() из сериализатора)
@@ -26,13 +49,17 @@ def create_booking(request):
         try:
             # Если данные валидны, создаем бронирование через сервисный слой
             booking = BookingService.create_booking(
-                room_id=serializer.validated_data["room"].id,  # Извлекаем ID комнаты из объекта
+                room_id=serializer.validated_data["room"],
                 date_start=serializer.validated_data["date_start"],
                 date_end=serializer.validated_data["date_end"],
             )
             # Возвращаем успешный ответ с ID созданной брони
             return Response({"booking_id": booking.id}, status=status.HTTP_201_CREATED)
 
+        except Room.DoesNotExist as e:
+            # Тот же формат, что у ошибки поля сериализатора
+            return Response({"room": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+
         except Exception as e:
             # Обрабатываем ошибки бизнес-логики из сервиса
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -41,11 +68,73 @@ def create_booking(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _bulk_item_errors(error: Exception) -> dict:
+    """Ошибка элемента пакета в формате ошибок сериализатора."""
+    if isinstance(error, Room.DoesNotExist):
+        return {"room": [str(error)]}
+    return {"non_field_errors": [str(error)]}
+
+
+@api_view(["POST"])
+def bulk_create_bookings(request):
+    """Пакетное создание броней с результатом по каждому элементу.
+
+    Тело запроса — массив {room, date_start, date_end}. ?mode=atomic (по умолчанию) —
+    всё или ничего, ?mode=best_effort — создаются все корректные элементы.
+    """
+    mode = request.GET.get("mode", "atomic")
+    if mode not in BULK_MODES:
+        return Response(
+            {"error": f"Параметр mode должен быть одним из: {', '.join(BULK_MODES)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    serializer = BookingBulkCreateSerializer(
+        data=request.data, many=True, allow_empty=False, max_length=BULK_CREATE_MAX_ITEMS
+    )
+    if not serializer.is_valid():
+        # Ошибка самого списка (не массив, пустой, слишком длинный)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    items = serializer.validated_data
+    errors = dict(serializer.item_errors)
+    valid = [index for index, item in enumerate(items) if item is not None]
+
+    try:
+        created = {}
+        if valid and not (errors and mode == "atomic"):
+            results = BookingService.create_bookings([items[index] for index in valid], atomic=mode == "atomic")
+            for index, result in zip(valid, results, strict=True):
+                if isinstance(result, Exception):
+                    errors[index] = _bulk_item_errors(result)
+                elif result is not None:
+                    created[index] = result.id
+    except BookingOverlapError as e:
+        # Пересечение с бронью, созданной параллельно: пакет не создан целиком
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = []
+    for index in range(len(items)):
+        if index in created:
+            results.append({"index": index, "status": "created", "booking_id": created[index]})
+        elif index in errors:
+            results.append({"index": index, "status": "error", "errors": errors[index]})
+        else:
+            results.append({"index": index, "status": "skipped"})  # atomic: пакет отменён из-за других элементов
+
+    if not created:
+        response_status = status.HTTP_400_BAD_REQUEST
+    elif errors:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_201_CREATED
+    return Response({"created": len(created), "results": results}, status=response_status)
+
+
 @api_view(["DELETE"])
 def delete_booking(request, booking_id):
     try:
-        # Сначала проверяем существование брони
-        Booking.objects.get(id=booking_id)
+        # Один DELETE ... RETURNING: несуществующая бронь — Booking.DoesNotExist
         BookingService.delete_booking(booking_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
     except Booking.DoesNotExist:
@@ -54,24 +143,139 @@ def delete_booking(request, booking_id):
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(["PATCH"])
+def update_booking(request, booking_id):
+    """Изменение дат брони одним запросом к БД (вместо удаления и повторного создания).
+
+    Тело — date_start и/или date_end; в ответе — бронь с новыми датами.
+    """
+    serializer = BookingUpdateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        booking = BookingService.update_booking(booking_id, **serializer.validated_data)
+    except Booking.DoesNotExist:
+        return Response({"error": "Бронь не найдена"}, status=status.HTTP_404_NOT_FOUND)
+    except BookingDatesError as e:
+        # Тот же формат, что у ошибки validate() сериализатора
+        return Response({"non_field_errors": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+    except BookingOverlapError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(BookingSerializer(booking).data)
+
+
+def is_history(query_params) -> bool:
+    """Запрошены ли все брони номера (?history=1), а не только текущие и будущие."""
+    return query_params.get("history", "").lower() in ("1", "true")
+
+
+def bookings_etag(
+    query_params, room_id: int, version: int, renderer_format: str = "json", today: date | None = None
+) -> str:
+    """ETag списка броней: версия броней номера плюс параметры, от которых зависит тело ответа.
+
+    today — для списка текущих броней: он меняется и со сменой дня (закончившиеся брони выпадают).
+    """
+    etag = f"{room_id}.{version}"
+    if today is not None:
+        etag += f".{today:%Y%m%d}"
+    variant = sorted(query_params.items())
+    if variant or renderer_format != "json":
+        variant.append(("format", renderer_format))
+        etag += "." + hashlib.sha1(repr(variant).encode(), usedforsecurity=False).hexdigest()[:16]
+    return quote_etag(etag)
+
+
+def bookings_validators(query_params, room_id: int, version: int, renderer_format: str = "json") -> dict:
+    """Заголовки условных запросов списка броней.
+
+    Только ETag: Last-Modified с точностью до секунды не отличает изменения в ту же секунду,
+    и If-Modified-Since по нему отдавал бы 304 на устаревший список.
+    """
+    today = None if is_history(query_params) else timezone.localdate()
+    return {"ETag": bookings_etag(query_params, room_id, version, renderer_format, today)}
+
+
 @api_view(["GET"])  # Разрешаем только GET запросы
 def list_room_bookings(request, room_id):
-    """Получение списка броней для номера."""
+    """Получение списка броней для номера.
+
+    По умолчанию — текущие и будущие брони (выезд сегодня или позже), ?history=1 — все брони.
+
+    Поддерживает условные запросы: If-None-Match сверяется с версией
+    броней номера, и при совпадении возвращается 304 без чтения и сериализации броней.
+    """
     try:
-        # Сначала проверяем существование комнаты
-        Room.objects.get(id=room_id)
+        # Версия броней номера (заодно проверяем существование комнаты)
+        version = BookingService.get_room_bookings_version(room_id)
+        validators = bookings_validators(request.GET, room_id, version, request.accepted_renderer.format)
+        history = is_history(request.GET)
 
-        # Получаем список бронирований для конкретной комнаты через сервис
-        bookings = BookingService.get_room_bookings(room_id)
+        # Клиент уже получил эту версию списка — 304 без запроса броней
+        not_modified = get_conditional_response(request, etag=validators["ETag"])
+        if not_modified is not None:
+            for header, value in validators.items():
+                not_modified[header] = value
+            return not_modified
 
-        # Сериализуем данные (many=True для списка объектов)
-        serializer = BookingSerializer(bookings, many=True)
+        # Потоковая выдача всех броней (?stream=1 — JSON-массив, ?stream=ndjson — NDJSON)
+        stream_format = get_stream_format(request.GET)
+        if stream_format:
+            bookings = BookingService.get_room_bookings_queryset(room_id, history)
+            response = stream_rows(
+                BookingFastSerializer.iter_rows(bookings, chunk_size=STREAM_CHUNK_SIZE), stream_format
+            )
+            for header, value in validators.items():
+                response[header] = value
+            return response
+
+        # Постраничная выдача (?limit=&cursor=): курсор следующей страницы возвращается в "next"
+        if "limit" in request.GET or "cursor" in request.GET:
+            page = BookingService.get_room_bookings_page(
+                room_id, request.GET.get("cursor"), parse_limit(request.GET.get("limit")), history
+            )
+            return Response(
+                {"results": BookingFastSerializer.serialize_objects(page.items), "next": page.next_cursor},
+                headers=validators,
+            )
+
+        # Получаем список бронирований для конкретной комнаты через сервис
+        bookings = BookingService.get_room_bookings_queryset(room_id, history)
 
-        # Возвращаем сериализованные данные
-        return Response(serializer.data)
+        # Быстрая сериализация только для чтения: словари прямо из values_list(), без ModelSerializer
+        return Response(BookingFastSerializer.serialize(bookings), headers=validators)
 
     except Room.DoesNotExist:
         return Response({"error": "Комната не найдена"}, status=status.HTTP_404_NOT_FOUND)
 
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def calendar_data(room_ids: list[int], date_start: date, date_end: date, calendar: dict) -> dict:
+    """Тело ответа календаря: номера в порядке id и список несуществующих номеров."""
+    return {
+        "date_start": date_start.isoformat(),
+        "date_end": date_end.isoformat(),
+        "days": (date_end - date_start).days,
+        "rooms": [{"room_id": room_id, **bookings} for room_id, bookings in calendar.items()],
+        "not_found": [room_id for room_id in room_ids if room_id not in calendar],
+    }
+
+
+@api_view(["GET"])
+def bookings_calendar(request):
+    """Календарь броней нескольких номеров за период (?room_ids=1,2&date_start=&date_end=).
+
+    Один запрос к БД вместо bookings/list/ по каждому номеру. Брони номера — колонками:
+    booking_ids, start и end — смещения дат заезда и выезда в днях от date_start
+    (бронь занимает дни start..end-1 периода; выходящие за период брони не обрезаются).
+    """
+    params = BookingCalendarParamsSerializer(data=request.GET)
+    if not params.is_valid():
+        return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    calendar = BookingService.get_calendar(**params.validated_data)
+    return Response(calendar_data(**params.validated_data, calendar=calendar))
@@ -9,10 +9,23 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
+from core import settings as config
+
 # Загружаем настройки через наш конфиг
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.config.settings")
+
+# Под ASGI основные эндпоинты обслуживаются async-views, если ASYNC_VIEWS_ENABLED не задан явно
+if "ASYNC_VIEWS_ENABLED" not in config.model_fields_set:
+    settings.ASYNC_VIEWS_ENABLED = True
+
+# Под ASGI синхронный код запросов выполняется в потоках asgiref, а постоянные соединения привязаны
+# к потоку и не закрываются между запросами: без явного DB_CONN_MAX_AGE соединение закрывается после
+# каждого запроса (настройка меняется до того, как Django прочитает DATABASES)
+if "DB_CONN_MAX_AGE" not in config.model_fields_set:
+    settings.DATABASES["default"]["CONN_MAX_AGE"] = 0
 
 application = get_asgi_application()
@@ -0,0 +1,63 @@
+"""
+Адаптер для нативных async-views.
+
+@api_view DRF синхронный: под ASGI каждый запрос занимает поток, пока ждёт ответа
+PostgreSQL. async_api_view оборачивает корутину так же, как @api_view оборачивает
+функцию: проверяет HTTP-метод, разбирает тело в request.data парсерами
+DEFAULT_PARSER_CLASSES (JSON, form, multipart — как у синхронных views на тех же URL)
+и отключает CSRF. Ответы json_response кодируются json_dumps — байт в байт как у
+FastJSONRenderer. Browsable API async-views не поддерживают.
+"""
+
+import functools
+
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .renderers import json_dumps
+
+# Методы, у которых DRF разбирает тело запроса
+METHODS_WITH_BODY = ("POST", "PUT", "PATCH")
+
+
+def json_response(data=None, status: int = 200, headers: dict | None = None) -> HttpResponse:
+    """JSON-ответ (без тела, если data is None — как Response DRF)."""
+    body = b"" if data is None else json_dumps(data)
+    return HttpResponse(body, status=status, content_type="application/json", headers=headers)
+
+
+def parse_body(request) -> dict:
+    """Тело запроса, разобранное парсером DEFAULT_PARSER_CLASSES по Content-Type (как request.data в DRF)."""
+    parsers = [parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]
+    return Request(request, parsers=parsers).data
+
+
+def async_api_view(http_method_names: list[str]):
+    """Аналог @api_view для async def-функций."""
+
+    def decorator(func):
+        @csrf_exempt
+        @functools.wraps(func)
+        async def view(request, *args, **kwargs):
+            if request.method not in http_method_names:
+                return json_response(
+                    {"detail": f'Метод "{request.method}" не разрешен.'},
+                    status=405,
+                    headers={"Allow": ", ".join(http_method_names)},
+                )
+
+            request.data = {}
+            if request.method in METHODS_WITH_BODY and request.body:
+                try:
+                    request.data = parse_body(request)
+                except (ParseError, UnsupportedMediaType) as e:
+                    return json_response({"detail": e.detail}, status=e.status_code)
+
+            return await func(request, *args, **kwargs)
+
+        return view
+
+    return decorator
@@ -0,0 +1,36 @@
+"""
+COPY через курсор Django для обоих драйверов PostgreSQL.
+
+С psycopg2 (по умолчанию) данные копируются методом copy_expert(), с psycopg 3
+(нужен для DB_POOL) — через cursor.copy(). Параметры запроса COPY подставляются
+на стороне клиента: серверные параметры COPY не поддерживает.
+"""
+
+from typing import IO
+
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+# Сколько данных за раз передаётся в COPY FROM STDIN с psycopg 3
+COPY_BLOCK_SIZE = 64 * 1024
+
+
+def copy_from(cursor, sql: str, source: IO) -> None:
+    """Выполняет COPY ... FROM STDIN, читая данные из файлового объекта source."""
+    if not is_psycopg3:
+        cursor.copy_expert(sql, source)
+        return
+
+    with cursor.copy(sql) as copy:
+        while data := source.read(COPY_BLOCK_SIZE):
+            copy.write(data)
+
+
+def copy_to(cursor, sql: str, params: list, target: IO[bytes]) -> None:
+    """Выполняет COPY ... TO STDOUT с параметрами params, записывая данные в target."""
+    if not is_psycopg3:
+        cursor.copy_expert(cursor.mogrify(sql, params), target)
+        return
+
+    with cursor.copy(sql, params) as copy:
+        for data in copy:
+            target.write(data)
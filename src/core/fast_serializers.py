@@ -0,0 +1,42 @@
+"""
+Форматирование значений для быстрых сериализаторов только для чтения.
+
+Функции повторяют to_representation полей DRF при настройках по умолчанию
+(ISO 8601, COERCE_DECIMAL_TO_STRING), но без создания объектов полей на каждую строку.
+"""
+
+from datetime import date, datetime, tzinfo
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+
+def output_timezone() -> tzinfo | None:
+    """Часовой пояс, в который DRF переводит datetime при выводе (None при USE_TZ=False)."""
+    return timezone.get_current_timezone() if settings.USE_TZ else None
+
+
+def format_datetime(value: datetime | None, tz: tzinfo | None) -> str | None:
+    """Как serializers.DateTimeField().to_representation()."""
+    if value is None:
+        return None
+    if tz is not None:
+        value = value.astimezone(tz)
+    elif timezone.is_aware(value):
+        value = timezone.make_naive(value, dt_timezone.utc)
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def format_date(value: date | None) -> str | None:
+    """Как serializers.DateField().to_representation()."""
+    return None if value is None else value.isoformat()
+
+
+def format_decimal(value: Decimal | None) -> str | None:
+    """Как serializers.DecimalField().to_representation() для значения из БД (масштаб уже задан столбцом)."""
+    return None if value is None else f"{value:f}"
@@ -0,0 +1,163 @@
+"""
+Конфигурация gunicorn для production. Запуск из src/:
+    gunicorn -c python:core.gunicorn_config
+
+Параметры берутся из DjangoSettings (переменные GUNICORN_*, см. .env.example):
+- GUNICORN_WORKER_CLASS=sync|gthread — WSGI (core.wsgi), uvicorn — ASGI (core.asgi, async-views;
+  нужен пакет uvicorn);
+- GUNICORN_WORKERS / GUNICORN_THREADS — по умолчанию от числа ядер. Каждый поток держит своё
+  постоянное соединение с БД: workers * threads не должно превышать max_connections PostgreSQL;
+- GUNICORN_PRELOAD — приложение импортируется один раз в master-процессе, воркеры получают
+  его fork-ом и делят память copy-on-write;
+- GUNICORN_MAX_REQUESTS (+ JITTER) — воркер перезапускается после стольких запросов, случайная
+  добавка не даёт всем воркерам перезапуститься одновременно.
+
+Воркер начинает принимать запросы прогретым (core/warmup.py): URL-резолвер, сериализаторы
+и переводы готовятся в master (с preload) или в воркере, соединения с БД — в потоках воркера.
+
+Плавный перезапуск: kill -HUP <master> запускает новых воркеров, старые дообслуживают начатые
+запросы (до GUNICORN_GRACEFUL_TIMEOUT секунд). С GUNICORN_PRELOAD код приложения при HUP не
+перечитывается: новую версию кода выкатывает kill -USR2 <master> (новый master рядом со старым),
+затем kill -TERM <старый master>.
+
+Кэш списка и статистики номеров (rooms/cache.py) без CACHE_URL живёт в памяти процесса: при
+нескольких воркерах он отключается (ROOMS_CACHE_ENABLED=False), иначе воркеры отдавали бы
+устаревшие списки и 304 после изменений, сделанных в другом воркере.
+
+Метрики (core/metrics.py) копятся в памяти воркера: при нескольких воркерах без METRICS_DIR
+создаётся временный каталог, куда воркеры сохраняют свои значения, и /metrics отдаёт их сумму.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+
+import core.config.settings as settings_module
+from core.config.settings import settings
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "uvicorn": "uvicorn.workers.UvicornWorker",
+}
+
+wsgi_app = "core.asgi:application" if settings.GUNICORN_WORKER_CLASS == "uvicorn" else "core.wsgi:application"
+worker_class = WORKER_CLASSES[settings.GUNICORN_WORKER_CLASS]
+
+bind = settings.GUNICORN_BIND
+workers = settings.GUNICORN_WORKERS
+threads = settings.GUNICORN_THREADS
+preload_app = settings.GUNICORN_PRELOAD
+
+max_requests = settings.GUNICORN_MAX_REQUESTS
+max_requests_jitter = settings.GUNICORN_MAX_REQUESTS_JITTER
+timeout = settings.GUNICORN_TIMEOUT
+graceful_timeout = settings.GUNICORN_GRACEFUL_TIMEOUT
+keepalive = settings.GUNICORN_KEEPALIVE
+
+# Модуль настроек Django ещё не прочитан (django.setup() позже), поэтому значение подменяется в нём
+shared_cache = workers == 1 or bool(settings.CACHE_URL)
+if not shared_cache:
+    settings_module.ROOMS_CACHE_ENABLED = False
+
+# Heartbeat-файлы воркеров в памяти: в контейнере /tmp может быть на медленном overlay-диске
+shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+if shm_dir:
+    worker_tmp_dir = shm_dir
+
+# Каталог создаётся в on_starting, а в модуль настроек Django путь попадает до загрузки приложения
+metrics_dir = settings.METRICS_DIR
+temporary_metrics_dir = workers > 1 and not metrics_dir
+if temporary_metrics_dir:
+    metrics_dir = os.path.join(shm_dir or tempfile.gettempdir(), f"metrics-{os.getpid()}")
+    settings_module.METRICS_DIR = metrics_dir
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """Значения метрик прошлого запуска не должны попасть в сумму."""
+    if metrics_dir:
+        from core import metrics
+
+        os.makedirs(metrics_dir, exist_ok=True)
+        metrics.clear(metrics_dir)
+
+
+def on_exit(server):
+    if temporary_metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def when_ready(server):
+    """С preload — прогрев приложения в master: воркеры получают его готовым (copy-on-write)."""
+    if not shared_cache:
+        server.log.warning("Кэш номеров отключён: %s воркеров без общего кэша, задайте CACHE_URL=redis://...", workers)
+    if preload_app:
+        from core.warmup import warm_app
+
+        warm_app()
+
+
+def pre_fork(server, worker):
+    """Соединения с БД, открытые в master при загрузке приложения, не должны наследоваться воркерами."""
+    if preload_app:
+        from django.db import connections
+
+        connections.close_all()
+
+
+def worker_exit(server, worker):
+    """Последние значения метрик воркера сохраняются перед выходом."""
+    if metrics_dir:
+        from core import metrics
+
+        metrics.flush(metrics_dir)
+
+
+def child_exit(server, worker):
+    """Значения метрик завершившегося воркера master переносит в архив."""
+    if metrics_dir:
+        from core import metrics
+
+        metrics.archive_process(metrics_dir, worker.pid)
+
+
+def post_worker_init(worker):
+    """Прогрев воркера до приёма запросов: приложение (без preload), индекс занятости, соединения с БД;
+    с METRICS_DIR — фоновое сохранение метрик воркера.
+
+    Соединения Django привязаны к потоку: у sync-воркера запросы идут в его основном потоке,
+    у gthread — в потоках пула, поэтому каждый поток пула открывает своё соединение заранее.
+    Воркер uvicorn выполняет ORM в потоке asgiref, соединение откроется при первом запросе.
+    """
+    from django.db import connections
+
+    from core.warmup import warm_app, warm_connections, warm_occupancy_index
+
+    if not preload_app:
+        warm_app()
+    warm_occupancy_index()
+    if metrics_dir:
+        from core import metrics
+
+        metrics.start_flushing(metrics_dir)
+
+    if worker_class == "sync":
+        warm_connections()
+        return
+
+    connections.close_all()  # соединение основного потока (после индекса занятости) не используется
+    pool = getattr(worker, "tpool", None)
+    if pool is not None:
+        # Барьер: каждая задача занимает свой поток пула, пока все не начнут выполняться
+        barrier = threading.Barrier(threads)
+
+        def warm_thread():
+            barrier.wait(timeout=timeout)
+            warm_connections()
+
+        for future in [pool.submit(warm_thread) for _ in range(threads)]:
+            future.result()
@@ -0,0 +1,168 @@
+"""
+Идемпотентные POST-запросы по заголовку Idempotency-Key.
+
+Клиент, повторяющий запрос после таймаута, передаёт тот же ключ: повтор получает
+сохранённый ответ первого запроса (с заголовком Idempotent-Replayed: true), а
+сервис второй раз не вызывается. Ключ занимается и ищется одним запросом
+INSERT ... ON CONFLICT по уникальному индексу (scope, key).
+
+Занятие ключа, view и сохранение ответа выполняются в одной транзакции: если процесс
+упал (например, воркер убит по таймауту) или ответ не сохранился, откатываются и ключ,
+и изменения view — повтор выполнится заново, а не получит ошибку на сутки.
+
+- тот же ключ с другим телом запроса — 422;
+- первый запрос с этим ключом ещё выполняется — повтор ждёт его завершения на вставке
+  ключа (строка ещё не зафиксирована) и получает его ответ;
+- ответы 5xx и исключения не сохраняются: транзакция откатывается, повтор выполнится заново;
+- через IDEMPOTENCY_KEY_TTL секунд ключ можно использовать снова
+  (устаревшие записи удаляет команда purge_idempotency_keys).
+"""
+
+import functools
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.functions import Now
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .async_views import json_response
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+
+# Вставка нового ключа или чтение существующего одним запросом: при конфликте фиктивный
+# DO UPDATE возвращает существующую строку (xmax = 0 только у только что вставленной)
+CLAIM_SQL = f"""
+    INSERT INTO {IdempotencyKey._meta.db_table} (scope, key, request_hash) VALUES (%s, %s, %s)
+    ON CONFLICT (scope, key) DO UPDATE SET scope = EXCLUDED.scope
+    RETURNING id, xmax = 0, request_hash, status_code, response, created_at
+"""
+
+
+@dataclass
+class StoredResponse:
+    """Ответ без выполнения view: сохранённый (replayed) или ошибка ключа."""
+
+    status: int
+    data: Any
+    replayed: bool = False
+
+    @property
+    def headers(self) -> dict | None:
+        return {REPLAYED_HEADER: "true"} if self.replayed else None
+
+
+def request_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def begin(scope: str, key: str, body: bytes) -> int | StoredResponse:
+    """Занимает ключ; возвращает id записи, если view нужно выполнить, иначе готовый ответ."""
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return StoredResponse(
+            400, {"error": f"{IDEMPOTENCY_HEADER} должен содержать от 1 до {MAX_KEY_LENGTH} символов"}
+        )
+
+    digest = request_hash(body)
+    with connection.cursor() as cursor:
+        cursor.execute(CLAIM_SQL, [scope, key, digest])
+        record_id, created, stored_hash, status_code, response, created_at = cursor.fetchone()
+
+    if created:
+        return record_id
+
+    expired = created_at < timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    # Зафиксированный ключ без ответа мог оставить только прежний порядок работы (ключ занимался
+    # отдельной транзакцией до view): запрос, занявший его, уже не выполняется
+    if expired or status_code is None:
+        # Занимаем ключ заново (условие на created_at — от гонки двух таких повторов)
+        reclaimed = IdempotencyKey.objects.filter(id=record_id, created_at=created_at).update(
+            request_hash=digest, status_code=None, response=None, created_at=Now()
+        )
+        if reclaimed:
+            return record_id
+        status_code = None
+
+    if stored_hash != digest:
+        return StoredResponse(422, {"error": f"{IDEMPOTENCY_HEADER} уже использован с другим телом запроса"})
+    if status_code is None:
+        # Ключ занял параллельный повтор того же устаревшего ключа
+        return StoredResponse(409, {"error": f"Запрос с этим {IDEMPOTENCY_HEADER} ещё выполняется"})
+
+    # Сырой курсор отдаёт jsonb строкой (Django отключает разбор JSON в psycopg)
+    data = json.loads(response) if isinstance(response, str) else response
+    return StoredResponse(status_code, data, replayed=True)
+
+
+def finish(record_id: int, status: int, data: Any) -> None:
+    """Сохраняет ответ view; ответ 5xx откатывает транзакцию запроса (и ключ, и изменения view)."""
+    if status >= 500:
+        transaction.set_rollback(True)
+    else:
+        IdempotencyKey.objects.filter(id=record_id).update(status_code=status, response=data)
+
+
+def idempotent(scope: str):
+    """Поддержка Idempotency-Key для view (под @api_view или @async_api_view).
+
+    scope отделяет ключи разных эндпоинтов. Запросы без заголовка выполняются как обычно.
+    """
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                key = request.headers.get(IDEMPOTENCY_HEADER)
+                if key is None:
+                    return await view(request, *args, **kwargs)
+
+                # Транзакция открывается и закрывается в потоке для синхронного кода: под ASGI
+                # все thread-sensitive вызовы запроса (в том числе async ORM во view) идут в один
+                # поток и одно соединение с БД
+                atomic = transaction.atomic()
+                await sync_to_async(atomic.__enter__)()
+                try:
+                    outcome = await sync_to_async(begin)(scope, key, request.body)
+                    if isinstance(outcome, StoredResponse):
+                        response = json_response(outcome.data, status=outcome.status, headers=outcome.headers)
+                    else:
+                        response = await view(request, *args, **kwargs)
+                        data = json.loads(response.content) if response.content else None
+                        await sync_to_async(finish)(outcome, response.status_code, data)
+                except BaseException as e:
+                    await sync_to_async(atomic.__exit__)(type(e), e, e.__traceback__)
+                    raise
+                await sync_to_async(atomic.__exit__)(None, None, None)
+                return response
+
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if key is None:
+                return view(request, *args, **kwargs)
+
+            with transaction.atomic():
+                outcome = begin(scope, key, request.body)
+                if isinstance(outcome, StoredResponse):
+                    return Response(outcome.data, status=outcome.status, headers=outcome.headers)
+
+                response = view(request, *args, **kwargs)
+                finish(outcome, response.status_code, response.data)
+                return response
+
+        return wrapper
+
+    return decorator
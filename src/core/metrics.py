@@ -0,0 +1,334 @@
+"""
+Метрики запросов в формате Prometheus.
+
+Для каждого запроса считаются SQL-запросы и время в БД (execute_wrapper на всех
+соединениях), время сериализации ответа в JSON (json_dumps) и полное время
+обработки. Счётчики запроса хранятся в ContextVar, поэтому запросы из
+sync_to_async (async-views) попадают в тот же запрос.
+
+Тело потокового ответа (StreamingHttpResponse) выдаётся уже после выхода из view:
+iter_in_request / aiter_in_request засчитывают работу над каждой порцией в тот же
+запрос, а middleware записывает метрики, когда поток закончился.
+
+Метрики копятся в памяти процесса. При нескольких воркерах gunicorn задаётся METRICS_DIR
+(core/gunicorn_config.py создаёт его сам): каждый воркер раз в FLUSH_INTERVAL секунд
+и при завершении сохраняет свои значения в файл <pid>.json, значения завершившихся
+воркеров master переносит в archive.json, а /metrics в любом воркере отдаёт их сумму.
+"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Границы корзин гистограмм: время в секундах и количество SQL-запросов
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Как часто воркер сохраняет свои значения в METRICS_DIR (секунды)
+FLUSH_INTERVAL = 5.0
+
+# Значения завершившихся процессов в METRICS_DIR
+ARCHIVE_FILE = "archive.json"
+
+
+@dataclass
+class RequestStats:
+    """Счётчики одного запроса."""
+
+    queries: int = 0
+    db_time: float = 0.0
+    serialization_time: float = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def start_request() -> tuple[RequestStats, object]:
+    """Начинает сбор счётчиков запроса; возвращает счётчики и токен для finish_request."""
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def finish_request(token) -> None:
+    _current.reset(token)
+
+
+def iter_in_request(iterator: Iterable, stats: RequestStats) -> Iterator:
+    """Элементы iterator; SQL-запросы и сериализация при получении каждого засчитываются в stats."""
+    iterator = iter(iterator)
+    while True:
+        token = _current.set(stats)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _current.reset(token)
+        yield item
+
+
+async def aiter_in_request(iterator: AsyncIterable, stats: RequestStats) -> AsyncIterator:
+    """Асинхронный вариант iter_in_request."""
+    iterator = aiter(iterator)
+    while True:
+        token = _current.set(stats)
+        try:
+            item = await anext(iterator)
+        except StopAsyncIteration:
+            return
+        finally:
+            _current.reset(token)
+        yield item
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    """Считает SQL-запросы и время их выполнения в счётчиках текущего запроса."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def _install_wrapper(connection, **kwargs) -> None:
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+def install_db_instrumentation() -> None:
+    """Подключает execute_wrapper к уже открытым соединениям потока и ко всем новым."""
+    connection_created.connect(_install_wrapper, dispatch_uid="core.metrics")
+    for connection in connections.all(initialized_only=True):
+        _install_wrapper(connection)
+
+
+@contextmanager
+def track_serialization() -> Iterator[None]:
+    """Засчитывает время блока в сериализацию текущего запроса."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialization_time += time.perf_counter() - started
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Счётчик Prometheus с метками."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name, self.documentation, self.labels = name, documentation, labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def snapshot(self) -> list:
+        """Значения для сохранения в JSON: пары [значения меток, значение]."""
+        with self._lock:
+            return [[list(label_values), value] for label_values, value in self._values.items()]
+
+    @staticmethod
+    def merge(values: dict, snapshot: list) -> None:
+        """Прибавляет значения snapshot к values."""
+        for label_values, value in snapshot:
+            key = tuple(label_values)
+            values[key] = values.get(key, 0) + value
+
+    def samples(self, values: dict | None = None) -> Iterator[str]:
+        """Строки метрики: значения процесса или переданные values (сумма по процессам)."""
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Histogram:
+    """Гистограмма Prometheus с метками (накопительные корзины, сумма и количество)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (), buckets=DURATION_BUCKETS):
+        self.name, self.documentation, self.labels = name, documentation, labels
+        self.buckets = tuple(buckets)
+        self._values: dict[tuple, tuple[list[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        with self._lock:
+            counts, total = self._values.get(label_values) or ([0] * (len(self.buckets) + 1), 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1  # корзина +Inf, она же количество наблюдений
+            self._values[label_values] = (counts, total + value)
+
+    def snapshot(self) -> list:
+        """Значения для сохранения в JSON: пары [значения меток, [корзины, сумма]]."""
+        with self._lock:
+            return [
+                [list(label_values), [list(counts), total]] for label_values, (counts, total) in self._values.items()
+            ]
+
+    @staticmethod
+    def merge(values: dict, snapshot: list) -> None:
+        """Прибавляет значения snapshot к values (корзины поэлементно)."""
+        for label_values, (counts, total) in snapshot:
+            key = tuple(label_values)
+            if key in values:
+                merged, merged_total = values[key]
+                counts = [a + b for a, b in zip(merged, counts, strict=True)]
+                total += merged_total
+            values[key] = (counts, total)
+
+    def samples(self, values: dict | None = None) -> Iterator[str]:
+        """Строки метрики: значения процесса или переданные values (сумма по процессам)."""
+        if values is None:
+            with self._lock:
+                values = {labels: (list(counts), total) for labels, (counts, total) in self._values.items()}
+        for label_values, (counts, total) in sorted(values.items()):
+            for bound, count in zip([*self.buckets, "+Inf"], counts, strict=True):
+                le = f'le="{bound if bound == "+Inf" else _format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labels, label_values)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labels, label_values)} {counts[-1]}"
+
+
+REQUESTS = Counter("http_requests_total", "Количество HTTP-запросов", ("view", "method", "status"))
+REQUEST_DURATION = Histogram("http_request_duration_seconds", "Полное время обработки запроса", ("view", "method"))
+DB_QUERIES = Histogram(
+    "http_request_db_queries", "Количество SQL-запросов за запрос", ("view", "method"), buckets=QUERY_COUNT_BUCKETS
+)
+DB_DURATION = Histogram("http_request_db_duration_seconds", "Время SQL-запросов за запрос", ("view", "method"))
+SERIALIZATION_DURATION = Histogram(
+    "http_request_serialization_duration_seconds", "Время сериализации ответа в JSON", ("view", "method")
+)
+OVER_QUERY_BUDGET = Counter(
+    "http_requests_over_query_budget_total", "Запросы, превысившие бюджет SQL-запросов", ("view", "method")
+)
+
+REGISTRY = [REQUESTS, REQUEST_DURATION, DB_QUERIES, DB_DURATION, SERIALIZATION_DURATION, OVER_QUERY_BUDGET]
+
+
+@contextmanager
+def _locked(directory: str, exclusive: bool) -> Iterator[None]:
+    """Блокировка METRICS_DIR: архив переносится под исключительной, читается под разделяемой."""
+    with open(Path(directory) / ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+
+
+def _write(path: Path, data: dict) -> None:
+    # Запись во временный файл и переименование: читатель видит файл целиком
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_text(json.dumps(data))
+    os.replace(temporary, path)
+
+
+def _collect(paths: Iterable[Path]) -> dict[str, dict]:
+    """Сумма значений метрик из файлов процессов."""
+    values = {metric.name: {} for metric in REGISTRY}
+    for path in paths:
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            continue
+        for metric in REGISTRY:
+            metric.merge(values[metric.name], data.get(metric.name, []))
+    return values
+
+
+def flush(directory: str) -> None:
+    """Сохраняет значения метрик процесса в файл <pid>.json в directory."""
+    _write(Path(directory) / f"{os.getpid()}.json", {metric.name: metric.snapshot() for metric in REGISTRY})
+
+
+def start_flushing(directory: str, interval: float = FLUSH_INTERVAL) -> None:
+    """Запускает фоновый поток, сохраняющий значения процесса каждые interval секунд."""
+
+    def run():
+        while True:
+            time.sleep(interval)
+            flush(directory)
+
+    threading.Thread(target=run, name="metrics-flush", daemon=True).start()
+
+
+def archive_process(directory: str, pid: int) -> None:
+    """Переносит значения завершившегося процесса pid в архив: счётчики не должны убывать."""
+    path = Path(directory) / f"{pid}.json"
+    archive = Path(directory) / ARCHIVE_FILE
+    with _locked(directory, exclusive=True):
+        if not path.exists():
+            return
+        values = _collect([archive, path])
+        _write(
+            archive,
+            {name: [[list(labels), value] for labels, value in items.items()] for name, items in values.items()},
+        )
+        path.unlink()
+
+
+def clear(directory: str) -> None:
+    """Удаляет значения прошлого запуска сервера из directory."""
+    for path in Path(directory).glob("*.json"):
+        path.unlink()
+
+
+def render_metrics() -> str:
+    """Все метрики в текстовом формате Prometheus (version 0.0.4).
+
+    С METRICS_DIR — сумма по всем процессам (значения текущего сохраняются перед чтением).
+    """
+    values = None
+    if settings.METRICS_DIR:
+        flush(settings.METRICS_DIR)
+        with _locked(settings.METRICS_DIR, exclusive=False):
+            values = _collect(Path(settings.METRICS_DIR).glob("*.json"))
+
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples(values[metric.name] if values is not None else None))
+    return "\n".join(lines) + "\n"
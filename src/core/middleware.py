@@ -0,0 +1,118 @@
+"""
+Middleware метрик запросов: Server-Timing, гистограммы Prometheus и бюджет SQL-запросов.
+"""
+
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """Считает SQL-запросы, время в БД, время сериализации и полное время каждого запроса.
+
+    Значения попадают в гистограммы /metrics (с меткой имени view из urls.py) и,
+    если включён SERVER_TIMING_ENABLED, в заголовок Server-Timing ответа. Запрос,
+    выполнивший больше QUERY_BUDGET SQL-запросов, логируется предупреждением.
+    Должен стоять первым в MIDDLEWARE, чтобы полное время включало остальные middleware.
+
+    У потокового ответа тело читается из БД и сериализуется уже после выхода из view:
+    метрики записываются, когда поток закончился (или закрыт), а Server-Timing не
+    отправляется — заголовки уходят клиенту раньше, чем известно время.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        metrics.install_db_instrumentation()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        stats, token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        return self.process(request, response, stats, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        stats, token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        return self.process(request, response, stats, started)
+
+    def process(self, request, response, stats: metrics.RequestStats, started: float):
+        if response.streaming:
+            response.streaming_content = self.stream(request, response, stats, started)
+            return response
+
+        duration = time.perf_counter() - started
+        self.observe(request, response, stats, duration)
+        if settings.SERVER_TIMING_ENABLED:
+            response["Server-Timing"] = (
+                f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} SQL", '
+                f"ser;dur={stats.serialization_time * 1000:.2f}, "
+                f"total;dur={duration * 1000:.2f}"
+            )
+        return response
+
+    def stream(self, request, response, stats: metrics.RequestStats, started: float):
+        """Тело потокового ответа: порции считаются в запрос, метрики — после последней порции."""
+        content = response.streaming_content
+
+        if response.is_async:
+
+            async def observed():
+                try:
+                    async for chunk in metrics.aiter_in_request(content, stats):
+                        yield chunk
+                finally:
+                    self.observe(request, response, stats, time.perf_counter() - started)
+
+        else:
+
+            def observed():
+                try:
+                    yield from metrics.iter_in_request(content, stats)
+                finally:
+                    self.observe(request, response, stats, time.perf_counter() - started)
+
+        return observed()
+
+    def observe(self, request, response, stats: metrics.RequestStats, duration: float) -> None:
+        view = request.resolver_match.view_name if request.resolver_match else "unmatched"
+        labels = (view, request.method)
+
+        metrics.REQUESTS.inc(*labels, response.status_code)
+        metrics.REQUEST_DURATION.observe(duration, *labels)
+        metrics.DB_QUERIES.observe(stats.queries, *labels)
+        metrics.DB_DURATION.observe(stats.db_time, *labels)
+        metrics.SERIALIZATION_DURATION.observe(stats.serialization_time, *labels)
+
+        budget = settings.QUERY_BUDGET
+        if budget and stats.queries > budget:
+            metrics.OVER_QUERY_BUDGET.inc(*labels)
+            logger.warning(
+                "%s %s (%s): %d SQL-запросов при бюджете %d",
+                request.method,
+                request.path,
+                view,
+                stats.queries,
+                budget,
+            )
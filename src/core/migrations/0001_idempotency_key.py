@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:29
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="IdempotencyKey",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("scope", models.CharField(max_length=50, verbose_name="Эндпоинт")),
+                ("key", models.CharField(max_length=255, verbose_name="Ключ")),
+                ("request_hash", models.CharField(max_length=64, verbose_name="SHA-256 тела запроса")),
+                ("status_code", models.PositiveSmallIntegerField(null=True, verbose_name="Код ответа")),
+                ("response", models.JSONField(null=True, verbose_name="Тело ответа")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_default=django.db.models.functions.datetime.Now(), verbose_name="Дата первого запроса"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ключ идемпотентности",
+                "verbose_name_plural": "Ключи идемпотентности",
+                "constraints": [models.UniqueConstraint(fields=("scope", "key"), name="idempotency_scope_key_uniq")],
+            },
+        ),
+    ]
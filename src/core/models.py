@@ -0,0 +1,25 @@
+from django.db import models
+from django.db.models.functions import Now
+
+
+class IdempotencyKey(models.Model):
+    """Ключ Idempotency-Key и сохранённый ответ на первый запрос с ним (core/idempotency.py)."""
+
+    scope = models.CharField(max_length=50, verbose_name="Эндпоинт")
+    key = models.CharField(max_length=255, verbose_name="Ключ")
+    request_hash = models.CharField(max_length=64, verbose_name="SHA-256 тела запроса")
+    # Пока запрос выполняется, ответа нет
+    status_code = models.PositiveSmallIntegerField(null=True, verbose_name="Код ответа")
+    response = models.JSONField(null=True, verbose_name="Тело ответа")
+    created_at = models.DateTimeField(db_default=Now(), verbose_name="Дата первого запроса")
+
+    class Meta:
+        verbose_name = "Ключ идемпотентности"
+        verbose_name_plural = "Ключи идемпотентности"
+        constraints = [
+            # Единственный индекс таблицы: по нему ключ и занимается, и находится (INSERT ... ON CONFLICT)
+            models.UniqueConstraint(fields=["scope", "key"], name="idempotency_scope_key_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}: {self.key}"
@@ -0,0 +1,129 @@
+"""
+Keyset (cursor) пагинация для списков API.
+
+Вместо OFFSET следующая страница выбирается условием «строго после последней
+записи» по ключу сортировки (например, (price, id)), поэтому страница N стоит
+столько же, сколько первая, если для ключа есть индекс.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q, QuerySet
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursorError(ValueError):
+    """Курсор или размер страницы не удалось разобрать."""
+
+
+@dataclass
+class Page:
+    """Страница результатов и курсор следующей страницы (None, если это последняя)."""
+
+    items: list[Any]
+    next_cursor: str | None
+
+
+def parse_limit(value: str | None) -> int:
+    """Размер страницы из query-параметра ?limit= (по умолчанию DEFAULT_PAGE_SIZE)."""
+    if value is None or value == "":
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise InvalidCursorError("Параметр limit должен быть целым числом") from None
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise InvalidCursorError(f"Параметр limit должен быть от 1 до {MAX_PAGE_SIZE}")
+    return limit
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Упаковывает значения ключа сортировки в непрозрачную строку."""
+    payload = [v.isoformat() if isinstance(v, date) else str(v) for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, queryset: QuerySet, ordering: list[str]) -> list[Any]:
+    """Распаковывает курсор и приводит значения к типам полей модели."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Некорректный курсор") from None
+
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursorError("Некорректный курсор")
+
+    try:
+        return [
+            queryset.model._meta.get_field(name.lstrip("-")).to_python(value)
+            for name, value in zip(ordering, values, strict=True)
+        ]
+    except (FieldDoesNotExist, ValidationError, TypeError):
+        raise InvalidCursorError("Некорректный курсор") from None
+
+
+def _after(ordering: list[str], values: list[Any]) -> Q:
+    """Условие «строго после values» для лексикографического порядка ordering.
+
+    Например, для ["price", "id"]: price >= p AND (price > p OR (price = p AND id > i)).
+    Избыточное условие на первое поле даёт планировщику границу для range scan по индексу.
+    """
+    names = [name.lstrip("-") for name in ordering]
+    ops = ["lt" if name.startswith("-") else "gt" for name in ordering]
+
+    condition = Q()
+    for i in range(len(ordering)):
+        step = Q(**{f"{names[i]}__{ops[i]}": values[i]})
+        for j in range(i):
+            step &= Q(**{names[j]: values[j]})
+        condition |= step
+
+    return Q(**{f"{names[0]}__{ops[0]}e": values[0]}) & condition
+
+
+def _key(item: Any, ordering: list[str]) -> list[Any]:
+    names = [name.lstrip("-") for name in ordering]
+    if isinstance(item, dict):  # queryset.values()
+        return [item[name] for name in names]
+    return [getattr(item, name) for name in names]
+
+
+def _page_queryset(queryset: QuerySet, ordering: list[str], cursor: str | None, limit: int) -> QuerySet:
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(_after(ordering, decode_cursor(cursor, queryset, ordering)))
+    # Берём на одну запись больше, чтобы узнать, есть ли следующая страница
+    return queryset[: limit + 1]
+
+
+def _make_page(items: list[Any], ordering: list[str], limit: int) -> Page:
+    if len(items) <= limit:
+        return Page(items=items, next_cursor=None)
+
+    items = items[:limit]
+    return Page(items=items, next_cursor=encode_cursor(_key(items[-1], ordering)))
+
+
+def paginate(queryset: QuerySet, ordering: list[str], cursor: str | None, limit: int) -> Page:
+    """Возвращает одну страницу queryset, упорядоченного по ordering.
+
+    Последним полем ordering должен быть уникальный ключ (обычно id),
+    иначе записи с одинаковым значением сортировки могут потеряться между страницами.
+    """
+    return _make_page(list(_page_queryset(queryset, ordering, cursor, limit)), ordering, limit)
+
+
+async def apaginate(queryset: QuerySet, ordering: list[str], cursor: str | None, limit: int) -> Page:
+    """Асинхронный вариант paginate (async-итерация queryset)."""
+    items = [item async for item in _page_queryset(queryset, ordering, cursor, limit)]
+    return _make_page(items, ordering, limit)
@@ -0,0 +1,52 @@
+"""
+Быстрое JSON-кодирование ответов API.
+
+Если установлен orjson (необязательная зависимость), ответы кодируются им;
+байтовый результат совпадает с JSONRenderer DRF при настройках по умолчанию
+(COMPACT_JSON, UNICODE_JSON). Без orjson используется стандартный json.
+"""
+
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .metrics import track_serialization
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# datetime отдаём в JSONEncoder DRF (формат ISO с миллисекундами), а не в собственный формат orjson
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+_encoder = JSONEncoder()
+
+
+def json_dumps(data) -> bytes:
+    """Компактный JSON в UTF-8, байт в байт как у JSONRenderer DRF."""
+    with track_serialization():
+        if orjson is not None:
+            ret = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        else:
+            ret = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")).encode()
+
+    # Как JSONRenderer: U+2028 и U+2029 экранируются, чтобы JSON оставался подмножеством JavaScript
+    return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer, кодирующий компактные ответы через json_dumps (orjson, если доступен)."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        # Форматированный вывод и нестандартные настройки JSON отдаём базовому рендереру
+        if indent is not None or self.ensure_ascii or not self.compact:
+            with track_serialization():
+                return super().render(data, accepted_media_type, renderer_context)
+
+        return json_dumps(data)
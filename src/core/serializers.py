@@ -0,0 +1,60 @@
+"""
+Общие сериализаторы и поля: пакетные операции, списки id в query string.
+"""
+
+from rest_framework import serializers
+
+# Режимы пакетной записи: atomic — всё или ничего, best_effort — записываются все корректные элементы
+BULK_MODES = ("atomic", "best_effort")
+
+
+class ItemErrorsListSerializer(serializers.ListSerializer):
+    """ListSerializer, который проверяет элементы пакета независимо.
+
+    Ошибка одного элемента не делает невалидным весь пакет: validated_data имеет ту же
+    длину, что и входной список, с None на месте невалидных элементов, а их ошибки
+    собираются в item_errors по индексам. Ошибки самого списка (не список, пустой,
+    слишком длинный) по-прежнему в errors.
+    """
+
+    def to_internal_value(self, data):
+        self.item_errors = {}
+        self._index = 0
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        index, self._index = self._index, self._index + 1
+        try:
+            return super().run_child_validation(data)
+        except serializers.ValidationError as e:
+            self.item_errors[index] = e.detail
+            return None
+
+
+class CommaSeparatedIdsField(serializers.CharField):
+    """Список различных id из строки "1,2,3" (query string), по возрастанию.
+
+    max_ids — сколько id можно перечислить (None — без ограничения).
+    """
+
+    default_error_messages = {
+        "invalid_ids": "Укажите id целыми числами через запятую",
+        "max_ids": "Не больше {max_ids} id в одном запросе",
+    }
+
+    def __init__(self, *, max_ids: int | None = None, **kwargs):
+        self.max_ids = max_ids
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data) -> list[int]:
+        value = super().to_internal_value(data)
+        try:
+            ids = sorted({int(item) for item in value.split(",")})
+        except ValueError:
+            self.fail("invalid_ids")
+        if self.max_ids is not None and len(ids) > self.max_ids:
+            self.fail("max_ids", max_ids=self.max_ids)
+        return ids
+
+    def to_representation(self, value) -> str:
+        return ",".join(str(item) for item in value)
@@ -0,0 +1,111 @@
+"""
+Потоковая выдача больших списков (?stream=1 / ?stream=ndjson).
+
+Записи читаются серверным курсором PostgreSQL (QuerySet.iterator) и отдаются
+клиенту порциями через StreamingHttpResponse, поэтому потребление памяти не
+зависит от количества строк в ответе.
+
+Под ASGI Django целиком вычитывает синхронный итератор тела ответа в память,
+поэтому async-views отдают асинхронный итератор (astream_rows, aiterate).
+"""
+
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+
+from .renderers import json_dumps
+
+# Сколько строк забирать из серверного курсора и отдавать клиенту за один раз
+STREAM_CHUNK_SIZE = 2000
+
+# Значение параметра ?stream= -> формат ответа
+STREAM_FORMATS = {"1": "json", "json": "json", "ndjson": "ndjson"}
+
+CONTENT_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+
+def get_stream_format(query_params) -> str | None:
+    """Формат потоковой выдачи из query string (None — обычный ответ).
+
+    Неизвестное значение ?stream= приводит к ValueError.
+    """
+    value = query_params.get("stream")
+    if value is None:
+        return None
+    if value not in STREAM_FORMATS:
+        raise ValueError(f"Параметр stream должен быть одним из: {', '.join(STREAM_FORMATS)}")
+    return STREAM_FORMATS[value]
+
+
+def _chunks(rows: Iterable[dict], chunk_size: int) -> Iterator[list[bytes]]:
+    chunk = []
+    for row in rows:
+        chunk.append(json_dumps(row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _json_array(rows: Iterable[dict], chunk_size: int) -> Iterator[bytes]:
+    yield b"["
+    separator = b""
+    for chunk in _chunks(rows, chunk_size):
+        yield separator + b",".join(chunk)
+        separator = b","
+    yield b"]"
+
+
+def _ndjson(rows: Iterable[dict], chunk_size: int) -> Iterator[bytes]:
+    for chunk in _chunks(rows, chunk_size):
+        yield b"\n".join(chunk) + b"\n"
+
+
+def stream_rows(rows: Iterable[dict], stream_format: str, chunk_size: int = STREAM_CHUNK_SIZE) -> StreamingHttpResponse:
+    """Потоковый ответ из словарей rows (обычно FastSerializer.iter_rows(queryset, STREAM_CHUNK_SIZE))."""
+    body = _ndjson(rows, chunk_size) if stream_format == "ndjson" else _json_array(rows, chunk_size)
+    return StreamingHttpResponse(body, content_type=CONTENT_TYPES[stream_format])
+
+
+async def _achunks(rows: AsyncIterable[dict], chunk_size: int) -> AsyncIterator[list[bytes]]:
+    chunk = []
+    async for row in rows:
+        chunk.append(json_dumps(row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _ajson_array(rows: AsyncIterable[dict], chunk_size: int) -> AsyncIterator[bytes]:
+    yield b"["
+    separator = b""
+    async for chunk in _achunks(rows, chunk_size):
+        yield separator + b",".join(chunk)
+        separator = b","
+    yield b"]"
+
+
+async def _andjson(rows: AsyncIterable[dict], chunk_size: int) -> AsyncIterator[bytes]:
+    async for chunk in _achunks(rows, chunk_size):
+        yield b"\n".join(chunk) + b"\n"
+
+
+def astream_rows(
+    rows: AsyncIterable[dict], stream_format: str, chunk_size: int = STREAM_CHUNK_SIZE
+) -> StreamingHttpResponse:
+    """Потоковый ответ из асинхронного итератора словарей (FastSerializer.aiter_rows)."""
+    body = _andjson(rows, chunk_size) if stream_format == "ndjson" else _ajson_array(rows, chunk_size)
+    return StreamingHttpResponse(body, content_type=CONTENT_TYPES[stream_format])
+
+
+async def aiterate(iterator: Iterator, chunk_size: int = 1) -> AsyncIterator:
+    """Асинхронный итератор поверх синхронного: по chunk_size элементов за один переход в поток
+    для синхронного кода (там же, где async ORM выполняет запросы)."""
+    while chunk := await sync_to_async(lambda: list(islice(iterator, chunk_size)))():
+        for item in chunk:
+            yield item
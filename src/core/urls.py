@@ -15,11 +15,20 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from django.contrib import admin
+from django.apps import apps
 from django.urls import include, path
 
+from . import views
+
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("rooms/", include("rooms.urls")),
     path("bookings/", include("bookings.urls")),
+    path("reports/", include("reports.urls")),
+    path("metrics", views.metrics, name="metrics"),
 ]
+
+# В профиле API_PROFILE admin не подключён
+if apps.is_installed("django.contrib.admin"):
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
@@ -0,0 +1,18 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+from .metrics import render_metrics
+
+
+@require_GET
+def metrics(request):
+    """Метрики в текстовом формате Prometheus (только с токеном METRICS_TOKEN в заголовке Authorization)."""
+    if not settings.METRICS_TOKEN:
+        raise Http404
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected):
+        return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,74 @@
+"""
+Прогрев процесса до приёма запросов (хуки core/gunicorn_config.py).
+
+Без прогрева первый запрос каждого воркера платит за ленивую инициализацию: построение
+URL-резолвера, импорт классов DRF из настроек, сборку полей сериализаторов, загрузку
+переводов и соединение с БД.
+
+- warm_app — общее для всех воркеров; с GUNICORN_PRELOAD выполняется в master до fork,
+  и воркеры получают готовое состояние copy-on-write. С БД не соединяется;
+- warm_connections — соединения с БД текущего потока (соединения Django привязаны к потоку);
+- warm_occupancy_index — индекс занятости строится в каждом воркере: снимок из master
+  устаревал бы к перезапуску воркера.
+"""
+
+import inspect
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+from django.utils import translation
+from rest_framework.serializers import BaseSerializer
+from rest_framework.settings import api_settings
+
+from bookings.occupancy import get_occupancy_index
+
+# Модули сериализаторов эндпоинтов API
+SERIALIZER_MODULES = ("rooms.serializers", "bookings.serializers", "reports.serializers")
+
+# Классы DRF, которые импортируются из строк настроек при первом обращении
+API_SETTINGS = (
+    "DEFAULT_RENDERER_CLASSES",
+    "DEFAULT_PARSER_CLASSES",
+    "DEFAULT_AUTHENTICATION_CLASSES",
+    "DEFAULT_PERMISSION_CLASSES",
+    "DEFAULT_THROTTLE_CLASSES",
+    "DEFAULT_CONTENT_NEGOTIATION_CLASS",
+    "EXCEPTION_HANDLER",
+)
+
+
+def warm_app() -> None:
+    """URL-резолвер (с импортом всех views), классы DRF, поля сериализаторов и переводы."""
+    # Обращение к reverse_dict заполняет резолвер
+    _ = get_resolver().reverse_dict
+
+    for name in API_SETTINGS:
+        getattr(api_settings, name)
+
+    for module_name in SERIALIZER_MODULES:
+        module = import_module(module_name)
+        for serializer_class in vars(module).values():
+            if (
+                inspect.isclass(serializer_class)
+                and issubclass(serializer_class, BaseSerializer)
+                and serializer_class.__module__ == module_name
+            ):
+                # Поля строятся при первом обращении (у ModelSerializer — по полям модели)
+                _ = serializer_class().fields
+
+    # Каталог переводов языка по умолчанию (сообщения об ошибках DRF и Django)
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext("This field is required.")
+
+
+def warm_connections() -> None:
+    """Открывает соединения с БД в текущем потоке (и проверяет, что БД доступна)."""
+    for connection in connections.all():
+        connection.ensure_connection()
+
+
+def warm_occupancy_index() -> None:
+    """Строит индекс занятости, если он включён."""
+    get_occupancy_index()
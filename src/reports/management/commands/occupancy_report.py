@@ -0,0 +1,51 @@
+import csv
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.serializers import OccupancyReportParamsSerializer
+from reports.services import GROUP_BY_CHOICES, ReportService
+
+
+class Command(BaseCommand):
+    help = "Отчёт по загрузке и выручке номеров за период (CSV в stdout) и обслуживание его агрегатов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date-start", type=date.fromisoformat, help="первая ночь периода (YYYY-MM-DD)")
+        parser.add_argument("--date-end", type=date.fromisoformat, help="день после последней ночи периода")
+        parser.add_argument("--rooms", help="id номеров через запятую (по умолчанию — все)")
+        parser.add_argument("--group-by", choices=GROUP_BY_CHOICES, default="room", help="строки по номерам или дням")
+        parser.add_argument("--rebuild", action="store_true", help="пересчитать агрегаты из броней")
+        parser.add_argument("--check", action="store_true", help="сверить агрегаты с бронями")
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            nights = ReportService.rebuild_booked_nights()
+            self.stderr.write(f"Агрегаты пересчитаны, занятых ночей: {nights}")
+
+        if options["check"]:
+            mismatched = ReportService.count_mismatched_nights()
+            if mismatched:
+                raise CommandError(f"Агрегаты расходятся с бронями: {mismatched} ночей (пересчитайте с --rebuild)")
+            self.stderr.write(self.style.SUCCESS("Агрегаты согласованы с бронями"))
+
+        if options["date_start"] is None and options["date_end"] is None:
+            if options["rebuild"] or options["check"]:
+                return
+            raise CommandError("Укажите период отчёта: --date-start и --date-end")
+
+        params = {"date_start": options["date_start"], "date_end": options["date_end"], "group_by": options["group_by"]}
+        if options["rooms"]:
+            params["room_ids"] = options["rooms"]
+        serializer = OccupancyReportParamsSerializer(data=params)
+        if not serializer.is_valid():
+            raise CommandError(serializer.errors)
+
+        report = ReportService.get_occupancy(**serializer.validated_data)
+        key = "day" if options["group_by"] == "day" else "room_id"
+        writer = csv.writer(self.stdout)
+        writer.writerow([key, "nights", "occupancy", "revenue"])
+        for row in report.results:
+            writer.writerow([row[key], row["nights"], row["occupancy"], row["revenue"]])
+        total = report.total
+        writer.writerow(["total", total["nights"], total["occupancy"], total["revenue"]])
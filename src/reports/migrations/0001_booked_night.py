@@ -0,0 +1,94 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Ночи броней ведутся триггерами уровня оператора на таблице броней: один INSERT/DELETE
+# агрегатов на весь оператор, какой бы путь записи ни использовался (сервис, ORM, bulk_create,
+# сырой SQL, каскадное удаление номера). Ночь брони [date_start, date_end) — каждый день
+# от date_start до date_end - 1; её выручка — цена номера на момент бронирования.
+# При изменении брони её ночи пересоздаются по текущей цене номера.
+BOOKED_NIGHTS_SQL = """
+CREATE FUNCTION reports_booked_nights() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM reports_bookednight night USING old_rows booking
+        WHERE night.room_id = booking.room_id AND night.day >= booking.date_start AND night.day < booking.date_end;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO reports_bookednight (room_id, day, revenue)
+        SELECT booking.room_id, night::date, room.price
+        FROM new_rows booking
+        JOIN rooms_room room ON room.id = booking.room_id
+        CROSS JOIN generate_series(booking.date_start, booking.date_end - 1, interval '1 day') AS night;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER reports_booked_nights_insert
+    AFTER INSERT ON bookings_booking REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION reports_booked_nights();
+
+CREATE TRIGGER reports_booked_nights_update
+    AFTER UPDATE ON bookings_booking REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION reports_booked_nights();
+
+CREATE TRIGGER reports_booked_nights_delete
+    AFTER DELETE ON bookings_booking REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION reports_booked_nights();
+"""
+
+DROP_BOOKED_NIGHTS_SQL = """
+DROP TRIGGER IF EXISTS reports_booked_nights_insert ON bookings_booking;
+DROP TRIGGER IF EXISTS reports_booked_nights_update ON bookings_booking;
+DROP TRIGGER IF EXISTS reports_booked_nights_delete ON bookings_booking;
+DROP FUNCTION IF EXISTS reports_booked_nights();
+"""
+
+# Ночи уже существующих броней (по текущим ценам номеров)
+BACKFILL_SQL = """
+INSERT INTO reports_bookednight (room_id, day, revenue)
+SELECT booking.room_id, night::date, room.price
+FROM bookings_booking booking
+JOIN rooms_room room ON room.id = booking.room_id
+CROSS JOIN generate_series(booking.date_start, booking.date_end - 1, interval '1 day') AS night;
+"""
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("rooms", "0003_room_bookings_version"),
+        ("bookings", "0004_booking_touch_room_trigger"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookedNight",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField(verbose_name="Ночь")),
+                ("revenue", models.DecimalField(decimal_places=2, max_digits=10, verbose_name="Выручка за ночь")),
+                (
+                    "room",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booked_nights",
+                        to="rooms.room",
+                        verbose_name="Номер",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Занятая ночь",
+                "verbose_name_plural": "Занятые ночи",
+                "indexes": [models.Index(fields=["day"], include=("room", "revenue"), name="booked_night_day_idx")],
+                "constraints": [models.UniqueConstraint(fields=("room", "day"), name="booked_night_room_day_uniq")],
+            },
+        ),
+        migrations.RunSQL(BOOKED_NIGHTS_SQL, reverse_sql=DROP_BOOKED_NIGHTS_SQL),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:20
+
+from django.db import migrations
+
+# Ночи броней, перенесённых в архив (bookings 0005), триггер на таблице броней уже не удалит:
+# при удалении номера его ночи удаляются по самому номеру
+DELETE_ROOM_NIGHTS_SQL = """
+CREATE FUNCTION reports_delete_room_nights() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM reports_bookednight WHERE room_id IN (SELECT id FROM old_rows);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER reports_delete_room_nights
+    AFTER DELETE ON rooms_room REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION reports_delete_room_nights();
+"""
+
+DROP_DELETE_ROOM_NIGHTS_SQL = """
+DROP TRIGGER IF EXISTS reports_delete_room_nights ON rooms_room;
+DROP FUNCTION IF EXISTS reports_delete_room_nights();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reports", "0001_booked_night"),
+        ("bookings", "0005_partition_booking_by_date_end"),
+    ]
+
+    operations = [
+        migrations.RunSQL(DELETE_ROOM_NIGHTS_SQL, reverse_sql=DROP_DELETE_ROOM_NIGHTS_SQL),
+    ]
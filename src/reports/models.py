@@ -0,0 +1,37 @@
+from django.db import models
+
+from rooms.models import Room
+
+
+class BookedNight(models.Model):
+    """Занятая ночь номера — дневной агрегат броней для отчётов по загрузке и выручке.
+
+    Строки ведёт триггер БД на таблице броней (миграция reports 0001): при создании брони
+    добавляются её ночи с ценой номера на момент бронирования, при удалении — удаляются.
+    Брони одного номера не пересекаются (триггер bookings_check_overlap), поэтому на номер и день
+    приходится не больше одной строки: число строк — занятые ночи, сумма revenue — выручка.
+    """
+
+    room = models.ForeignKey(
+        Room,
+        on_delete=models.CASCADE,
+        related_name="booked_nights",
+        verbose_name="Номер",
+        db_index=False,  # Поиск по room_id обслуживает уникальный индекс (room, day)
+    )
+    day = models.DateField(verbose_name="Ночь")
+    revenue = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Выручка за ночь")
+
+    class Meta:
+        verbose_name = "Занятая ночь"
+        verbose_name_plural = "Занятые ночи"
+        constraints = [
+            models.UniqueConstraint(fields=["room", "day"], name="booked_night_room_day_uniq"),
+        ]
+        indexes = [
+            # Отчёт по всем номерам за период читается из индекса целиком (index-only scan)
+            models.Index(fields=["day"], include=["room", "revenue"], name="booked_night_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"Номер #{self.room_id}, ночь {self.day}"
@@ -0,0 +1,77 @@
+from rest_framework import serializers
+
+from core.serializers import CommaSeparatedIdsField
+
+from .services import GROUP_BY_CHOICES
+
+# Самый длинный период отчёта (дней)
+MAX_REPORT_DAYS = 3660
+
+# Сколько номеров можно перечислить в room_ids
+MAX_REPORT_ROOMS = 1000
+
+
+class OccupancyReportParamsSerializer(serializers.Serializer):
+    """Параметры отчёта по загрузке (query string reports/occupancy/)."""
+
+    date_start = serializers.DateField()
+    date_end = serializers.DateField()
+    room_ids = CommaSeparatedIdsField(
+        required=False,
+        max_ids=MAX_REPORT_ROOMS,
+        error_messages={"max_ids": "Не больше {max_ids} номеров в одном отчёте"},
+        help_text="id номеров через запятую (по умолчанию — все)",
+    )
+    group_by = serializers.ChoiceField(choices=GROUP_BY_CHOICES, default="room")
+
+    def validate(self, data):
+        """Проверка периода."""
+        if data["date_start"] >= data["date_end"]:
+            raise serializers.ValidationError("Дата окончания должна быть позже даты начала")
+
+        if (data["date_end"] - data["date_start"]).days > MAX_REPORT_DAYS:
+            raise serializers.ValidationError(f"Период отчёта не может быть длиннее {MAX_REPORT_DAYS} дней")
+
+        return data
+
+
+class OccupancyTotalSerializer(serializers.Serializer):
+    """Итог отчёта: номера, занятые ночи, загрузка и выручка за период."""
+
+    rooms = serializers.IntegerField()
+    nights = serializers.IntegerField()
+    occupancy = serializers.FloatField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class RoomOccupancySerializer(serializers.Serializer):
+    """Строка отчёта по номеру."""
+
+    room_id = serializers.IntegerField()
+    nights = serializers.IntegerField()
+    occupancy = serializers.FloatField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class DayOccupancySerializer(serializers.Serializer):
+    """Строка отчёта по дню."""
+
+    day = serializers.DateField()
+    nights = serializers.IntegerField()
+    occupancy = serializers.FloatField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class OccupancyReportSerializer(serializers.Serializer):
+    """Отчёт по загрузке: период, строки по номерам или дням и итог."""
+
+    date_start = serializers.DateField()
+    date_end = serializers.DateField()
+    days = serializers.IntegerField()
+    total = OccupancyTotalSerializer()
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        row_serializer = DayOccupancySerializer if self.context.get("group_by") == "day" else RoomOccupancySerializer
+        data["results"] = row_serializer(instance.results, many=True).data
+        return data
@@ -0,0 +1,169 @@
+"""
+Отчёты по загрузке и выручке номеров из агрегатов BookedNight (без чтения броней).
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, FilteredRelation, Q, Sum
+
+from bookings.models import Booking
+from bookings.partitions import ARCHIVE_TABLE
+from rooms.models import Room
+
+from .models import BookedNight
+
+# Ночи броней с ценой номера — то же, что добавляет триггер (миграция reports 0001).
+# Брони из архива (bookings/partitions.py) тоже учитываются: их ночи остаются в отчётах
+BOOKING_NIGHTS_SQL = f"""
+    SELECT booking.room_id, night::date AS day, room.price
+    FROM (
+        SELECT room_id, date_start, date_end FROM {Booking._meta.db_table}
+        UNION ALL SELECT room_id, date_start, date_end FROM {ARCHIVE_TABLE}
+    ) booking
+    JOIN {Room._meta.db_table} room ON room.id = booking.room_id
+    CROSS JOIN generate_series(booking.date_start, booking.date_end - 1, interval '1 day') AS night
+"""
+
+REBUILD_SQL = f"INSERT INTO {BookedNight._meta.db_table} (room_id, day, revenue) {BOOKING_NIGHTS_SQL}"
+
+# Ночи, которые есть только в агрегатах или только в бронях (цены не сравниваются:
+# в агрегатах хранится цена на момент бронирования)
+MISMATCHED_NIGHTS_SQL = f"""
+    SELECT count(*) FROM (
+        (SELECT room_id, day FROM ({BOOKING_NIGHTS_SQL}) expected
+         EXCEPT ALL SELECT room_id, day FROM {BookedNight._meta.db_table})
+        UNION ALL
+        (SELECT room_id, day FROM {BookedNight._meta.db_table}
+         EXCEPT ALL SELECT room_id, day FROM ({BOOKING_NIGHTS_SQL}) expected)
+    ) mismatched
+"""
+
+# Группировка отчёта: по номерам или по дням
+GROUP_BY_CHOICES = ("room", "day")
+
+
+@dataclass
+class OccupancyReport:
+    """Отчёт за период [date_start, date_end): строки по номерам или дням и итог."""
+
+    date_start: date
+    date_end: date
+    rooms: int
+    results: list[dict]
+
+    @property
+    def days(self) -> int:
+        return (self.date_end - self.date_start).days
+
+    @property
+    def total(self) -> dict:
+        nights = sum(row["nights"] for row in self.results)
+        return {
+            "rooms": self.rooms,
+            "nights": nights,
+            "occupancy": occupancy_rate(nights, self.rooms * self.days),
+            "revenue": sum((row["revenue"] for row in self.results), Decimal("0.00")),
+        }
+
+
+def occupancy_rate(nights: int, capacity: int) -> float:
+    """Доля занятых ночей (0, если ночей в периоде нет)."""
+    return round(nights / capacity, 4) if capacity else 0.0
+
+
+class ReportService:
+    """Сервис отчётов по загрузке номеров и выручке."""
+
+    @staticmethod
+    def get_occupancy_by_room(date_start: date, date_end: date, room_ids: list[int] | None = None) -> OccupancyReport:
+        """Занятые ночи, загрузка и выручка каждого номера за период (номера без броней — с нулями).
+
+        Один запрос: номера LEFT JOIN их ночи периода (условие периода — в самом JOIN).
+        """
+        rooms = Room.objects.all() if room_ids is None else Room.objects.filter(id__in=room_ids)
+        rows = (
+            rooms.annotate(
+                period_nights=FilteredRelation(
+                    "booked_nights",
+                    condition=Q(booked_nights__day__gte=date_start, booked_nights__day__lt=date_end),
+                )
+            )
+            .annotate(nights=Count("period_nights"), revenue=Sum("period_nights__revenue"))
+            .order_by("id")
+            .values_list("id", "nights", "revenue")
+        )
+
+        days = (date_end - date_start).days
+        results = [
+            {
+                "room_id": room_id,
+                "nights": nights,
+                "occupancy": occupancy_rate(nights, days),
+                "revenue": revenue or Decimal("0.00"),
+            }
+            for room_id, nights, revenue in rows
+        ]
+        return OccupancyReport(date_start=date_start, date_end=date_end, rooms=len(results), results=results)
+
+    @staticmethod
+    def get_occupancy_by_day(date_start: date, date_end: date, room_ids: list[int] | None = None) -> OccupancyReport:
+        """Занятые ночи, загрузка и выручка по дням периода (дни без броней — с нулями).
+
+        Загрузка дня — доля занятых номеров из выбранных (всех, если room_ids не задан).
+        """
+        rooms = Room.objects.all() if room_ids is None else Room.objects.filter(id__in=room_ids)
+        nights = BookedNight.objects.filter(day__gte=date_start, day__lt=date_end)
+        if room_ids is not None:
+            nights = nights.filter(room_id__in=room_ids)
+        per_day = {
+            day: (count, revenue)
+            for day, count, revenue in nights.values("day")
+            .annotate(nights=Count("*"), revenue=Sum("revenue"))
+            .values_list("day", "nights", "revenue")
+        }
+
+        rooms_count = rooms.count()
+        results = []
+        for offset in range((date_end - date_start).days):
+            day = date_start + timedelta(days=offset)
+            count, revenue = per_day.get(day, (0, Decimal("0.00")))
+            results.append(
+                {
+                    "day": day,
+                    "nights": count,
+                    "occupancy": occupancy_rate(count, rooms_count),
+                    "revenue": revenue,
+                }
+            )
+        return OccupancyReport(date_start=date_start, date_end=date_end, rooms=rooms_count, results=results)
+
+    @staticmethod
+    def get_occupancy(
+        date_start: date, date_end: date, room_ids: list[int] | None = None, group_by: str = "room"
+    ) -> OccupancyReport:
+        """Отчёт за период с группировкой по номерам (group_by="room") или дням (group_by="day")."""
+        if group_by == "day":
+            return ReportService.get_occupancy_by_day(date_start, date_end, room_ids)
+        return ReportService.get_occupancy_by_room(date_start, date_end, room_ids)
+
+    @staticmethod
+    def rebuild_booked_nights() -> int:
+        """Пересчитывает агрегаты из броней (по текущим ценам номеров); возвращает число ночей.
+
+        Брони на время пересчёта блокируются от записи, чтобы триггер и пересчёт не разошлись.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {Booking._meta.db_table} IN SHARE MODE")
+            cursor.execute(f"DELETE FROM {BookedNight._meta.db_table}")
+            cursor.execute(REBUILD_SQL)
+            return cursor.rowcount
+
+    @staticmethod
+    def count_mismatched_nights() -> int:
+        """Сколько ночей в агрегатах расходится с бронями (0 — агрегаты согласованы)."""
+        with connection.cursor() as cursor:
+            cursor.execute(MISMATCHED_NIGHTS_SQL)
+            return cursor.fetchone()[0]
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("occupancy/", views.occupancy_report, name="report-occupancy"),
+]
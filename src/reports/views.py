@@ -0,0 +1,20 @@
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from .serializers import OccupancyReportParamsSerializer, OccupancyReportSerializer
+from .services import ReportService
+
+
+@api_view(["GET"])
+def occupancy_report(request):
+    """Загрузка и выручка номеров за период (?date_start=&date_end=&room_ids=1,2&group_by=room|day).
+
+    Считается по агрегатам занятых ночей (BookedNight), брони не читаются.
+    """
+    params = OccupancyReportParamsSerializer(data=request.GET)
+    if not params.is_valid():
+        return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    report = ReportService.get_occupancy(**params.validated_data)
+    return Response(OccupancyReportSerializer(report, context={"group_by": params.validated_data["group_by"]}).data)
@@ -0,0 +1,134 @@
+"""
+Async-версии views номеров для запуска под ASGI (uvicorn).
+
+Те же URL, параметры и формат ответов, что в views.py; подключаются в urls.py,
+когда включён ASYNC_VIEWS_ENABLED (core/asgi.py включает его сам).
+"""
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+
+from core.async_views import async_api_view, json_response
+from core.idempotency import idempotent
+from core.pagination import InvalidCursorError, parse_limit
+from core.renderers import json_dumps
+from core.streaming import STREAM_CHUNK_SIZE, aiterate, astream_rows, get_stream_format
+
+from . import cache as rooms_cache
+from . import transfer
+from .models import Room
+from .serializers import RoomAvailabilitySerializer, RoomCreateSerializer, RoomFastSerializer
+from .services import RoomService
+
+
+@async_api_view(["POST"])
+@idempotent("room-create")
+async def create_room(request):
+    """Создание нового номера отеля."""
+    serializer = RoomCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    room = await RoomService.acreate_room(
+        description=serializer.validated_data["description"],
+        price=serializer.validated_data["price"],
+    )
+    return json_response({"room_id": room.id}, status=status.HTTP_201_CREATED)
+
+
+@async_api_view(["DELETE"])
+async def delete_room(request, room_id):
+    """Удаление номера и всех его броней."""
+    try:
+        await RoomService.adelete_room(room_id)
+    except Room.DoesNotExist:
+        return json_response({"error": "Комната не найдена"}, status=status.HTTP_404_NOT_FOUND)
+    return json_response(status=status.HTTP_204_NO_CONTENT)
+
+
+@async_api_view(["GET"])
+async def list_rooms(request):
+    """Получение списка номеров с сортировкой (кэш, ETag, страницы и поток — как в views.list_rooms)."""
+    sort_by = request.GET.get("sort_by")
+
+    try:
+        stream_format = get_stream_format(request.GET)
+    except ValueError as e:
+        return json_response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if stream_format:
+        rows = RoomFastSerializer.aiter_rows(RoomService.get_rooms_queryset(sort_by), chunk_size=STREAM_CHUNK_SIZE)
+        return astream_rows(rows, stream_format)
+
+    cache_key = etag = body = None
+    if rooms_cache.enabled():
+        cache_key, etag = await rooms_cache.alist_entry(
+            RoomService.get_ordering(sort_by), request.GET.get("cursor"), request.GET.get("limit")
+        )
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        body = await rooms_cache.aget_body(cache_key)
+
+    if body is None:
+        if "limit" in request.GET or "cursor" in request.GET:
+            try:
+                page = await RoomService.aget_rooms_page(
+                    sort_by, request.GET.get("cursor"), parse_limit(request.GET.get("limit"))
+                )
+            except InvalidCursorError as e:
+                return json_response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            data = {"results": RoomFastSerializer.serialize_objects(page.items), "next": page.next_cursor}
+        else:
+            data = await RoomFastSerializer.aserialize(RoomService.get_rooms_queryset(sort_by))
+
+        body = json_dumps(data)
+        if cache_key is not None:
+            await rooms_cache.aset_body(cache_key, body)
+
+    return HttpResponse(body, content_type="application/json", headers={"ETag": etag} if etag else None)
+
+
+@async_api_view(["GET"])
+async def list_available_rooms(request):
+    """Поиск номеров, свободных на период (?date_start=&date_end=&price_min=&price_max=&sort_by=)."""
+    params = RoomAvailabilitySerializer(data=request.GET)
+    if not params.is_valid():
+        return json_response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        page = await RoomService.aget_available_rooms_page(
+            **params.validated_data,
+            sort_by=request.GET.get("sort_by"),
+            cursor=request.GET.get("cursor"),
+            limit=parse_limit(request.GET.get("limit")),
+        )
+    except InvalidCursorError as e:
+        return json_response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return json_response({"results": RoomFastSerializer.serialize_objects(page.items), "next": page.next_cursor})
+
+
+@async_api_view(["GET"])
+async def export_rooms(request):
+    """Потоковая выгрузка всех номеров: ?file_format=csv (COPY TO, по умолчанию) или ndjson."""
+    file_format = request.GET.get("file_format", "csv")
+    if file_format not in transfer.FILE_FORMATS:
+        return json_response(
+            {"error": f"Параметр file_format должен быть одним из: {', '.join(transfer.FILE_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if file_format == "ndjson":
+        rows = RoomFastSerializer.aiter_rows(Room.objects.order_by("id"), chunk_size=STREAM_CHUNK_SIZE)
+        response = astream_rows(rows, "ndjson")
+    else:
+        # COPY TO работает только через синхронный курсор: порции читаются в потоке для синхронного кода
+        response = StreamingHttpResponse(
+            aiterate(iter(RoomService.export_rooms_csv())), content_type="text/csv; charset=utf-8"
+        )
+
+    response["Content-Disposition"] = f'attachment; filename="rooms.{file_format}"'
+    return response
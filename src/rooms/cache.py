@@ -0,0 +1,143 @@
+"""
+Кэш списка номеров (rooms/list/).
+
+Хранит готовые JSON-байты ответа под ключом из режима сортировки и страницы.
+В ключ входит версия каталога: create_room/delete_room увеличивают её, и все
+прежние записи перестают использоваться (их вытеснит TTL). ETag ответа тоже
+строится из ключа, поэтому If-None-Match проверяется без чтения самих данных.
+
+Бэкенд — стандартный кэш Django (CACHES): по умолчанию память процесса,
+при заданном CACHE_URL — Redis, общий для всех процессов. Функции с префиксом a —
+асинхронные варианты для async-views (асинхронный API кэша Django).
+
+Кэш в памяти процесса у каждого воркера gunicorn свой: изменение каталога в одном воркере
+не сбросило бы записи и ETag остальных. Поэтому при нескольких воркерах без CACHE_URL
+core/gunicorn_config.py выключает кэш (ROOMS_CACHE_ENABLED=False, см. enabled()).
+
+Статистика цен (rooms/stats/) кэшируется так же, вместе с отсортированным массивом цен
+каталога (rooms/prices.py). Для статистики по свободным номерам в ключ входят ещё версии
+занятости месяцев периода: изменение брони увеличивает версии только тех месяцев, которые
+она занимает, поэтому статистика по другим периодам остаётся в кэше.
+"""
+
+import hashlib
+import time
+from array import array
+from collections.abc import Iterable
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+VERSION_KEY = "rooms:list:version"
+AVAILABILITY_VERSION_KEY = "rooms:availability:version:{month}"
+
+
+def enabled() -> bool:
+    """Включён ли кэш списка и статистики номеров (иначе ответы строятся из БД, без ETag)."""
+    return settings.ROOMS_CACHE_ENABLED
+
+
+def get_version(key: str = VERSION_KEY) -> int:
+    """Текущая версия каталога номеров (или другого счётчика key)."""
+    version = cache.get(key)
+    if version is None:
+        # Начальная версия уникальна, чтобы после вытеснения счётчика не ожили старые записи
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(key: str = VERSION_KEY) -> None:
+    """Сбрасывает все закэшированные списки номеров (увеличивает версию)."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+async def aget_version(key: str = VERSION_KEY) -> int:
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def get_versions(keys: list[str]) -> list[int]:
+    """Текущие версии нескольких счётчиков одним обращением к кэшу."""
+    versions = cache.get_many(keys)
+    return [versions[key] if key in versions else get_version(key) for key in keys]
+
+
+def _availability_keys(date_start: date, date_end: date) -> list[str]:
+    """Ключи версий занятости месяцев, которые пересекает период [date_start, date_end)."""
+    keys = []
+    year, month = date_start.year, date_start.month
+    while date(year, month, 1) < date_end:
+        keys.append(AVAILABILITY_VERSION_KEY.format(month=f"{year}-{month:02}"))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
+
+
+def invalidate_availability(periods: Iterable[tuple[date, date]]) -> None:
+    """Сбрасывает закэшированную статистику свободных номеров для месяцев изменённых броней."""
+    for key in {key for date_start, date_end in periods for key in _availability_keys(date_start, date_end)}:
+        invalidate(key)
+
+
+def _entry(version: int, ordering: list[str], cursor: str | None, limit: int | None) -> tuple[str, str]:
+    params = f"{version}:{','.join(ordering)}:{cursor or ''}:{limit or ''}"
+    digest = hashlib.sha1(params.encode(), usedforsecurity=False).hexdigest()
+    return f"rooms:list:{digest}", quote_etag(digest)
+
+
+def list_entry(ordering: list[str], cursor: str | None, limit: int | None) -> tuple[str, str]:
+    """Ключ кэша и ETag для страницы списка номеров."""
+    return _entry(get_version(), ordering, cursor, limit)
+
+
+async def alist_entry(ordering: list[str], cursor: str | None, limit: int | None) -> tuple[str, str]:
+    return _entry(await aget_version(), ordering, cursor, limit)
+
+
+def stats_key(date_start: date | None, date_end: date | None, buckets: int) -> str:
+    """Ключ кэша статистики цен: по всем номерам или по свободным на период."""
+    versions = [get_version()]
+    if date_start is not None:
+        versions += get_versions(_availability_keys(date_start, date_end))
+    params = f"{':'.join(map(str, versions))}:{date_start or ''}:{date_end or ''}:{buckets}"
+    return f"rooms:stats:{hashlib.sha1(params.encode(), usedforsecurity=False).hexdigest()}"
+
+
+def prices_key() -> str:
+    """Ключ кэша отсортированного массива цен для текущей версии каталога."""
+    return f"rooms:prices:{get_version()}"
+
+
+def get_prices(key: str) -> tuple[array, array] | None:
+    """Закэшированные цены и id номеров (rooms/prices.py) или None."""
+    return cache.get(key)
+
+
+def set_prices(key: str, prices: tuple[array, array]) -> None:
+    cache.set(key, prices, timeout=settings.ROOMS_CACHE_TIMEOUT)
+
+
+def get_body(key: str) -> bytes | None:
+    """Закэшированный JSON ответа или None."""
+    return cache.get(key)
+
+
+def set_body(key: str, body: bytes) -> None:
+    """Сохраняет JSON ответа на ROOMS_CACHE_TIMEOUT секунд."""
+    cache.set(key, body, timeout=settings.ROOMS_CACHE_TIMEOUT)
+
+
+async def aget_body(key: str) -> bytes | None:
+    return await cache.aget(key)
+
+
+async def aset_body(key: str, body: bytes) -> None:
+    await cache.aset(key, body, timeout=settings.ROOMS_CACHE_TIMEOUT)
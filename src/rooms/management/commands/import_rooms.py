@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.serializers import BULK_MODES
+from rooms import transfer
+from rooms.services import RoomService
+
+
+class Command(BaseCommand):
+    help = "Импортирует номера из файла CSV (колонки description,price) или NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="путь к файлу; - для чтения из stdin")
+        parser.add_argument(
+            "--format", choices=transfer.FILE_FORMATS, help="формат файла (по умолчанию — по расширению)"
+        )
+        parser.add_argument("--mode", choices=BULK_MODES, default="atomic", help="atomic — всё или ничего")
+        parser.add_argument("--batch-size", type=int, default=transfer.IMPORT_BATCH_SIZE, help="строк в одной пачке")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or Path(path).suffix.lstrip(".").lower()
+        if file_format not in transfer.FILE_FORMATS:
+            raise CommandError(
+                f"Не удалось определить формат файла, укажите --format ({', '.join(transfer.FILE_FORMATS)})"
+            )
+
+        try:
+            file = sys.stdin.buffer if path == "-" else open(path, "rb")
+        except OSError as e:
+            raise CommandError(f"Не удалось открыть файл: {e}") from e
+
+        try:
+            rows = transfer.read_rows(transfer.decode_lines(file), file_format)
+            result = RoomService.import_rooms(
+                rows, atomic=options["mode"] == "atomic", batch_size=options["batch_size"]
+            )
+        except UnicodeDecodeError as e:
+            raise CommandError("Файл должен быть в кодировке UTF-8") from e
+        finally:
+            if file is not sys.stdin.buffer:
+                file.close()
+
+        for error in result.errors:
+            self.stderr.write(f"Строка {error['row']}: {error['errors']}")
+        if result.failed > len(result.errors):
+            self.stderr.write(f"... и ещё {result.failed - len(result.errors)} ошибок")
+
+        if result.failed and not result.created:
+            raise CommandError(f"Номера не импортированы: отклонено строк — {result.failed}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Импортировано номеров: {result.created}; отклонено строк: {result.failed}")
+        )
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rooms", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(fields=["price", "id"], name="room_price_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(fields=["created_at", "id"], name="room_created_at_id_idx"),
+        ),
+    ]
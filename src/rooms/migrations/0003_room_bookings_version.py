@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:04
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rooms", "0002_room_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="room",
+            name="bookings_changed_at",
+            field=models.DateTimeField(
+                db_default=django.db.models.functions.datetime.Now(),
+                editable=False,
+                verbose_name="Дата изменения броней",
+            ),
+        ),
+        migrations.AddField(
+            model_name="room",
+            name="bookings_version",
+            field=models.PositiveBigIntegerField(db_default=0, editable=False, verbose_name="Версия броней"),
+        ),
+    ]
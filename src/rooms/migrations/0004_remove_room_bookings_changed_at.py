@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:41
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rooms", "0003_room_bookings_version"),
+        # Триггер bookings_touch_rooms перестаёт писать в столбец до его удаления
+        ("bookings", "0007_touch_rooms_version_only"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="room",
+            name="bookings_changed_at",
+        ),
+    ]
@@ -5,11 +5,19 @@ class Room(models.Model):
     description = models.TextField(verbose_name="Описание номера")
     price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Цена за ночь")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата добавления")
+    # Версия списка броней номера для условных GET (ETag).
+    # Увеличивается триггером БД при любом изменении броней номера (миграция bookings 0004)
+    bookings_version = models.PositiveBigIntegerField(db_default=0, editable=False, verbose_name="Версия броней")
 
     class Meta:
         verbose_name = "Номер"
         verbose_name_plural = "Номера"
         ordering = ["-created_at"]  # Сортировка по умолчанию: новые сверху
+        indexes = [
+            # Ключи keyset-пагинации для режимов сортировки rooms/list (обход в обе стороны)
+            models.Index(fields=["price", "id"], name="room_price_id_idx"),
+            models.Index(fields=["created_at", "id"], name="room_created_at_id_idx"),
+        ]
 
     def __str__(self):
         return f"Номер #{self.id} - {self.price:.2f} руб./ночь"
@@ -0,0 +1,139 @@
+"""
+Статистика цен номеров (rooms/stats/) по отсортированному массиву цен.
+
+Цены всех номеров читаются из БД одним запросом в массив копеек array("q") в порядке
+(price, id), рядом — id номеров в том же порядке. Массив кэшируется до изменения каталога
+(rooms/cache.py), поэтому статистика по всем номерам не обращается к БД. Для периода из
+массива исключаются цены занятых номеров: из БД читаются только брони, пересекающиеся
+с периодом, а позиции их номеров в массиве находятся двоичным поиском.
+
+Перцентили считаются как percentile_cont (линейная интерполяция между соседними ценами в float8),
+столбцы гистограммы — как width_bucket (максимальная цена попадает в последний столбец).
+"""
+
+import math
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from decimal import Decimal
+
+from django.db import connection
+
+from bookings.models import Booking
+
+from .models import Room
+
+# Перцентили цен в статистике (rooms/stats/)
+PRICE_PERCENTILES = (25, 50, 75, 90, 95, 99)
+
+# Все цены в копейках и id номеров в порядке (price, id) — два массива одним запросом
+SORTED_PRICES_SQL = f"""
+    SELECT
+        coalesce(array_agg((price * 100)::bigint ORDER BY price, id), '{{}}'),
+        coalesce(array_agg(id ORDER BY price, id), '{{}}')
+    FROM {Room._meta.db_table}
+"""
+
+# Цены (в копейках) и id номеров, занятых хотя бы частично в период [date_start, date_end)
+BUSY_ROOMS_SQL = f"""
+    SELECT (room.price * 100)::bigint, room.id
+    FROM {Room._meta.db_table} room
+    WHERE EXISTS (
+        SELECT 1 FROM {Booking._meta.db_table} booking
+        WHERE booking.room_id = room.id AND booking.date_start < %s AND booking.date_end > %s
+    )
+"""
+
+CENT = Decimal("0.01")
+
+
+def load_sorted_prices() -> tuple[array, array]:
+    """Цены всех номеров в копейках и id номеров, упорядоченные по (price, id)."""
+    with connection.cursor() as cursor:
+        cursor.execute(SORTED_PRICES_SQL)
+        prices, room_ids = cursor.fetchone()
+    return array("q", prices), array("q", room_ids)
+
+
+def load_busy_rooms(date_start, date_end) -> list[tuple[int, int]]:
+    """Цены в копейках и id номеров, занятых в период [date_start, date_end)."""
+    with connection.cursor() as cursor:
+        cursor.execute(BUSY_ROOMS_SQL, [date_end, date_start])
+        return cursor.fetchall()
+
+
+def exclude_rooms(prices: array, room_ids: array, rooms: Iterable[tuple[int, int]]) -> array:
+    """Массив prices без цен номеров rooms (пары цена, id); номера не из массива пропускаются."""
+    positions = []
+    for price, room_id in rooms:
+        # Номера с одной ценой лежат подряд и упорядочены по id
+        start = bisect_left(prices, price)
+        position = bisect_left(room_ids, room_id, start, bisect_left(prices, price + 1, start))
+        if position < len(room_ids) and room_ids[position] == room_id and prices[position] == price:
+            positions.append(position)
+
+    remaining = array("q")
+    start = 0
+    for position in sorted(positions):
+        remaining += prices[start:position]
+        start = position + 1
+    remaining += prices[start:]
+    return remaining
+
+
+def _cents(value: int) -> Decimal:
+    return Decimal(value).scaleb(-2)
+
+
+def _percentile(prices: array, percent: int) -> Decimal:
+    """percentile_cont: цена на позиции percent% * (n - 1) с интерполяцией между соседями.
+
+    Как и в PostgreSQL, интерполяция выполняется в float8 — результат совпадает с percentile_cont.
+    """
+    position = percent / 100 * (len(prices) - 1)
+    rank = math.floor(position)
+    low = prices[rank] / 100
+    value = low
+    if position > rank:
+        value += (prices[rank + 1] / 100 - low) * (position - rank)
+    return Decimal(value).quantize(CENT)
+
+
+def _histogram_counts(prices: array, buckets: int) -> list[int]:
+    """Количество цен в каждом из buckets столбцов равной ширины между минимальной и максимальной ценой."""
+    low, span = prices[0], prices[-1] - prices[0]
+    if not span:
+        return [len(prices)] + [0] * (buckets - 1)
+    # Столбец index начинается с первой цены, для которой (price - low) * buckets >= index * span
+    edges = [0, *(bisect_left(prices, low - (-index * span // buckets)) for index in range(1, buckets)), len(prices)]
+    return [end - start for start, end in zip(edges, edges[1:], strict=False)]
+
+
+def price_stats(prices: array, buckets: int) -> dict:
+    """Статистика отсортированных цен в копейках: min/max/среднее, перцентили и гистограмма."""
+    count = len(prices)
+    stats = {
+        "count": count,
+        "min": None,
+        "max": None,
+        "avg": None,
+        "percentiles": {f"p{p}": None for p in PRICE_PERCENTILES},
+        "histogram": [],
+    }
+    if not count:
+        return stats
+
+    price_min, price_max = _cents(prices[0]), _cents(prices[-1])
+    width = (price_max - price_min) / buckets
+    stats["min"], stats["max"] = price_min, price_max
+    stats["avg"] = (_cents(sum(prices)) / count).quantize(CENT)
+    stats["percentiles"] = {f"p{p}": _percentile(prices, p) for p in PRICE_PERCENTILES}
+    stats["histogram"] = [
+        {
+            "price_from": (price_min + width * index).quantize(CENT),
+            "price_to": (price_min + width * (index + 1)).quantize(CENT),
+            "count": bucket_count,
+        }
+        for index, bucket_count in enumerate(_histogram_counts(prices, buckets))
+    ]
+    return stats
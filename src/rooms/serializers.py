@@ -1,6 +1,13 @@
+from collections.abc import AsyncIterator, Iterable, Iterator
+
+from django.db.models import QuerySet
+
 # Импорт модуля сериализаторов из Django REST Framework
 from rest_framework import serializers
 
+from core.fast_serializers import format_datetime, format_decimal, output_timezone
+from core.streaming import STREAM_CHUNK_SIZE, aiterate
+
 # Импорт модели Room из текущего пакета (файл models.py в той же директории)
 from .models import Room
 
@@ -26,6 +33,60 @@ class RoomSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
 
+class RoomFastSerializer:
+    """Быстрый сериализатор номеров только для чтения.
+
+    Строит словари прямо из кортежей values_list(), минуя ModelSerializer.
+    Результат совпадает с RoomSerializer(rooms, many=True).data.
+    """
+
+    fields = RoomSerializer.Meta.fields
+
+    @classmethod
+    def iter_rows(cls, queryset: QuerySet, chunk_size: int | None = None) -> Iterator[dict]:
+        """Словари номеров по одному; chunk_size — чтение серверным курсором порциями."""
+        rows = queryset.values_list(*cls.fields)
+        if chunk_size:
+            rows = rows.iterator(chunk_size=chunk_size)
+        return cls._format(rows)
+
+    @classmethod
+    def aiter_rows(cls, queryset: QuerySet, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[dict]:
+        """Асинхронный вариант iter_rows: порции серверного курсора читаются в потоке для синхронного кода.
+
+        values_list().aiterator() в Django 5.2 выполняет запрос прямо в event loop
+        (SynchronousOnlyOperation), поэтому курсор обходится через aiterate.
+        """
+        return aiterate(cls.iter_rows(queryset, chunk_size=chunk_size), chunk_size)
+
+    @classmethod
+    def _format(cls, rows: Iterable[tuple]) -> Iterator[dict]:
+        tz = output_timezone()
+        for id_, description, price, created_at in rows:
+            yield {
+                "id": id_,
+                "description": description,
+                "price": format_decimal(price),
+                "created_at": format_datetime(created_at, tz),
+            }
+
+    @classmethod
+    def serialize(cls, queryset: QuerySet) -> list[dict]:
+        """Список словарей всех номеров queryset."""
+        return list(cls.iter_rows(queryset))
+
+    @classmethod
+    def serialize_objects(cls, rooms: Iterable[Room]) -> list[dict]:
+        """Список словарей уже загруженных номеров (например, страницы keyset-пагинации)."""
+        return list(cls._format((room.id, room.description, room.price, room.created_at) for room in rooms))
+
+    @classmethod
+    async def aserialize(cls, queryset: QuerySet) -> list[dict]:
+        """Асинхронный вариант serialize."""
+        rows = [row async for row in queryset.values_list(*cls.fields)]
+        return list(cls._format(rows))
+
+
 class RoomCreateSerializer(serializers.ModelSerializer):
     """Сериализатор для создания номера (только необходимые поля)."""
 
@@ -46,3 +107,66 @@ class RoomCreateSerializer(serializers.ModelSerializer):
         if value <= 0:
             raise serializers.ValidationError("Цена должна быть положительной")
         return value
+
+
+class RoomAvailabilitySerializer(serializers.Serializer):
+    """Параметры поиска свободных номеров (query string rooms/available/)."""
+
+    date_start = serializers.DateField()
+    date_end = serializers.DateField()
+    price_min = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    price_max = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+
+    def validate(self, data):
+        """Проверка периода и диапазона цен."""
+        if data["date_start"] >= data["date_end"]:
+            raise serializers.ValidationError("Дата окончания должна быть позже даты начала")
+
+        if "price_min" in data and "price_max" in data and data["price_min"] > data["price_max"]:
+            raise serializers.ValidationError("Минимальная цена не может быть больше максимальной")
+
+        return data
+
+
+# Число столбцов гистограммы цен: по умолчанию и наибольшее
+DEFAULT_PRICE_BUCKETS = 10
+MAX_PRICE_BUCKETS = 100
+
+
+class RoomPriceStatsParamsSerializer(serializers.Serializer):
+    """Параметры статистики цен (query string rooms/stats/): период необязателен."""
+
+    date_start = serializers.DateField(required=False)
+    date_end = serializers.DateField(required=False)
+    buckets = serializers.IntegerField(min_value=1, max_value=MAX_PRICE_BUCKETS, default=DEFAULT_PRICE_BUCKETS)
+
+    def validate(self, data):
+        """Период задаётся обеими датами или не задаётся вовсе."""
+        if ("date_start" in data) != ("date_end" in data):
+            raise serializers.ValidationError("Период задаётся обеими датами: date_start и date_end")
+
+        if "date_start" in data and data["date_start"] >= data["date_end"]:
+            raise serializers.ValidationError("Дата окончания должна быть позже даты начала")
+
+        return data
+
+
+class PriceBucketSerializer(serializers.Serializer):
+    """Столбец гистограммы цен: номера с ценой в [price_from, price_to)."""
+
+    price_from = serializers.DecimalField(max_digits=12, decimal_places=2)
+    price_to = serializers.DecimalField(max_digits=12, decimal_places=2)
+    count = serializers.IntegerField()
+
+
+class RoomPriceStatsSerializer(serializers.Serializer):
+    """Распределение цен номеров (результат RoomService.get_price_stats)."""
+
+    count = serializers.IntegerField()
+    min = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    max = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    avg = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    percentiles = serializers.DictField(
+        child=serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    )
+    histogram = PriceBucketSerializer(many=True)
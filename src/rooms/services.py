@@ -1,4 +1,39 @@
+from array import array
+from collections.abc import Iterable
+from datetime import date
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, QuerySet
+
+from bookings.models import Booking
+from bookings.occupancy import get_occupancy_index
+from core.pagination import DEFAULT_PAGE_SIZE, Page, apaginate, paginate
+from core.serializers import ItemErrorsListSerializer
+
+from . import cache as rooms_cache
+from . import transfer
 from .models import Room
+from .prices import exclude_rooms, load_busy_rooms, load_sorted_prices, price_stats
+from .serializers import DEFAULT_PRICE_BUCKETS, RoomCreateSerializer
+
+# Удаление номера вместе с бронями одним запросом (каскад ORM читает номер и удаляет брони
+# отдельными запросами). Внешний ключ броней отложенный, поэтому порядок удаления в CTE не важен
+DELETE_ROOM_SQL = f"""
+    WITH deleted_bookings AS (DELETE FROM {Booking._meta.db_table} WHERE room_id = %s)
+    DELETE FROM {Room._meta.db_table} WHERE id = %s RETURNING id
+"""
+
+# Режимы сортировки списка номеров. Последнее поле (id) делает порядок однозначным,
+# что нужно для keyset-пагинации
+ROOM_ORDERINGS = {
+    "price_asc": ["price", "id"],
+    "price_desc": ["-price", "-id"],
+    "date_asc": ["created_at", "id"],
+    "date_desc": ["-created_at", "-id"],
+}
+DEFAULT_ROOM_ORDERING = ROOM_ORDERINGS["date_desc"]  # Как Room.Meta.ordering: новые сверху
 
 
 class RoomService:
@@ -8,25 +43,191 @@ class RoomService:
     def create_room(description: str, price: float) -> Room:
         """Создание нового номера отеля."""
         room = Room.objects.create(description=description, price=price)
+        # Закэшированные списки номеров устаревают после фиксации транзакции
+        transaction.on_commit(rooms_cache.invalidate)
         return room
 
     @staticmethod
     def delete_room(room_id: int) -> None:
-        """Удаление номера отеля и всех его броней."""
-        Room.objects.filter(id=room_id).delete()
+        """Удаление номера отеля и всех его броней; для несуществующего — Room.DoesNotExist."""
+        with connection.cursor() as cursor:
+            cursor.execute(DELETE_ROOM_SQL, [room_id, room_id])
+            deleted = cursor.fetchone() is not None
+
+        if not deleted:
+            raise Room.DoesNotExist("Комната не найдена")
+
+        transaction.on_commit(rooms_cache.invalidate)
+        occupancy = get_occupancy_index()
+        if occupancy is not None:
+            # Raw DELETE не вызывает post_delete, поэтому индекс обновляем явно
+            transaction.on_commit(lambda: occupancy.remove_room(room_id))
+
+    @staticmethod
+    async def acreate_room(description: str, price: float) -> Room:
+        """Асинхронное создание номера.
+
+        create_room выполняется в потоке для синхронного кода: с Idempotency-Key view работает
+        в транзакции, и кэш сбрасывается только после её фиксации (в autocommit — сразу).
+        """
+        return await sync_to_async(RoomService.create_room)(description, price)
+
+    @staticmethod
+    async def adelete_room(room_id: int) -> None:
+        """Асинхронное удаление номера и всех его броней.
+
+        Сырой SQL выполняется в потоке для синхронного кода; в autocommit
+        on_commit-обработчики delete_room (сброс кэша) срабатывают сразу.
+        """
+        await sync_to_async(RoomService.delete_room)(room_id)
+
+    @staticmethod
+    def import_rooms(
+        rows: Iterable[dict], atomic: bool = True, batch_size: int = transfer.IMPORT_BATCH_SIZE
+    ) -> transfer.ImportResult:
+        """Импорт номеров из потока записей (transfer.read_rows).
+
+        Записи проверяются пачками RoomCreateSerializer (включая validate_price) и
+        записываются COPY, в памяти одновременно не больше одной пачки.
+        atomic=True — при любой невалидной записи ничего не записывается,
+        atomic=False — записываются все корректные записи.
+        """
+        result = transfer.ImportResult()
+
+        def flush(batch: list[dict], first_row: int) -> None:
+            validator = ItemErrorsListSerializer(child=RoomCreateSerializer(), data=batch)
+            validator.is_valid()
+            for index, errors in validator.item_errors.items():
+                result.failed += 1
+                if len(result.errors) < transfer.MAX_REPORTED_ERRORS:
+                    result.errors.append({"row": first_row + index, "errors": errors})
+            # В режиме atomic после первой ошибки записи только проверяются
+            valid = [row for row in validator.validated_data if row is not None]
+            if valid and not (atomic and result.failed):
+                result.created += transfer.copy_rooms(valid)
+
+        with transaction.atomic():
+            batch, first_row = [], 1
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    flush(batch, first_row)
+                    first_row += len(batch)
+                    batch = []
+            if batch:
+                flush(batch, first_row)
+
+            if atomic and result.failed:
+                # Пачки, записанные до первой ошибки, откатываются
+                transaction.set_rollback(True)
+                result.created = 0
+
+        if result.created:
+            transaction.on_commit(rooms_cache.invalidate)
+        return result
+
+    @staticmethod
+    def export_rooms_csv() -> Iterable[bytes]:
+        """CSV всех номеров порциями (для потокового ответа)."""
+        return transfer.export_csv()
+
+    @staticmethod
+    def get_ordering(sort_by: str | None = None) -> list[str]:
+        """Поля сортировки для режима sort_by (неизвестный режим — сортировка по умолчанию)."""
+        return ROOM_ORDERINGS.get(sort_by, DEFAULT_ROOM_ORDERING)
+
+    @staticmethod
+    def get_rooms_queryset(sort_by: str | None = None) -> QuerySet[Room]:
+        """Queryset номеров, отсортированный по режиму sort_by."""
+        return Room.objects.order_by(*RoomService.get_ordering(sort_by))
 
     @staticmethod
     def get_rooms(sort_by: str | None = None) -> list[Room]:
         """Получение списка номеров с возможностью сортировки."""
-        rooms = Room.objects.all()
-
-        if sort_by == "price_asc":
-            rooms = rooms.order_by("price")
-        elif sort_by == "price_desc":
-            rooms = rooms.order_by("-price")
-        elif sort_by == "date_asc":
-            rooms = rooms.order_by("created_at")
-        elif sort_by == "date_desc":
-            rooms = rooms.order_by("-created_at")
-
-        return list(rooms)
+        return list(RoomService.get_rooms_queryset(sort_by))
+
+    @staticmethod
+    def get_rooms_page(sort_by: str | None, cursor: str | None, limit: int) -> Page:
+        """Получение одной страницы номеров (keyset-пагинация по ключу сортировки)."""
+        return paginate(Room.objects.all(), RoomService.get_ordering(sort_by), cursor, limit)
+
+    @staticmethod
+    async def aget_rooms_page(sort_by: str | None, cursor: str | None, limit: int) -> Page:
+        """Асинхронный вариант get_rooms_page."""
+        return await apaginate(Room.objects.all(), RoomService.get_ordering(sort_by), cursor, limit)
+
+    @staticmethod
+    def get_available_rooms_queryset(
+        date_start: date, date_end: date, price_min: Decimal | None = None, price_max: Decimal | None = None
+    ) -> QuerySet[Room]:
+        """Номера, свободные на весь период [date_start, date_end), с фильтром по цене.
+
+        Занятость проверяется одним запросом: NOT EXISTS по пересекающимся броням номера
+        (подзапрос идёт по индексу booking_room_dates_idx). Индекс занятости процесса здесь
+        не используется: брони, созданные или удалённые другими воркерами, он не видит.
+        """
+        overlapping = Booking.objects.filter(room=OuterRef("pk")).overlapping(date_start, date_end)
+        rooms = Room.objects.filter(~Exists(overlapping))
+
+        if price_min is not None:
+            rooms = rooms.filter(price__gte=price_min)
+        if price_max is not None:
+            rooms = rooms.filter(price__lte=price_max)
+
+        return rooms
+
+    @staticmethod
+    def get_available_rooms_page(
+        date_start: date,
+        date_end: date,
+        price_min: Decimal | None = None,
+        price_max: Decimal | None = None,
+        sort_by: str | None = None,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Page:
+        """Одна страница свободных номеров в порядке sort_by (keyset-пагинация)."""
+        rooms = RoomService.get_available_rooms_queryset(date_start, date_end, price_min, price_max)
+        return paginate(rooms, RoomService.get_ordering(sort_by), cursor, limit)
+
+    @staticmethod
+    async def aget_available_rooms_page(
+        date_start: date,
+        date_end: date,
+        price_min: Decimal | None = None,
+        price_max: Decimal | None = None,
+        sort_by: str | None = None,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Page:
+        """Асинхронный вариант get_available_rooms_page."""
+        rooms = RoomService.get_available_rooms_queryset(date_start, date_end, price_min, price_max)
+        return await apaginate(rooms, RoomService.get_ordering(sort_by), cursor, limit)
+
+    @staticmethod
+    def get_price_stats(
+        date_start: date | None = None, date_end: date | None = None, buckets: int = DEFAULT_PRICE_BUCKETS
+    ) -> dict:
+        """Распределение цен номеров: min/max/среднее, перцентили и гистограмма из buckets столбцов.
+
+        Считается по отсортированному массиву цен каталога (rooms/prices.py), закэшированному
+        до изменения номеров. С периодом [date_start, date_end) — только по номерам, свободным
+        на весь период: из массива исключаются номера с пересекающимися бронями.
+        """
+        prices, room_ids = RoomService.get_sorted_prices()
+        if date_start is not None:
+            prices = exclude_rooms(prices, room_ids, load_busy_rooms(date_start, date_end))
+        return price_stats(prices, buckets)
+
+    @staticmethod
+    def get_sorted_prices() -> tuple[array, array]:
+        """Цены (в копейках) и id всех номеров в порядке (price, id): из кэша или одним запросом к БД."""
+        if not rooms_cache.enabled():
+            return load_sorted_prices()
+
+        key = rooms_cache.prices_key()
+        prices = rooms_cache.get_prices(key)
+        if prices is None:
+            prices = load_sorted_prices()
+            rooms_cache.set_prices(key, prices)
+        return prices
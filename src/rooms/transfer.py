@@ -0,0 +1,123 @@
+"""
+Импорт и экспорт номеров файлами CSV / NDJSON.
+
+Файл читается построчно, строки проверяются и записываются пачками по
+IMPORT_BATCH_SIZE через COPY FROM STDIN, экспорт CSV — через COPY TO STDOUT
+порциями по id. Память на стороне приложения ограничена размером одной пачки
+и не зависит от размера файла.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
+from django.db import connection
+from django.utils import timezone
+
+from core.db import copy_from, copy_to
+
+from .models import Room
+
+# Форматы файлов импорта/экспорта
+FILE_FORMATS = ("csv", "ndjson")
+
+# Сколько строк файла проверяется и записывается за один раз
+IMPORT_BATCH_SIZE = 5000
+
+# Сколько строк экспорта выгружается одним COPY
+EXPORT_CHUNK_SIZE = 10_000
+
+# Сколько ошибок строк попадает в отчёт об импорте (остальные только считаются)
+MAX_REPORTED_ERRORS = 100
+
+# Колонки экспорта CSV (как у RoomSerializer)
+EXPORT_FIELDS = ["id", "description", "price", "created_at"]
+
+COPY_FROM_SQL = f"COPY {Room._meta.db_table} (description, price, created_at) FROM STDIN WITH (FORMAT csv)"
+
+# Порция экспорта: строки с id в (after, upto]; без upto — до конца таблицы
+EXPORT_CHUNK_SQL = f"""
+    COPY (
+        SELECT {", ".join(EXPORT_FIELDS)} FROM {Room._meta.db_table}
+        WHERE id > %s AND id <= COALESCE(%s, id) ORDER BY id
+    ) TO STDOUT WITH (FORMAT csv{{header}})
+"""
+
+# Последний id порции экспорта (index-only scan по первичному ключу)
+EXPORT_BOUNDARY_SQL = f"SELECT id FROM {Room._meta.db_table} WHERE id > %s ORDER BY id OFFSET %s LIMIT 1"
+
+
+@dataclass
+class ImportResult:
+    """Итог импорта: сколько номеров записано, сколько строк отклонено и ошибки первых из них."""
+
+    created: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)  # {"row": номер записи с 1, "errors": {...}}
+
+
+def decode_lines(lines: Iterable[bytes]) -> Iterator[str]:
+    """Строки текста из строк байтов файла (UTF-8, BOM в начале файла отбрасывается)."""
+    first = True
+    for line in lines:
+        text = line.decode("utf-8")
+        if first:
+            text = text.removeprefix("\ufeff")
+            first = False
+        yield text
+
+
+def read_rows(lines: Iterable[str], file_format: str) -> Iterator[dict]:
+    """Записи файла в виде словарей.
+
+    Лишние колонки (например, id и created_at из экспорта) сериализатор игнорирует,
+    поэтому выгрузку export_csv можно загрузить обратно.
+    """
+    if file_format == "csv":
+        yield from csv.DictReader(lines)
+        return
+
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        # Строка, которая не является JSON-объектом, проверяется как пустая запись и получает ошибки полей
+        yield row if isinstance(row, dict) else {}
+
+
+def copy_rooms(rows: list[dict]) -> int:
+    """Записывает проверенные номера одним COPY FROM STDIN; возвращает количество строк."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    created_at = timezone.now().isoformat()
+    for row in rows:
+        writer.writerow([row["description"], row["price"], created_at])
+    buffer.seek(0)
+
+    with connection.cursor() as cursor:
+        copy_from(cursor, COPY_FROM_SQL, buffer)
+    return len(rows)
+
+
+def export_csv(chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """CSV всех номеров в порядке id порциями по chunk_size строк (COPY TO STDOUT)."""
+    after = 0
+    header = ", HEADER"
+    while True:
+        buffer = io.BytesIO()
+        with connection.cursor() as cursor:
+            cursor.execute(EXPORT_BOUNDARY_SQL, [after, chunk_size - 1])
+            row = cursor.fetchone()
+            upto = row[0] if row else None
+            copy_to(cursor, EXPORT_CHUNK_SQL.format(header=header), [after, upto], buffer)
+
+        if buffer.tell():
+            yield buffer.getvalue()
+        if upto is None:
+            return
+        after, header = upto, ""
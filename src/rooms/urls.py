@@ -1,9 +1,21 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
+# Под ASGI основные эндпоинты обслуживают async-views (те же URL и ответы);
+# WSGI-воркеры их не импортируют
+if settings.ASYNC_VIEWS_ENABLED:
+    from . import async_views as api
+else:
+    api = views
+
 urlpatterns = [
-    path("create/", views.create_room, name="room-create"),
-    path("delete/<int:room_id>/", views.delete_room, name="room-delete"),
-    path("list/", views.list_rooms, name="room-list"),
+    path("create/", api.create_room, name="room-create"),
+    path("delete/<int:room_id>/", api.delete_room, name="room-delete"),
+    path("list/", api.list_rooms, name="room-list"),
+    path("available/", api.list_available_rooms, name="room-available"),
+    path("stats/", views.room_stats, name="room-stats"),
+    path("import/", views.import_rooms, name="room-import"),
+    path("export/", api.export_rooms, name="room-export"),
 ]
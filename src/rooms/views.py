@@ -1,18 +1,37 @@
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+
 # Импорт необходимых модулей из Django REST Framework
 from rest_framework import status  # Импорт HTTP статусов (200, 201, 404 и т.д.)
-from rest_framework.decorators import api_view  # Декоратор для создания API view
+from rest_framework.decorators import api_view, parser_classes  # Декораторы для создания API view
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response  # Класс для создания HTTP ответов
 
+from core.idempotency import idempotent
+from core.pagination import InvalidCursorError, parse_limit
+from core.renderers import json_dumps
+from core.serializers import BULK_MODES
+from core.streaming import STREAM_CHUNK_SIZE, get_stream_format, stream_rows
+
+from . import cache as rooms_cache
+from . import transfer
 from .models import Room
 
 # Импорт сериализаторов из текущего пакета (файл serializers.py)
-from .serializers import RoomCreateSerializer, RoomSerializer
+from .serializers import (
+    RoomAvailabilitySerializer,
+    RoomCreateSerializer,
+    RoomFastSerializer,
+    RoomPriceStatsParamsSerializer,
+    RoomPriceStatsSerializer,
+)
 
 # Импорт сервисного слоя для работы с бизнес-логикой комнат
 from .services import RoomService
 
 
 @api_view(["POST"])  # Декоратор: разрешаем только POST запросы к этой функции
+@idempotent("room-create")  # Повтор с тем же Idempotency-Key получает сохранённый ответ
 def create_room(request):
     """Создание нового номера отеля."""
 
@@ -36,8 +55,7 @@ def create_room(request):
 @api_view(["DELETE"])
 def delete_room(request, room_id):
     try:
-        # Сначала проверяем существование комнаты
-        Room.objects.get(id=room_id)
+        # Один DELETE ... RETURNING: несуществующая комната — Room.DoesNotExist
         RoomService.delete_room(room_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
     except Room.DoesNotExist:
@@ -53,11 +71,160 @@ def list_rooms(request):
     # Получаем параметр сортировки из query string (?sort_by=price)
     sort_by = request.GET.get("sort_by")
 
-    # Получаем отсортированный список комнат через сервисный слой
-    rooms = RoomService.get_rooms(sort_by)
+    # Потоковая выдача всего списка (?stream=1 — JSON-массив, ?stream=ndjson — NDJSON)
+    try:
+        stream_format = get_stream_format(request.GET)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if stream_format:
+        rows = RoomFastSerializer.iter_rows(RoomService.get_rooms_queryset(sort_by), chunk_size=STREAM_CHUNK_SIZE)
+        return stream_rows(rows, stream_format)
+
+    # Готовый JSON берём из кэша (только для JSON-ответов, Browsable API не кэшируется)
+    cache_entry = None
+    if request.accepted_renderer.format == "json" and rooms_cache.enabled():
+        cache_key, etag = cache_entry = rooms_cache.list_entry(
+            RoomService.get_ordering(sort_by), request.GET.get("cursor"), request.GET.get("limit")
+        )
+        # Клиент уже получил эту версию списка — 304 без чтения кэша и БД
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        body = rooms_cache.get_body(cache_key)
+        if body is not None:
+            return HttpResponse(body, content_type="application/json", headers={"ETag": etag})
+
+    # Постраничная выдача (?limit=&cursor=): курсор следующей страницы возвращается в "next"
+    if "limit" in request.GET or "cursor" in request.GET:
+        try:
+            page = RoomService.get_rooms_page(sort_by, request.GET.get("cursor"), parse_limit(request.GET.get("limit")))
+        except InvalidCursorError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data = {"results": RoomFastSerializer.serialize_objects(page.items), "next": page.next_cursor}
+    else:
+        # Получаем отсортированный список комнат через сервисный слой
+        rooms = RoomService.get_rooms_queryset(sort_by)
+
+        # Быстрая сериализация только для чтения: словари прямо из values_list(), без ModelSerializer
+        data = RoomFastSerializer.serialize(rooms)
+
+    if cache_entry is None:
+        return Response(data)
+
+    cache_key, etag = cache_entry
+    rooms_cache.set_body(cache_key, json_dumps(data))
+    return Response(data, headers={"ETag": etag})
+
+
+@api_view(["GET"])
+def list_available_rooms(request):
+    """Поиск номеров, свободных на период (?date_start=&date_end=&price_min=&price_max=&sort_by=)."""
+
+    # Проверяем параметры поиска из query string
+    params = RoomAvailabilitySerializer(data=request.GET)
+    if not params.is_valid():
+        return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    # Свободные номера выдаются постранично: курсор следующей страницы возвращается в "next"
+    try:
+        page = RoomService.get_available_rooms_page(
+            **params.validated_data,
+            sort_by=request.GET.get("sort_by"),
+            cursor=request.GET.get("cursor"),
+            limit=parse_limit(request.GET.get("limit")),
+        )
+    except InvalidCursorError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({"results": RoomFastSerializer.serialize_objects(page.items), "next": page.next_cursor})
+
+
+@api_view(["GET"])
+def room_stats(request):
+    """Распределение цен номеров (?date_start=&date_end= — только свободных на период, ?buckets=)."""
+
+    params = RoomPriceStatsParamsSerializer(data=request.GET)
+    if not params.is_valid():
+        return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    # Готовый JSON из кэша: сбрасывается при изменении номеров, для периода — и броней
+    cache_key = None
+    if request.accepted_renderer.format == "json" and rooms_cache.enabled():
+        cache_key = rooms_cache.stats_key(
+            params.validated_data.get("date_start"),
+            params.validated_data.get("date_end"),
+            params.validated_data["buckets"],
+        )
+        body = rooms_cache.get_body(cache_key)
+        if body is not None:
+            return HttpResponse(body, content_type="application/json")
+
+    data = RoomPriceStatsSerializer(RoomService.get_price_stats(**params.validated_data)).data
+    if cache_key is not None:
+        rooms_cache.set_body(cache_key, json_dumps(data))
+    return Response(data)
+
+
+@api_view(["POST"])
+@parser_classes([MultiPartParser])  # Файл приходит multipart и в профиле API_PROFILE (только JSON)
+def import_rooms(request):
+    """Импорт номеров из файла (multipart, поле file).
+
+    ?file_format=csv (по умолчанию, колонки description,price) или ndjson;
+    ?mode=atomic (по умолчанию) — всё или ничего, ?mode=best_effort — записываются все корректные строки.
+    """
+    file_format = request.GET.get("file_format", "csv")
+    mode = request.GET.get("mode", "atomic")
+    if file_format not in transfer.FILE_FORMATS:
+        return Response(
+            {"error": f"Параметр file_format должен быть одним из: {', '.join(transfer.FILE_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if mode not in BULK_MODES:
+        return Response(
+            {"error": f"Параметр mode должен быть одним из: {', '.join(BULK_MODES)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response({"error": "Файл не передан (поле file)"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        # Загруженный файл читается построчно: большие файлы Django держит во временном файле, а не в памяти
+        rows = transfer.read_rows(transfer.decode_lines(upload), file_format)
+        result = RoomService.import_rooms(rows, atomic=mode == "atomic")
+    except UnicodeDecodeError:
+        return Response({"error": "Файл должен быть в кодировке UTF-8"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not result.created:
+        response_status = status.HTTP_400_BAD_REQUEST if result.failed else status.HTTP_200_OK
+    elif result.failed:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_201_CREATED
+    return Response(
+        {"created": result.created, "failed": result.failed, "errors": result.errors}, status=response_status
+    )
+
+
+@api_view(["GET"])
+def export_rooms(request):
+    """Потоковая выгрузка всех номеров: ?file_format=csv (COPY TO, по умолчанию) или ndjson."""
+    file_format = request.GET.get("file_format", "csv")
+    if file_format not in transfer.FILE_FORMATS:
+        return Response(
+            {"error": f"Параметр file_format должен быть одним из: {', '.join(transfer.FILE_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
-    # Сериализуем данные (many=True - сериализуем список объектов)
-    serializer = RoomSerializer(rooms, many=True)
+    if file_format == "ndjson":
+        rows = RoomFastSerializer.iter_rows(Room.objects.order_by("id"), chunk_size=STREAM_CHUNK_SIZE)
+        response = stream_rows(rows, "ndjson")
+    else:
+        response = StreamingHttpResponse(RoomService.export_rooms_csv(), content_type="text/csv; charset=utf-8")
 
-    # Возвращаем сериализованные данные со статусом 200 OK
-    return Response(serializer.data)
+    response["Content-Disposition"] = f'attachment; filename="rooms.{file_format}"'
+    return response
@@ -0,0 +1,123 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory
+from rest_framework import status
+
+from bookings import async_views
+from bookings.models import Booking
+from rooms.models import Room
+
+
+def call(view, request, *args):
+    """Вызов async-view из синхронного теста (запросы идут в той же транзакции теста)."""
+    return async_to_sync(view)(request, *args)
+
+
+class TestBookingAsyncViews:
+    """Тесты для async-версий views приложения bookings."""
+
+    factory = AsyncRequestFactory()
+
+    @pytest.mark.django_db
+    def test_create_booking(self):
+        """Тест создания брони и отказа при пересечении."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        data = {
+            "room": room.id,
+            "date_start": date.today().isoformat(),
+            "date_end": (date.today() + timedelta(days=2)).isoformat(),
+        }
+
+        response = call(async_views.create_booking, self.factory.post("/", data, content_type="application/json"))
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Booking.objects.filter(id=json.loads(response.content)["booking_id"]).exists()
+
+        response = call(async_views.create_booking, self.factory.post("/", data, content_type="application/json"))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "error" in json.loads(response.content)
+
+    @pytest.mark.django_db
+    def test_create_booking_nonexistent_room(self):
+        """Тест создания брони для несуществующего номера."""
+        data = {"room": 999999, "date_start": "2025-01-01", "date_end": "2025-01-03"}
+
+        response = call(async_views.create_booking, self.factory.post("/", data, content_type="application/json"))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.django_db
+    def test_delete_booking(self):
+        """Тест удаления брони."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        booking = Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+
+        response = call(async_views.delete_booking, self.factory.delete("/"), booking.id)
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert call(async_views.delete_booking, self.factory.delete("/"), booking.id).status_code == 404
+
+    @pytest.mark.django_db
+    def test_update_booking(self):
+        """Тест изменения дат брони и ответа 404 для несуществующей."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        booking = Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+        data = {"date_start": (date.today() + timedelta(days=1)).isoformat()}
+
+        response = call(
+            async_views.update_booking, self.factory.patch("/", data, content_type="application/json"), booking.id
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content)["date_start"] == data["date_start"]
+        booking.refresh_from_db()
+        assert booking.date_start == date.today() + timedelta(days=1)
+
+        response = call(
+            async_views.update_booking, self.factory.patch("/", data, content_type="application/json"), 999999
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.django_db
+    def test_list_room_bookings_matches_sync_view(self, client):
+        """Тест: список, страница и ETag совпадают с синхронной версией."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        for offset in [4, 0]:
+            Booking.objects.create(
+                room=room,
+                date_start=date.today() + timedelta(days=offset),
+                date_end=date.today() + timedelta(days=offset + 2),
+            )
+        url = f"/bookings/list/{room.id}/"
+
+        for params in [{}, {"limit": 1}]:
+            response = call(async_views.list_room_bookings, self.factory.get(url, params), room.id)
+            expected = client.get(url, params)
+
+            assert response.content == expected.content
+            assert response["ETag"] == expected["ETag"]
+
+        request = self.factory.get(url, headers={"If-None-Match": client.get(url)["ETag"]})
+        assert call(async_views.list_room_bookings, request, room.id).status_code == status.HTTP_304_NOT_MODIFIED
+        assert call(async_views.list_room_bookings, self.factory.get(url), 999999).status_code == 404
+
+    @pytest.mark.django_db
+    def test_bookings_calendar_matches_sync_view(self, client):
+        """Тест: календарь совпадает с синхронной версией."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+        params = {
+            "room_ids": f"{room.id},999999",
+            "date_start": date.today().isoformat(),
+            "date_end": (date.today() + timedelta(days=7)).isoformat(),
+        }
+
+        response = call(async_views.bookings_calendar, self.factory.get("/", params))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content) == client.get("/bookings/calendar/", params).json()
+        assert call(async_views.bookings_calendar, self.factory.get("/", {"room_ids": "1"})).status_code == 400
@@ -1,6 +1,7 @@
 from datetime import date, timedelta
 
 import pytest
+from django.db import IntegrityError, connection
 
 from bookings.models import Booking
 from rooms.models import Room
@@ -47,3 +48,67 @@ class TestBookingModel:
         # Должны быть отсортированы по дате начала (по возрастанию)
         assert bookings[0] == booking2  # Ранняя дата начала
         assert bookings[1] == booking1  # Поздняя дата начала
+
+    @pytest.mark.django_db
+    def test_booking_overlap_constraint(self):
+        """Тест: БД не допускает пересекающихся броней одного номера."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        other_room = Room.objects.create(description="Другой номер", price=2500.00)
+        Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=3))
+
+        # Те же даты в другом номере допустимы
+        Booking.objects.create(room=other_room, date_start=date.today(), date_end=date.today() + timedelta(days=3))
+
+        with pytest.raises(IntegrityError):
+            Booking.objects.create(
+                room=room, date_start=date.today() + timedelta(days=1), date_end=date.today() + timedelta(days=2)
+            )
+
+
+# Разделы тестовой БД начинаются с текущего месяца: брони 2025 года лежат в разделе по умолчанию.
+# Пустые разделы PostgreSQL читает последовательно (0 страниц), поэтому проверяется заполненный
+POPULATED_PARTITION = "bookings_booking_default"
+
+
+class TestBookingIndexes:
+    """Тесты планов запросов по броням (EXPLAIN)."""
+
+    ROOMS = 1000
+    BOOKINGS_PER_ROOM = 20
+
+    @pytest.fixture
+    def seeded_room_id(self):
+        """Заполняет таблицу броней (20k строк) и возвращает id одного из номеров."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO rooms_room (description, price, created_at) "
+                "SELECT 'Номер ' || n, 1000 + n, now() FROM generate_series(1, %s) AS n",
+                [self.ROOMS],
+            )
+            # У каждого номера непересекающиеся брони по 2 ночи с шагом 3 дня
+            cursor.execute(
+                "INSERT INTO bookings_booking (room_id, date_start, date_end, created_at) "
+                "SELECT r.id, DATE '2025-01-01' + k * 3, DATE '2025-01-01' + k * 3 + 2, now() "
+                "FROM rooms_room r CROSS JOIN generate_series(0, %s) AS k",
+                [self.BOOKINGS_PER_ROOM - 1],
+            )
+            cursor.execute("ANALYZE rooms_room")
+            cursor.execute("ANALYZE bookings_booking")
+        return Room.objects.order_by("id").values_list("id", flat=True)[self.ROOMS // 2]
+
+    @pytest.mark.django_db
+    def test_room_bookings_use_index(self, seeded_room_id):
+        """Тест: список броней номера читается по составному индексу."""
+        plan = Booking.objects.filter(room_id=seeded_room_id).order_by("date_start").explain()
+
+        assert "booking_room_dates_idx" in plan
+        assert f"Seq Scan on {POPULATED_PARTITION}" not in plan
+
+    @pytest.mark.django_db
+    def test_overlap_check_uses_index(self, seeded_room_id):
+        """Тест: проверка пересечения дат не делает последовательного сканирования."""
+        queryset = Booking.objects.filter(room_id=seeded_room_id).overlapping(date(2025, 1, 10), date(2025, 1, 14))
+        plan = queryset.values("id")[:1].explain()
+
+        assert f"Seq Scan on {POPULATED_PARTITION}" not in plan
+        assert Booking.objects.filter(room_id=seeded_room_id).overlapping(date(2025, 1, 10), date(2025, 1, 14)).exists()
@@ -0,0 +1,159 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from bookings.models import Booking
+from bookings.occupancy import OccupancyIndex, occupancy_index
+from bookings.services import BookingOverlapError, BookingService
+from bookings.signals import connect_signals, disconnect_signals
+from rooms.models import Room
+from rooms.services import RoomService
+
+TODAY = date.today()
+
+
+def days(n):
+    return TODAY + timedelta(days=n)
+
+
+@pytest.fixture
+def enabled_index(settings):
+    """Включённый индекс занятости процесса с подключёнными сигналами."""
+    settings.OCCUPANCY_INDEX_ENABLED = True
+    connect_signals()
+    occupancy_index.base = None
+    yield occupancy_index
+    disconnect_signals()
+    occupancy_index.base = None
+
+
+class TestOccupancyIndex:
+    """Тесты индекса занятости номеров."""
+
+    @pytest.mark.django_db
+    def test_rebuild_and_lookup(self):
+        """Тест построения индекса из БД и проверок по маскам."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        Booking.objects.create(room=room, date_start=days(2), date_end=days(5))
+
+        index = OccupancyIndex(horizon_days=30)
+        index.rebuild()
+
+        assert index.is_free(room.id, days(0), days(2)) is True
+        assert index.is_free(room.id, days(4), days(6)) is False
+        assert index.is_free(room.id, days(5), days(7)) is True
+        # Период за горизонтом — индекс не отвечает
+        assert index.is_free(room.id, days(25), days(40)) is None
+
+    @pytest.mark.django_db
+    def test_add_remove_and_consistency(self):
+        """Тест ручного обновления индекса и сверки с БД."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        index = OccupancyIndex(horizon_days=30)
+        index.rebuild()
+
+        booking = Booking.objects.create(room=room, date_start=days(1), date_end=days(3))
+        assert index.check_consistency() == [room.id]
+
+        index.add(room.id, booking.date_start, booking.date_end)
+        assert index.check_consistency() == []
+
+        booking.delete()
+        index.remove(room.id, days(1), days(3))
+        assert index.check_consistency() == []
+        assert index.is_free(room.id, days(1), days(3)) is True
+
+    @pytest.mark.django_db
+    def test_stale_index_does_not_decide(self, enabled_index, django_capture_on_commit_callbacks):
+        """Тест: изменения других процессов (мимо индекса) не приводят к ложным отказам и ложной доступности."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        other = Room.objects.create(description="Другой номер", price=3000.00)
+        with django_capture_on_commit_callbacks(execute=True):
+            booking = BookingService.create_booking(room.id, days(1), days(4))
+
+        # Другой воркер удалил бронь номера и забронировал другой номер — индекс этого процесса не знает
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM bookings_booking WHERE id = %s", [booking.id])
+            cursor.execute(
+                "INSERT INTO bookings_booking (room_id, date_start, date_end, created_at) VALUES (%s, %s, %s, now())",
+                [other.id, days(1), days(4)],
+            )
+        assert enabled_index.is_free(room.id, days(2), days(3)) is False
+
+        BookingService.create_booking(room.id, days(2), days(3))
+        assert list(RoomService.get_available_rooms_queryset(days(5), days(6)).order_by("id")) == [room, other]
+        assert list(RoomService.get_available_rooms_queryset(days(2), days(3))) == []
+        with pytest.raises(BookingOverlapError):
+            BookingService.create_booking(other.id, days(2), days(3))
+
+    @pytest.mark.django_db
+    def test_create_bookings_skips_overlap_query(
+        self, enabled_index, django_capture_on_commit_callbacks, django_assert_num_queries
+    ):
+        """Тест: пакет, свободный по индексу, создаётся без отдельного запроса пересечений."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        with django_capture_on_commit_callbacks(execute=True):
+            BookingService.create_booking(room.id, days(1), days(4))
+        items = [{"room": room.id, "date_start": days(5), "date_end": days(7)}]
+
+        # Номера пакета, savepoint, bulk_create, release
+        with django_assert_num_queries(4):
+            results = BookingService.create_bookings(items)
+        assert isinstance(results[0], Booking)
+
+        # Занятый по индексу элемент проверяется запросом к БД
+        items = [{"room": room.id, "date_start": days(2), "date_end": days(3)}]
+        with django_assert_num_queries(2):
+            results = BookingService.create_bookings(items)
+        assert isinstance(results[0], BookingOverlapError)
+
+    @pytest.mark.django_db
+    def test_signals_keep_index_in_sync(self, enabled_index, django_capture_on_commit_callbacks):
+        """Тест обновления индекса сигналами при изменении броней через ORM."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        other = Room.objects.create(description="Другой номер", price=3000.00)
+        enabled_index.ensure_built()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            booking = Booking.objects.create(room=room, date_start=days(1), date_end=days(3))
+        assert enabled_index.is_free(room.id, days(1), days(2)) is False
+
+        with django_capture_on_commit_callbacks(execute=True):
+            booking.date_start, booking.date_end = days(10), days(12)
+            booking.save()
+        assert enabled_index.is_free(room.id, days(1), days(2)) is True
+        assert enabled_index.is_free(room.id, days(10), days(11)) is False
+
+        assert list(RoomService.get_available_rooms_queryset(days(10), days(11))) == [other]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            BookingService.delete_booking(booking.id)
+        assert enabled_index.check_consistency() == []
+        assert enabled_index.is_free(room.id, days(10), days(12)) is True
+
+    @pytest.mark.django_db
+    def test_update_booking_moves_dates_in_index(self, enabled_index, django_capture_on_commit_callbacks):
+        """Тест: изменение дат брони сервисом переносит её в индексе."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        enabled_index.ensure_built()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            booking = BookingService.create_booking(room.id, days(1), days(3))
+        with django_capture_on_commit_callbacks(execute=True):
+            BookingService.update_booking(booking.id, days(2), days(6))
+
+        assert enabled_index.check_consistency() == []
+        assert enabled_index.is_free(room.id, days(1), days(2)) is True
+        assert enabled_index.is_free(room.id, days(5), days(6)) is False
+
+    @pytest.mark.django_db
+    def test_command_check(self, capsys):
+        """Тест команды сверки индекса с БД."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        Booking.objects.create(room=room, date_start=days(1), date_end=days(3))
+
+        call_command("occupancy_index", "--check", "--samples", "50")
+
+        assert "согласован" in capsys.readouterr().out
@@ -0,0 +1,211 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.urls import reverse
+
+from bookings import partitions
+from bookings.models import Booking
+from bookings.services import BookingOverlapError, BookingService
+from reports.models import BookedNight
+from reports.services import ReportService
+from rooms.models import Room
+from rooms.services import RoomService
+
+CURRENT = date.today().replace(day=1)
+PAST = partitions.add_months(CURRENT, -3)
+
+
+@pytest.fixture
+def room():
+    return Room.objects.create(description="Номер", price=2500)
+
+
+@pytest.fixture(autouse=True)
+def immediate_constraints():
+    """DDL разделов в одной транзакции с записью броней требует проверенных внешних ключей."""
+    with connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+def partition_of(booking: Booking) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT tableoid::regclass::text FROM bookings_booking WHERE id = %s", [booking.id])
+        return cursor.fetchone()[0]
+
+
+class TestOverlapTrigger:
+    """Тесты запрета пересечений на секционированной таблице."""
+
+    @pytest.mark.django_db
+    def test_overlap_across_partitions(self, room):
+        """Тест: пересечение броней с выездом в разных месяцах (разных разделах) запрещено."""
+        first_end = partitions.add_months(CURRENT, 1) + timedelta(days=2)
+        BookingService.create_booking(room.id, first_end - timedelta(days=5), first_end)
+
+        with pytest.raises(BookingOverlapError):
+            BookingService.create_booking(room.id, first_end - timedelta(days=1), first_end + timedelta(days=40))
+
+    @pytest.mark.django_db
+    def test_update_moves_row(self, room):
+        """Тест: перенос брони в другой раздел не считается пересечением с ней самой."""
+        booking = BookingService.create_booking(room.id, CURRENT, CURRENT + timedelta(days=3))
+
+        Booking.objects.filter(id=booking.id).update(date_end=partitions.add_months(CURRENT, 1) + timedelta(days=1))
+
+        booking.refresh_from_db()
+        assert partition_of(booking) == partitions.partition_name(partitions.add_months(CURRENT, 1))
+
+    @pytest.mark.django_db
+    def test_update_into_overlap(self, room):
+        """Тест: изменение дат на занятые отклоняется."""
+        BookingService.create_booking(room.id, CURRENT, CURRENT + timedelta(days=3))
+        booking = BookingService.create_booking(room.id, CURRENT + timedelta(days=5), CURRENT + timedelta(days=7))
+
+        with pytest.raises(IntegrityError):
+            Booking.objects.filter(id=booking.id).update(date_start=CURRENT + timedelta(days=2))
+
+
+class TestPartitions:
+    """Тесты создания разделов и архивации."""
+
+    @pytest.mark.django_db
+    def test_create_partition_moves_default_rows(self, room):
+        """Тест: брони месяца переезжают из раздела по умолчанию в новый раздел."""
+        booking = BookingService.create_booking(room.id, PAST, PAST + timedelta(days=2))
+        assert partition_of(booking) == partitions.DEFAULT_PARTITION
+        version = room.__class__.objects.get(id=room.id).bookings_version
+
+        partition = partitions.create_partition(PAST)
+
+        assert partition_of(booking) == partition.name
+        assert partition in partitions.list_partitions()
+        assert Booking.objects.count() == 1
+        assert BookedNight.objects.count() == 2
+        assert Room.objects.get(id=room.id).bookings_version == version
+        plan = Booking.objects.filter(room_id=room.id).explain()
+        assert f"booking_room_dates_idx_p{PAST:%Y_%m}" in plan
+
+    @pytest.mark.django_db
+    def test_ensure_partitions(self):
+        """Тест: недостающие разделы создаются вперёд, существующие не трогаются."""
+        ahead = len([p for p in partitions.list_partitions() if p.date_from >= CURRENT])
+
+        created = partitions.ensure_partitions(ahead + 2)
+
+        assert [partition.date_from for partition in created] == [
+            partitions.add_months(CURRENT, ahead),
+            partitions.add_months(CURRENT, ahead + 1),
+        ]
+        assert partitions.ensure_partitions(ahead + 2) == []
+
+    @pytest.mark.django_db
+    def test_current_bookings_skip_old_partitions(self, room):
+        """Тест: запрос текущих броней не читает разделы с прошедшими датами выезда."""
+        partitions.create_partition(PAST)
+        past = partitions.partition_name(PAST)
+
+        assert past not in BookingService.get_room_bookings_queryset(room.id).explain()
+        assert past in BookingService.get_room_bookings_queryset(room.id, history=True).explain()
+
+    @pytest.mark.django_db
+    def test_archive_partitions(self, room):
+        """Тест: старый раздел уходит в архив без потери ночей в отчётах; номер по-прежнему удаляется."""
+        partitions.create_partition(PAST)
+        old = BookingService.create_booking(room.id, PAST, PAST + timedelta(days=2))
+        BookingService.create_booking(room.id, CURRENT, CURRENT + timedelta(days=1))
+
+        archived = partitions.archive_partitions(partitions.add_months(PAST, 1))
+
+        assert [partition.date_from for partition in archived] == [PAST]
+        assert not Booking.objects.filter(id=old.id).exists()
+        assert partitions.list_partitions(partitions.ARCHIVE_TABLE) == archived
+        assert BookedNight.objects.count() == 3
+        assert ReportService.count_mismatched_nights() == 0
+
+        # Как в рабочей транзакции: внешние ключи проверяются после триггеров, удаляющих ночи
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+        RoomService.delete_room(room.id)
+        assert not BookedNight.objects.exists()
+
+    @pytest.mark.django_db
+    def test_overlap_with_archive(self, room):
+        """Тест: новая бронь в архивном месяце (раздел по умолчанию) проверяется и по архивным броням."""
+        partitions.create_partition(PAST)
+        BookingService.create_booking(room.id, PAST, PAST + timedelta(days=2))
+        partitions.archive_partitions(partitions.add_months(PAST, 1))
+
+        with pytest.raises(BookingOverlapError):
+            BookingService.create_booking(room.id, PAST + timedelta(days=1), PAST + timedelta(days=3))
+        results = BookingService.create_bookings(
+            [
+                {"room": room.id, "date_start": PAST + timedelta(days=1), "date_end": PAST + timedelta(days=3)},
+                {"room": room.id, "date_start": PAST + timedelta(days=3), "date_end": PAST + timedelta(days=5)},
+            ],
+            atomic=False,
+        )
+        assert isinstance(results[0], BookingOverlapError)
+        assert partition_of(results[1]) == partitions.DEFAULT_PARTITION
+
+    @pytest.mark.django_db
+    def test_archive_command(self, capsys):
+        """Тест: --dry-run только перечисляет разделы, без него — переносит их в архив."""
+        partitions.create_partition(PAST)
+
+        call_command("archive_bookings", "--retention-months", "2", "--dry-run")
+        assert f"Будет перенесён в архив раздел {partitions.partition_name(PAST)}" in capsys.readouterr().out
+        assert partitions.list_partitions(partitions.ARCHIVE_TABLE) == []
+
+        call_command("archive_bookings", "--retention-months", "2")
+        assert f"Перенесён в архив раздел {partitions.partition_name(PAST)}" in capsys.readouterr().out
+        assert [p.date_from for p in partitions.list_partitions(partitions.ARCHIVE_TABLE)] == [PAST]
+
+
+class TestRoomBookingsHistory:
+    """Тесты выдачи текущих броней по умолчанию и истории по запросу."""
+
+    @pytest.fixture
+    def bookings(self, room):
+        today = date.today()
+        past = BookingService.create_booking(room.id, today - timedelta(days=10), today - timedelta(days=5))
+        ending = BookingService.create_booking(room.id, today - timedelta(days=2), today)
+        future = BookingService.create_booking(room.id, today + timedelta(days=3), today + timedelta(days=5))
+        return past, ending, future
+
+    @pytest.mark.django_db
+    def test_service(self, room, bookings):
+        """Тест: по умолчанию — брони с выездом сегодня и позже, history=True — все."""
+        past, ending, future = bookings
+
+        assert BookingService.get_room_bookings(room.id) == [ending, future]
+        assert BookingService.get_room_bookings(room.id, history=True) == [past, ending, future]
+
+    @pytest.mark.django_db
+    def test_view(self, client, room, bookings):
+        """Тест: ?history=1 возвращает все брони и имеет свой ETag."""
+        url = reverse("booking-list", args=[room.id])
+
+        current = client.get(url)
+        history = client.get(url, {"history": "1"})
+
+        assert [item["id"] for item in current.json()] == [booking.id for booking in bookings[1:]]
+        assert [item["id"] for item in history.json()] == [booking.id for booking in bookings]
+        assert current["ETag"] != history["ETag"]
+        assert client.get(url, {"history": "1"}, HTTP_IF_NONE_MATCH=history["ETag"]).status_code == 304
+
+    @pytest.mark.django_db
+    def test_archive_changes_history_etag(self, client, room):
+        """Тест: после архивации раздела прежний ETag истории броней номера больше не даёт 304."""
+        partitions.create_partition(PAST)
+        BookingService.create_booking(room.id, PAST, PAST + timedelta(days=2))
+        url = reverse("booking-list", args=[room.id])
+        history = client.get(url, {"history": "1"})
+        assert len(history.json()) == 1
+
+        partitions.archive_partitions(partitions.add_months(PAST, 1))
+        response = client.get(url, {"history": "1"}, HTTP_IF_NONE_MATCH=history["ETag"])
+
+        assert response.status_code == 200
+        assert response.json() == []
@@ -1,8 +1,11 @@
 from datetime import date, timedelta
 
 import pytest
+from rest_framework.renderers import JSONRenderer
 
-from bookings.serializers import BookingCreateSerializer
+from bookings.models import Booking
+from bookings.serializers import BookingCreateSerializer, BookingFastSerializer, BookingSerializer
+from core.renderers import json_dumps
 from rooms.models import Room
 
 
@@ -54,6 +57,24 @@ class TestBookingSerializer:
         assert not serializer.is_valid()
         assert "non_field_errors" in serializer.errors
 
+    @pytest.mark.django_db
+    def test_booking_create_serializer_room_id_without_query(self, django_assert_num_queries):
+        """Тест: room проверяется как id без запроса к БД, существование номера проверяет сервис."""
+        data = {
+            "room": 999999,
+            "date_start": date.today().isoformat(),
+            "date_end": (date.today() + timedelta(days=1)).isoformat(),
+        }
+
+        with django_assert_num_queries(0):
+            serializer = BookingCreateSerializer(data=data)
+            assert serializer.is_valid()
+        assert serializer.validated_data["room"] == 999999
+
+        serializer = BookingCreateSerializer(data={**data, "room": 0})
+        assert not serializer.is_valid()
+        assert "room" in serializer.errors
+
     @pytest.mark.django_db
     def test_booking_serializer_read_only_fields(self):
         """Тест полей только для чтения."""
@@ -70,3 +91,18 @@ class TestBookingSerializer:
         serializer = BookingCreateSerializer(data=data)
         # Поля только для чтения должны игнорироваться при создании
         assert serializer.is_valid()
+
+    @pytest.mark.django_db
+    def test_booking_fast_serializer_matches_model_serializer(self):
+        """Тест: быстрый сериализатор выдаёт тот же JSON, что BookingSerializer."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+        Booking.objects.create(
+            room=room, date_start=date.today() + timedelta(days=5), date_end=date.today() + timedelta(days=9)
+        )
+        bookings = Booking.objects.order_by("id")
+
+        expected = JSONRenderer().render(BookingSerializer(bookings, many=True).data)
+
+        assert json_dumps(BookingFastSerializer.serialize(bookings)) == expected
+        assert json_dumps(BookingFastSerializer.serialize_objects(list(bookings))) == expected
@@ -1,9 +1,11 @@
+import threading
 from datetime import date, timedelta
 
 import pytest
+from django.db import connection, transaction
 
 from bookings.models import Booking
-from bookings.services import BookingService
+from bookings.services import BookingDatesError, BookingOverlapError, BookingService
 from rooms.models import Room
 
 
@@ -33,6 +35,38 @@ class TestBookingService:
         with pytest.raises(Room.DoesNotExist):
             BookingService.create_booking(999, date.today(), date.today() + timedelta(days=2))
 
+    @pytest.mark.django_db
+    def test_create_booking_overlap(self):
+        """Тест создания брони на занятые даты."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        BookingService.create_booking(room.id, date.today(), date.today() + timedelta(days=3))
+
+        with pytest.raises(BookingOverlapError):
+            BookingService.create_booking(room.id, date.today() + timedelta(days=2), date.today() + timedelta(days=5))
+
+        assert Booking.objects.filter(room=room).count() == 1
+
+    @pytest.mark.django_db
+    def test_create_booking_adjacent_dates(self):
+        """Тест брони, начинающейся в день выезда предыдущей."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        BookingService.create_booking(room.id, date.today(), date.today() + timedelta(days=3))
+
+        booking = BookingService.create_booking(
+            room.id, date.today() + timedelta(days=3), date.today() + timedelta(days=5)
+        )
+
+        assert booking.id is not None
+
+    @pytest.mark.django_db
+    def test_create_booking_single_query(self, django_assert_num_queries):
+        """Тест: создание брони выполняет один запрос к БД."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+
+        # Savepoint-ы atomic() тоже считаются запросами
+        with django_assert_num_queries(3):
+            BookingService.create_booking(room.id, date.today(), date.today() + timedelta(days=2))
+
     @pytest.mark.django_db
     def test_delete_booking(self):
         """Тест удаления брони через сервис."""
@@ -44,6 +78,97 @@ class TestBookingService:
         # Проверяем, что бронь удалена из БД
         assert not Booking.objects.filter(id=booking.id).exists()
 
+    @pytest.mark.django_db
+    def test_delete_booking_single_query(self, django_assert_num_queries):
+        """Тест: удаление брони — один запрос, несуществующая бронь — DoesNotExist."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        booking = Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+
+        with django_assert_num_queries(1):
+            BookingService.delete_booking(booking.id)
+
+        with pytest.raises(Booking.DoesNotExist):
+            BookingService.delete_booking(booking.id)
+
+    @pytest.mark.django_db
+    def test_update_booking(self):
+        """Тест изменения дат брони, в том числе только одной из них."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        booking = BookingService.create_booking(room.id, date.today(), date.today() + timedelta(days=3))
+        version = BookingService.get_room_bookings_version(room.id)
+
+        # Новые даты пересекаются только с прежними датами самой брони
+        updated = BookingService.update_booking(
+            booking.id, date.today() + timedelta(days=1), date.today() + timedelta(days=4)
+        )
+
+        assert (updated.id, updated.room_id, updated.created_at) == (booking.id, room.id, booking.created_at)
+        assert (updated.date_start, updated.date_end) == (
+            date.today() + timedelta(days=1),
+            date.today() + timedelta(days=4),
+        )
+        assert BookingService.get_room_bookings_version(room.id) == version + 1
+
+        updated = BookingService.update_booking(booking.id, date_end=date.today() + timedelta(days=6))
+
+        booking.refresh_from_db()
+        assert (booking.date_start, booking.date_end) == (
+            date.today() + timedelta(days=1),
+            date.today() + timedelta(days=6),
+        )
+        assert updated.date_end == booking.date_end
+
+    @pytest.mark.django_db
+    def test_update_booking_moves_partition(self):
+        """Тест переноса брони на дату выезда из другого раздела таблицы."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        booking = BookingService.create_booking(room.id, date.today(), date.today() + timedelta(days=3))
+
+        BookingService.update_booking(booking.id, date.today() + timedelta(days=90), date.today() + timedelta(days=95))
+
+        assert list(Booking.objects.filter(room=room).values_list("id", "date_start")) == [
+            (booking.id, date.today() + timedelta(days=90))
+        ]
+
+    @pytest.mark.django_db
+    def test_update_booking_overlap(self):
+        """Тест: даты, занятые другой бронью номера, не меняются."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        other_room = Room.objects.create(description="Другой номер", price=3500.00)
+        booking = BookingService.create_booking(room.id, date.today(), date.today() + timedelta(days=2))
+        BookingService.create_booking(room.id, date.today() + timedelta(days=5), date.today() + timedelta(days=8))
+        BookingService.create_booking(other_room.id, date.today(), date.today() + timedelta(days=10))
+
+        with pytest.raises(BookingOverlapError):
+            BookingService.update_booking(booking.id, date_end=date.today() + timedelta(days=6))
+
+        booking.refresh_from_db()
+        assert booking.date_end == date.today() + timedelta(days=2)
+
+        # Вплотную к следующей брони — можно
+        BookingService.update_booking(booking.id, date_end=date.today() + timedelta(days=5))
+
+    @pytest.mark.django_db
+    def test_update_booking_errors(self):
+        """Тест: несуществующая бронь и выезд не позже заезда."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        booking = BookingService.create_booking(room.id, date.today(), date.today() + timedelta(days=2))
+
+        with pytest.raises(Booking.DoesNotExist):
+            BookingService.update_booking(booking.id + 1000, date_end=date.today() + timedelta(days=5))
+
+        with pytest.raises(BookingDatesError):
+            BookingService.update_booking(booking.id, date_start=date.today() + timedelta(days=2))
+
+    @pytest.mark.django_db
+    def test_update_booking_single_query(self, django_assert_num_queries):
+        """Тест: проверка пересечения и изменение — один запрос (плюс savepoint и его release)."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        booking = BookingService.create_booking(room.id, date.today(), date.today() + timedelta(days=2))
+
+        with django_assert_num_queries(3):
+            BookingService.update_booking(booking.id, date_end=date.today() + timedelta(days=4))
+
     @pytest.mark.django_db
     def test_get_room_bookings(self):
         """Тест получения броней для номера."""
@@ -77,3 +202,228 @@ class TestBookingService:
         bookings = BookingService.get_room_bookings(room.id)
 
         assert len(bookings) == 0
+
+    @pytest.mark.django_db
+    def test_room_bookings_version_bumped_on_changes(self):
+        """Тест: любое изменение броней номера увеличивает его версию (триггер БД)."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        other = Room.objects.create(description="Другой номер", price=3500.00)
+        version = BookingService.get_room_bookings_version(room.id)
+
+        booking = BookingService.create_booking(room.id, date.today(), date.today() + timedelta(days=2))
+        assert BookingService.get_room_bookings_version(room.id) == version + 1
+
+        Booking.objects.filter(id=booking.id).update(date_end=date.today() + timedelta(days=3))
+        assert BookingService.get_room_bookings_version(room.id) == version + 2
+
+        BookingService.delete_booking(booking.id)
+        assert BookingService.get_room_bookings_version(room.id) == version + 3
+
+        # Брони другого номера не трогали
+        assert BookingService.get_room_bookings_version(other.id) == 0
+
+    @pytest.mark.django_db
+    def test_get_calendar(self, django_assert_num_queries):
+        """Тест календаря: брони периода по номерам одним запросом, смещения от начала периода."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        empty = Room.objects.create(description="Номер без броней", price=3500.00)
+        today = date.today()
+        before = Booking.objects.create(
+            room=room, date_start=today - timedelta(days=3), date_end=today + timedelta(days=1)
+        )
+        inside = Booking.objects.create(
+            room=room, date_start=today + timedelta(days=5), date_end=today + timedelta(days=8)
+        )
+        # Вне периода
+        Booking.objects.create(room=room, date_start=today + timedelta(days=10), date_end=today + timedelta(days=12))
+        Booking.objects.create(room=empty, date_start=today - timedelta(days=5), date_end=today)
+
+        with django_assert_num_queries(1):
+            calendar = BookingService.get_calendar([room.id, empty.id, 999999], today, today + timedelta(days=10))
+
+        assert calendar == {
+            room.id: {"booking_ids": [before.id, inside.id], "start": [-3, 5], "end": [1, 8]},
+            empty.id: {"booking_ids": [], "start": [], "end": []},
+        }
+
+    @pytest.mark.django_db
+    def test_create_bookings(self, django_assert_max_num_queries):
+        """Тест пакетного создания: фиксированное число запросов независимо от размера пакета."""
+        rooms = [Room.objects.create(description=f"Номер {i}", price=2500.00) for i in range(3)]
+        items = [
+            {
+                "room": room.id,
+                "date_start": date.today() + timedelta(days=3 * i),
+                "date_end": date.today() + timedelta(days=3 * i + 2),
+            }
+            for room in rooms
+            for i in range(10)
+        ]
+
+        with django_assert_max_num_queries(5):
+            results = BookingService.create_bookings(items)
+
+        assert all(isinstance(result, Booking) for result in results)
+        assert Booking.objects.count() == 30
+
+    @pytest.mark.django_db
+    def test_create_bookings_errors_atomic(self):
+        """Тест: в режиме atomic ошибка одного элемента отменяет весь пакет."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+        items = [
+            {
+                "room": room.id,
+                "date_start": date.today() + timedelta(days=5),
+                "date_end": date.today() + timedelta(days=7),
+            },
+            {
+                "room": room.id,
+                "date_start": date.today() + timedelta(days=6),
+                "date_end": date.today() + timedelta(days=8),
+            },
+            {
+                "room": room.id,
+                "date_start": date.today() + timedelta(days=1),
+                "date_end": date.today() + timedelta(days=3),
+            },
+            {"room": 999999, "date_start": date.today(), "date_end": date.today() + timedelta(days=1)},
+        ]
+
+        results = BookingService.create_bookings(items, atomic=True)
+
+        assert results[0] is None
+        assert isinstance(results[1], BookingOverlapError)  # Пересечение внутри пакета
+        assert isinstance(results[2], BookingOverlapError)  # Пересечение с существующей бронью
+        assert isinstance(results[3], Room.DoesNotExist)
+        assert Booking.objects.count() == 1
+
+    @pytest.mark.django_db
+    def test_create_bookings_best_effort(self):
+        """Тест: в режиме best_effort создаются все корректные элементы."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        items = [
+            {"room": room.id, "date_start": date.today(), "date_end": date.today() + timedelta(days=2)},
+            {
+                "room": room.id,
+                "date_start": date.today() + timedelta(days=1),
+                "date_end": date.today() + timedelta(days=3),
+            },
+            {
+                "room": room.id,
+                "date_start": date.today() + timedelta(days=2),
+                "date_end": date.today() + timedelta(days=4),
+            },
+        ]
+
+        results = BookingService.create_bookings(items, atomic=False)
+
+        assert isinstance(results[0], Booking)
+        assert isinstance(results[1], BookingOverlapError)
+        assert isinstance(results[2], Booking)
+        assert Booking.objects.filter(room=room).count() == 2
+
+
+class TestUpdateBookingConcurrency:
+    """Параллельные изменения одной брони (транзакции в разных потоках фиксируются по-настоящему)."""
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize("shift", [1, 90], ids=["same-partition", "moved-partition"])
+    def test_concurrent_updates_are_not_lost(self, shift):
+        """Тест: изменение, переданное только одной датой, не затирает параллельное изменение другой."""
+        today = date.today()
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        booking = BookingService.create_booking(room.id, today + timedelta(days=10), today + timedelta(days=12))
+        first_start, first_end = today + timedelta(days=shift), today + timedelta(days=shift + 12)
+        second_end = first_end + timedelta(days=3)
+        first_updated = threading.Event()
+        errors = []
+
+        def first():
+            try:
+                with transaction.atomic():
+                    BookingService.update_booking(booking.id, first_start, first_end)
+                    first_updated.set()
+                    # Второй поток тем временем ждёт блокировку строки
+                    threading.Event().wait(0.3)
+            except Exception as e:
+                errors.append(e)
+                first_updated.set()
+            finally:
+                connection.close()
+
+        def second():
+            try:
+                first_updated.wait(5)
+                BookingService.update_booking(booking.id, date_end=second_end)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        booking.refresh_from_db()
+        assert (booking.date_start, booking.date_end) == (first_start, second_end)
+
+
+class TestCreateBookingsConcurrency:
+    """Пакет броней и параллельная бронь, созданная между проверкой пересечений и вставкой."""
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize("atomic", [False, True], ids=["best_effort", "atomic"])
+    def test_concurrent_booking_rejects_only_its_item(self, atomic):
+        """Тест: пересечение с параллельной бронью отклоняет только свой элемент, а не весь пакет."""
+        today = date.today()
+        busy = Room.objects.create(description="Занятый номер", price=2500.00)
+        free = Room.objects.create(description="Свободный номер", price=3000.00)
+        date_start, date_end = today + timedelta(days=5), today + timedelta(days=7)
+        items = [
+            {"room": busy.id, "date_start": date_start, "date_end": date_end},
+            {"room": free.id, "date_start": date_start, "date_end": date_end},
+        ]
+        created = threading.Event()
+        results, errors = [], []
+
+        def first():
+            try:
+                with transaction.atomic():
+                    BookingService.create_booking(busy.id, date_start, date_end)
+                    created.set()
+                    # Пакет тем временем проверил пересечения (бронь ещё не видна) и ждёт блокировку номера
+                    threading.Event().wait(0.3)
+            except Exception as e:
+                errors.append(e)
+                created.set()
+            finally:
+                connection.close()
+
+        def second():
+            try:
+                created.wait(5)
+                results.extend(BookingService.create_bookings(items, atomic=atomic))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert isinstance(results[0], BookingOverlapError)
+        if atomic:
+            assert results[1] is None
+            assert not Booking.objects.filter(room=free).exists()
+        else:
+            assert isinstance(results[1], Booking)
+            assert Booking.objects.filter(room=free).count() == 1
+        assert Booking.objects.filter(room=busy).count() == 1
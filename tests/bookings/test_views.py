@@ -1,3 +1,4 @@
+import json
 from datetime import date, timedelta
 
 import pytest
@@ -62,6 +63,24 @@ class TestBookingViews:
         # Проверяем наличие ошибки в поле room
         assert "room" in response.data
 
+    @pytest.mark.django_db
+    def test_create_booking_overlap(self, client):
+        """Тест создания брони на занятые даты."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=3))
+
+        url = reverse("booking-create")
+        data = {
+            "room": room.id,
+            "date_start": (date.today() + timedelta(days=1)).isoformat(),
+            "date_end": (date.today() + timedelta(days=4)).isoformat(),
+        }
+
+        response = client.post(url, data, content_type="application/json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["error"] == "Номер уже забронирован на указанные даты"
+
     @pytest.mark.django_db
     def test_delete_booking_success(self, client):
         """Тест успешного удаления брони."""
@@ -83,6 +102,50 @@ class TestBookingViews:
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert "error" in response.data
 
+    @pytest.mark.django_db
+    def test_update_booking(self, client):
+        """Тест изменения дат брони: ответ — бронь с новыми датами."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        booking = Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+        data = {"date_end": (date.today() + timedelta(days=4)).isoformat()}
+
+        response = client.patch(reverse("booking-update", args=[booking.id]), data, content_type="application/json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["id"] == booking.id
+        assert response.data["date_start"] == date.today().isoformat()
+        assert response.data["date_end"] == data["date_end"]
+
+    @pytest.mark.django_db
+    def test_update_booking_errors(self, client):
+        """Тест ошибок изменения брони: пересечение, порядок дат, пустое тело, несуществующая бронь."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        booking = Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+        Booking.objects.create(
+            room=room, date_start=date.today() + timedelta(days=3), date_end=date.today() + timedelta(days=5)
+        )
+        url = reverse("booking-update", args=[booking.id])
+
+        response = client.patch(
+            url, {"date_end": (date.today() + timedelta(days=4)).isoformat()}, content_type="application/json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "error" in response.data
+
+        # Порядок дат, когда передана одна дата, проверяет сервис — формат ошибки тот же, что у сериализатора
+        response = client.patch(url, {"date_end": date.today().isoformat()}, content_type="application/json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["non_field_errors"] == ["Дата окончания должна быть позже даты начала"]
+
+        assert client.patch(url, {}, content_type="application/json").status_code == status.HTTP_400_BAD_REQUEST
+
+        response = client.patch(
+            reverse("booking-update", args=[999999]),
+            {"date_end": (date.today() + timedelta(days=4)).isoformat()},
+            content_type="application/json",
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
     @pytest.mark.django_db
     def test_list_room_bookings(self, client):
         """Тест получения списка броней для номера."""
@@ -101,6 +164,41 @@ class TestBookingViews:
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data) == 2
 
+    @pytest.mark.django_db
+    def test_list_room_bookings_paginated(self, client):
+        """Тест постраничного получения броней номера."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        for offset in [6, 0, 3]:
+            Booking.objects.create(
+                room=room,
+                date_start=date.today() + timedelta(days=offset),
+                date_end=date.today() + timedelta(days=offset + 2),
+            )
+
+        url = reverse("booking-list", args=[room.id])
+        response = client.get(url, {"limit": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"][0]["date_start"] == date.today().isoformat()
+        assert len(response.data["results"]) == 2
+
+        response = client.get(url, {"limit": 2, "cursor": response.data["next"]})
+
+        assert response.data["results"][0]["date_start"] == (date.today() + timedelta(days=6)).isoformat()
+        assert response.data["next"] is None
+
+    @pytest.mark.django_db
+    def test_list_room_bookings_stream(self, client):
+        """Тест потоковой выдачи броней номера."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+
+        url = reverse("booking-list", args=[room.id])
+        response = client.get(url, {"stream": "1"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(b"".join(response.streaming_content)) == client.get(url).json()
+
     @pytest.mark.django_db
     def test_list_room_bookings_empty(self, client):
         """Тест получения списка броней для номера без броней."""
@@ -120,3 +218,293 @@ class TestBookingViews:
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert "error" in response.data
+
+    @pytest.mark.django_db
+    def test_list_room_bookings_not_modified(self, client, django_assert_num_queries):
+        """Тест: If-None-Match с актуальным ETag — 304 одним запросом к БД."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+
+        url = reverse("booking-list", args=[room.id])
+        etag = client.get(url)["ETag"]
+
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+    @pytest.mark.django_db
+    def test_list_room_bookings_etag_changes(self, client):
+        """Тест: после создания или удаления брони старый ETag больше не подходит."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        url = reverse("booking-list", args=[room.id])
+        etag = client.get(url)["ETag"]
+
+        booking = Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+        assert response["ETag"] != etag
+
+        etag = response["ETag"]
+        booking.delete()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 0
+
+    @pytest.mark.django_db
+    def test_list_room_bookings_etag_depends_on_params(self, client):
+        """Тест: ETag полного списка не подходит для страницы."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        url = reverse("booking-list", args=[room.id])
+        etag = client.get(url)["ETag"]
+
+        response = client.get(url, {"limit": 1}, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+    @pytest.mark.django_db
+    def test_list_room_bookings_ignores_if_modified_since(self, client):
+        """Тест: без Last-Modified If-Modified-Since не даёт 304 — изменение в ту же секунду не теряется."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        url = reverse("booking-list", args=[room.id])
+        response = client.get(url)
+        assert "Last-Modified" not in response
+
+        Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=1))
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+
+    @pytest.mark.django_db
+    def test_bookings_calendar(self, client):
+        """Тест календаря броней нескольких номеров."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        booking = Booking.objects.create(
+            room=room, date_start=date.today() + timedelta(days=2), date_end=date.today() + timedelta(days=4)
+        )
+        params = {
+            "room_ids": f"999999,{room.id}",
+            "date_start": date.today().isoformat(),
+            "date_end": (date.today() + timedelta(days=30)).isoformat(),
+        }
+
+        response = client.get(reverse("booking-calendar"), params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "date_start": params["date_start"],
+            "date_end": params["date_end"],
+            "days": 30,
+            "rooms": [{"room_id": room.id, "booking_ids": [booking.id], "start": [2], "end": [4]}],
+            "not_found": [999999],
+        }
+
+    @pytest.mark.django_db
+    def test_bookings_calendar_invalid_params(self, client):
+        """Тест ошибок параметров календаря."""
+        url = reverse("booking-calendar")
+        today = date.today().isoformat()
+
+        assert client.get(url, {"date_start": today, "date_end": today}).status_code == 400
+        response = client.get(url, {"room_ids": "1,x", "date_start": "2026-01-01", "date_end": "2026-02-01"})
+        assert response.status_code == 400
+        assert "room_ids" in response.data
+        response = client.get(url, {"room_ids": "1", "date_start": "2026-01-01", "date_end": "2028-01-01"})
+        assert response.status_code == 400
+        assert "non_field_errors" in response.data
+
+    @pytest.mark.django_db
+    def test_bulk_create_bookings(self, client):
+        """Тест пакетного создания броней."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        data = [
+            {
+                "room": room.id,
+                "date_start": date.today().isoformat(),
+                "date_end": (date.today() + timedelta(days=2)).isoformat(),
+            },
+            {
+                "room": room.id,
+                "date_start": (date.today() + timedelta(days=2)).isoformat(),
+                "date_end": (date.today() + timedelta(days=4)).isoformat(),
+            },
+        ]
+
+        response = client.post(reverse("booking-bulk-create"), data, content_type="application/json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["created"] == 2
+        assert [item["status"] for item in response.data["results"]] == ["created", "created"]
+        assert Booking.objects.filter(id=response.data["results"][0]["booking_id"]).exists()
+
+    @pytest.mark.django_db
+    def test_bulk_create_bookings_atomic_rollback(self, client):
+        """Тест: в режиме atomic невалидный элемент отменяет весь пакет."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        data = [
+            {
+                "room": room.id,
+                "date_start": date.today().isoformat(),
+                "date_end": (date.today() + timedelta(days=2)).isoformat(),
+            },
+            {
+                "room": room.id,
+                "date_start": (date.today() + timedelta(days=3)).isoformat(),
+                "date_end": date.today().isoformat(),
+            },
+        ]
+
+        response = client.post(reverse("booking-bulk-create"), data, content_type="application/json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert [item["status"] for item in response.data["results"]] == ["skipped", "error"]
+        assert not Booking.objects.exists()
+
+    @pytest.mark.django_db
+    def test_bulk_create_bookings_best_effort(self, client):
+        """Тест: в режиме best_effort создаются корректные элементы, ошибки — по каждому элементу."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        data = [
+            {
+                "room": room.id,
+                "date_start": date.today().isoformat(),
+                "date_end": (date.today() + timedelta(days=2)).isoformat(),
+            },
+            {
+                "room": room.id,
+                "date_start": date.today().isoformat(),
+                "date_end": (date.today() + timedelta(days=1)).isoformat(),
+            },
+            {
+                "room": 999999,
+                "date_start": date.today().isoformat(),
+                "date_end": (date.today() + timedelta(days=1)).isoformat(),
+            },
+            {"room": room.id, "date_start": "не дата", "date_end": (date.today() + timedelta(days=1)).isoformat()},
+        ]
+
+        response = client.post(
+            reverse("booking-bulk-create") + "?mode=best_effort", data, content_type="application/json"
+        )
+
+        assert response.status_code == status.HTTP_207_MULTI_STATUS
+        assert response.data["created"] == 1
+        results = response.data["results"]
+        assert results[0]["status"] == "created"
+        assert "non_field_errors" in results[1]["errors"]
+        assert "room" in results[2]["errors"]
+        assert "date_start" in results[3]["errors"]
+        assert Booking.objects.count() == 1
+
+    @pytest.mark.django_db
+    def test_bulk_create_bookings_invalid_payload(self, client):
+        """Тест: тело запроса должно быть непустым массивом, mode — известным режимом."""
+        url = reverse("booking-bulk-create")
+
+        assert client.post(url, {"room": 1}, content_type="application/json").status_code == 400
+        assert client.post(url, [], content_type="application/json").status_code == 400
+        assert client.post(url + "?mode=maybe", [{}], content_type="application/json").status_code == 400
+
+
+class TestBookingQueryBudgets:
+    """Бюджеты SQL-запросов эндпоинтов броней: новые запросы в этих путях должны быть осознанными.
+
+    Тест идёт внутри транзакции, поэтому savepoint-ы atomic() тоже считаются запросами
+    (в autocommit их нет).
+    """
+
+    @pytest.fixture
+    def room(self):
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+        return room
+
+    def booking_data(self, room_id, days=10):
+        return {
+            "room": room_id,
+            "date_start": (date.today() + timedelta(days=days)).isoformat(),
+            "date_end": (date.today() + timedelta(days=days + 2)).isoformat(),
+        }
+
+    @pytest.mark.django_db
+    def test_create_booking(self, client, room, django_assert_num_queries):
+        """Тест: создание брони — один INSERT (плюс savepoint и его release)."""
+        with django_assert_num_queries(3):
+            response = client.post(
+                reverse("booking-create"), self.booking_data(room.id), content_type="application/json"
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    @pytest.mark.django_db
+    def test_create_booking_nonexistent_room(self, client, django_assert_num_queries):
+        """Тест: несуществующий номер выявляет тот же INSERT, ошибка — в поле room."""
+        with django_assert_num_queries(3):
+            response = client.post(
+                reverse("booking-create"), self.booking_data(999999), content_type="application/json"
+            )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["room"] == ["Номер с указанным ID не существует"]
+
+    @pytest.mark.django_db
+    def test_delete_booking(self, client, room, django_assert_num_queries):
+        """Тест: удаление брони и ответ 404 — по одному DELETE ... RETURNING."""
+        booking = room.bookings.get()
+
+        with django_assert_num_queries(1):
+            assert client.delete(reverse("booking-delete", args=[booking.id])).status_code == 204
+        with django_assert_num_queries(1):
+            assert client.delete(reverse("booking-delete", args=[booking.id])).status_code == 404
+
+    @pytest.mark.django_db
+    def test_update_booking(self, client, room, django_assert_num_queries):
+        """Тест: изменение дат брони и отказ при пересечении — один UPDATE (плюс savepoint и его release)."""
+        booking = Booking.objects.create(
+            room=room, date_start=date.today() + timedelta(days=5), date_end=date.today() + timedelta(days=7)
+        )
+        url = reverse("booking-update", args=[booking.id])
+
+        with django_assert_num_queries(3):
+            response = client.patch(
+                url, {"date_end": (date.today() + timedelta(days=8)).isoformat()}, content_type="application/json"
+            )
+        assert response.status_code == status.HTTP_200_OK
+
+        with django_assert_num_queries(3):
+            response = client.patch(url, {"date_start": date.today().isoformat()}, content_type="application/json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.django_db
+    def test_bookings_calendar(self, client, room, django_assert_num_queries):
+        """Тест: календарь любого числа номеров — один запрос."""
+        rooms = [Room.objects.create(description=f"Номер {i}", price=2500.00) for i in range(5)]
+        params = {
+            "room_ids": ",".join(str(r.id) for r in [room, *rooms]),
+            "date_start": date.today().isoformat(),
+            "date_end": (date.today() + timedelta(days=30)).isoformat(),
+        }
+
+        with django_assert_num_queries(1):
+            response = client.get(reverse("booking-calendar"), params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["rooms"]) == 6
+
+    @pytest.mark.django_db
+    def test_list_room_bookings(self, client, room, django_assert_num_queries):
+        """Тест: список — версия номера и брони; 304 и 404 — только версия."""
+        url = reverse("booking-list", args=[room.id])
+
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        with django_assert_num_queries(1):
+            assert client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+        with django_assert_num_queries(1):
+            assert client.get(reverse("booking-list", args=[999999])).status_code == 404
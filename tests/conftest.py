@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import cache
 from django.test import Client
 
 
@@ -6,3 +7,11 @@ from django.test import Client
 def client():
     """Фикстура для тестового клиента."""
     return Client()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Очистка кэша между тестами (закэшированные списки не должны переживать откат БД)."""
+    cache.clear()
+    yield
+    cache.clear()
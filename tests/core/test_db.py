@@ -0,0 +1,43 @@
+import io
+
+import pytest
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+from core.db import copy_from, copy_to
+from rooms.models import Room
+
+TABLE = Room._meta.db_table
+
+
+@pytest.mark.django_db
+class TestCopy:
+    """Тесты COPY через курсор Django (psycopg2 и psycopg 3)."""
+
+    def test_copy_round_trip(self):
+        """Тест: строки, записанные COPY FROM STDIN, читаются обратно COPY TO STDOUT с параметрами."""
+        source = io.StringIO("Первый,1000.00,2025-01-01T00:00:00+00:00\nВторой,2000.00,2025-01-01T00:00:00+00:00\n")
+
+        with connection.cursor() as cursor:
+            copy_from(cursor, f"COPY {TABLE} (description, price, created_at) FROM STDIN WITH (FORMAT csv)", source)
+            target = io.BytesIO()
+            copy_to(
+                cursor,
+                f"COPY (SELECT description, price FROM {TABLE} WHERE price > %s ORDER BY id) TO STDOUT WITH (FORMAT csv)",
+                [1500],
+                target,
+            )
+
+        assert Room.objects.count() == 2
+        assert target.getvalue().decode() == "Второй,2000.00\n"
+
+    @pytest.mark.skipif(not is_psycopg3, reason="драйвер не psycopg 3")
+    def test_copy_from_in_blocks(self, monkeypatch):
+        """Тест: с psycopg 3 данные передаются в COPY блоками, длинный файл записывается целиком."""
+        monkeypatch.setattr("core.db.COPY_BLOCK_SIZE", 16)
+        source = io.StringIO("".join(f"Номер {i},{i}.00,2025-01-01T00:00:00+00:00\n" for i in range(1, 51)))
+
+        with connection.cursor() as cursor:
+            copy_from(cursor, f"COPY {TABLE} (description, price, created_at) FROM STDIN WITH (FORMAT csv)", source)
+
+        assert Room.objects.count() == 50
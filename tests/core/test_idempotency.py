@@ -0,0 +1,230 @@
+import json
+import threading
+from datetime import date, timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, Client
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from bookings.models import Booking
+from core import idempotency
+from core.idempotency import request_hash
+from core.models import IdempotencyKey
+from rooms import async_views
+from rooms.models import Room
+from rooms.services import RoomService
+
+ROOM = {"description": "Номер", "price": "2500.00"}
+
+
+def post(client, url, data, key):
+    return client.post(url, data, content_type="application/json", headers={"Idempotency-Key": key})
+
+
+class TestIdempotencyKey:
+    """Тесты заголовка Idempotency-Key на эндпоинтах создания."""
+
+    @pytest.mark.django_db
+    def test_repeated_create_room(self, client, django_assert_num_queries):
+        """Тест: повтор получает сохранённый ответ одним запросом к БД, номер создаётся один раз."""
+        first = post(client, reverse("room-create"), ROOM, "key-1")
+
+        # Плюс savepoint транзакции запроса и его release (тест идёт внутри транзакции)
+        with django_assert_num_queries(3):
+            repeated = post(client, reverse("room-create"), ROOM, "key-1")
+
+        assert first.status_code == repeated.status_code == status.HTTP_201_CREATED
+        assert repeated.data == first.data
+        assert repeated["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first
+        assert Room.objects.count() == 1
+
+    @pytest.mark.django_db
+    def test_without_key(self, client):
+        """Тест: запросы без заголовка выполняются как обычно."""
+        client.post(reverse("room-create"), ROOM, content_type="application/json")
+        client.post(reverse("room-create"), ROOM, content_type="application/json")
+
+        assert Room.objects.count() == 2
+        assert not IdempotencyKey.objects.exists()
+
+    @pytest.mark.django_db
+    def test_repeated_create_booking(self, client):
+        """Тест: повтор брони не бронирует второй раз и не получает ошибку пересечения."""
+        room = Room.objects.create(description="Номер", price=2500.00)
+        data = {
+            "room": room.id,
+            "date_start": date.today().isoformat(),
+            "date_end": (date.today() + timedelta(days=2)).isoformat(),
+        }
+
+        first = post(client, reverse("booking-create"), data, "booking-key")
+        repeated = post(client, reverse("booking-create"), data, "booking-key")
+
+        assert repeated.status_code == status.HTTP_201_CREATED
+        assert repeated.data == first.data
+        assert Booking.objects.count() == 1
+
+    @pytest.mark.django_db
+    def test_error_response_replayed(self, client):
+        """Тест: ответ 4xx тоже сохраняется (повтор с исправленным телом требует нового ключа)."""
+        invalid = {"description": "", "price": "-1"}
+        first = post(client, reverse("room-create"), invalid, "key-1")
+        repeated = post(client, reverse("room-create"), invalid, "key-1")
+
+        assert first.status_code == repeated.status_code == status.HTTP_400_BAD_REQUEST
+        assert repeated.data == json.loads(first.content)
+
+    @pytest.mark.django_db
+    def test_key_reused_with_different_body(self, client):
+        """Тест: тот же ключ с другим телом — 422, ключи разных эндпоинтов независимы."""
+        post(client, reverse("room-create"), ROOM, "key-1")
+
+        response = post(client, reverse("room-create"), {**ROOM, "price": "3000.00"}, "key-1")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert Room.objects.count() == 1
+        assert post(client, reverse("booking-create"), {}, "key-1").status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.django_db
+    def test_orphaned_claim_reclaimed(self, client):
+        """Тест: зафиксированный ключ без ответа (занятый прежним порядком работы) занимается заново."""
+        body = json.dumps(ROOM)
+        IdempotencyKey.objects.create(scope="room-create", key="key-1", request_hash=request_hash(body.encode()))
+
+        response = post(client, reverse("room-create"), body, "key-1")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Room.objects.count() == 1
+        assert IdempotencyKey.objects.get().status_code == status.HTTP_201_CREATED
+
+    @pytest.mark.django_db(transaction=True)
+    def test_concurrent_retry_waits_for_first(self, client, monkeypatch):
+        """Тест: повтор во время выполнения первого запроса ждёт его и получает сохранённый ответ."""
+        create_room = RoomService.create_room
+        first_started = threading.Event()
+        responses = {}
+
+        def slow_create_room(**kwargs):
+            first_started.set()
+            threading.Event().wait(0.3)  # Повтор тем временем ждёт на вставке ключа
+            return create_room(**kwargs)
+
+        monkeypatch.setattr(RoomService, "create_room", slow_create_room)
+
+        def request(name):
+            try:
+                responses[name] = post(Client(), reverse("room-create"), ROOM, "key-1")
+            finally:
+                connection.close()
+
+        first = threading.Thread(target=request, args=("first",))
+        first.start()
+        first_started.wait(5)
+        request("repeated")
+        first.join()
+
+        assert responses["first"].status_code == responses["repeated"].status_code == status.HTTP_201_CREATED
+        assert responses["repeated"]["Idempotent-Replayed"] == "true"
+        assert Room.objects.count() == 1
+
+    @pytest.mark.django_db
+    def test_failed_finish_rolls_back_view(self, client, monkeypatch):
+        """Тест: если ответ не сохранился, откатываются и ключ, и созданный номер."""
+
+        def fail(*args):
+            raise RuntimeError("сбой")
+
+        monkeypatch.setattr(idempotency, "finish", fail)
+        with pytest.raises(RuntimeError):
+            post(client, reverse("room-create"), ROOM, "key-1")
+
+        assert not IdempotencyKey.objects.exists()
+        assert not Room.objects.exists()
+
+    @pytest.mark.django_db
+    def test_expired_key_reused(self, client, settings):
+        """Тест: после IDEMPOTENCY_KEY_TTL ключ выполняет запрос заново."""
+        settings.IDEMPOTENCY_KEY_TTL = 60
+        post(client, reverse("room-create"), ROOM, "key-1")
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(seconds=61))
+
+        response = post(client, reverse("room-create"), {**ROOM, "price": "3000.00"}, "key-1")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert "Idempotent-Replayed" not in response
+        assert Room.objects.count() == 2
+
+    @pytest.mark.django_db
+    def test_invalid_key(self, client):
+        """Тест: пустой или слишком длинный ключ — 400."""
+        assert post(client, reverse("room-create"), ROOM, "x" * 256).status_code == status.HTTP_400_BAD_REQUEST
+        assert not Room.objects.exists()
+
+    @pytest.mark.django_db
+    def test_exception_releases_key(self, client, monkeypatch):
+        """Тест: исключение во view откатывает занятие ключа, повтор выполнится заново."""
+
+        def fail(**kwargs):
+            raise RuntimeError("сбой")
+
+        monkeypatch.setattr(RoomService, "create_room", fail)
+        with pytest.raises(RuntimeError):
+            post(client, reverse("room-create"), ROOM, "key-1")
+
+        assert not IdempotencyKey.objects.exists()
+
+    @pytest.mark.django_db
+    def test_async_view(self):
+        """Тест: async-view сохраняет и повторяет ответ так же."""
+        factory = AsyncRequestFactory()
+
+        def create():
+            request = factory.post(
+                "/rooms/create/", ROOM, content_type="application/json", headers={"Idempotency-Key": "k"}
+            )
+            return async_to_sync(async_views.create_room)(request)
+
+        first, repeated = create(), create()
+
+        assert repeated.status_code == status.HTTP_201_CREATED
+        assert json.loads(repeated.content) == json.loads(first.content)
+        assert repeated["Idempotent-Replayed"] == "true"
+        assert Room.objects.count() == 1
+
+    @pytest.mark.django_db
+    def test_async_view_exception_rolls_back(self, monkeypatch):
+        """Тест: исключение в async-view откатывает занятие ключа и созданный номер."""
+        acreate_room = RoomService.acreate_room
+
+        async def create_and_fail(**kwargs):
+            await acreate_room(**kwargs)
+            raise RuntimeError("сбой")
+
+        monkeypatch.setattr(RoomService, "acreate_room", create_and_fail)
+        request = AsyncRequestFactory().post(
+            "/rooms/create/", ROOM, content_type="application/json", headers={"Idempotency-Key": "k"}
+        )
+
+        with pytest.raises(RuntimeError):
+            async_to_sync(async_views.create_room)(request)
+
+        assert not IdempotencyKey.objects.exists()
+        assert not Room.objects.exists()
+
+    @pytest.mark.django_db
+    def test_purge_command(self, capsys):
+        """Тест: команда удаляет только устаревшие ключи."""
+        IdempotencyKey.objects.create(scope="room-create", key="old", request_hash="")
+        IdempotencyKey.objects.create(scope="room-create", key="new", request_hash="")
+        IdempotencyKey.objects.filter(key="old").update(created_at=timezone.now() - timedelta(days=2))
+
+        call_command("purge_idempotency_keys")
+
+        assert list(IdempotencyKey.objects.values_list("key", flat=True)) == ["new"]
+        assert "Удалено ключей: 1" in capsys.readouterr().out
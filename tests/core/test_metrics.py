@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import re
+from datetime import date
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+from bookings.models import Booking
+from core import metrics
+from core.metrics import Counter, Histogram, render_metrics
+from rooms.models import Room
+
+SERVER_TIMING = re.compile(r'db;dur=[\d.]+;desc="(\d+) SQL", ser;dur=[\d.]+, total;dur=[\d.]+')
+
+
+def metric_value(sample: str) -> float:
+    """Значение строки метрики из /metrics (0, если её ещё нет)."""
+    for line in render_metrics().splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0
+
+
+@pytest.fixture
+def room():
+    room = Room.objects.create(description="Номер", price=2500.00)
+    Booking.objects.create(room=room, date_start=date(2025, 1, 1), date_end=date(2025, 1, 3))
+    return room
+
+
+class TestRequestMetricsMiddleware:
+    """Тесты для middleware метрик запросов."""
+
+    @pytest.mark.django_db
+    def test_server_timing(self, client, room, django_assert_num_queries):
+        """Тест: Server-Timing содержит число SQL-запросов view."""
+        with django_assert_num_queries(2) as captured:
+            response = client.get(reverse("booking-list", args=[room.id]))
+
+        match = SERVER_TIMING.fullmatch(response["Server-Timing"])
+        assert match
+        assert int(match.group(1)) == len(captured)
+
+    @pytest.mark.django_db
+    def test_server_timing_disabled(self, client, settings):
+        """Тест: заголовок отключается настройкой."""
+        settings.SERVER_TIMING_ENABLED = False
+
+        response = client.get(reverse("room-list"))
+
+        assert "Server-Timing" not in response
+
+    @pytest.mark.django_db
+    def test_histograms(self, client, room, settings):
+        """Тест: запрос попадает в гистограммы /metrics с меткой view."""
+        settings.METRICS_TOKEN = "secret"
+        labels = 'view="booking-list",method="GET"'
+        before = metric_value(f'http_request_db_queries_bucket{{{labels},le="+Inf"}}')
+
+        client.get(reverse("booking-list", args=[room.id]))
+        response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        body = response.content.decode()
+        assert "# TYPE http_request_duration_seconds histogram" in body
+        assert metric_value(f'http_request_db_queries_bucket{{{labels},le="+Inf"}}') == before + 1
+        assert f'http_requests_total{{{labels},status="200"}}' in body
+
+    @pytest.mark.django_db
+    def test_metrics_requires_token(self, client, settings):
+        """Тест: без METRICS_TOKEN /metrics не существует, с ним — нужен верный токен."""
+        assert client.get("/metrics").status_code == 404
+
+        settings.METRICS_TOKEN = "secret"
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer secret"}).status_code == 200
+
+    @pytest.mark.django_db
+    def test_streaming_response(self, client, room):
+        """Тест: запросы потокового ответа засчитываются, когда поток прочитан до конца."""
+        labels = 'view="room-list",method="GET"'
+        before = metric_value(f"http_request_db_queries_sum{{{labels}}}")
+
+        response = client.get(reverse("room-list"), {"stream": "1"})
+        assert "Server-Timing" not in response
+        assert metric_value(f"http_request_db_queries_sum{{{labels}}}") == before
+
+        assert json.loads(b"".join(response.streaming_content))[0]["id"] == room.id
+        assert metric_value(f"http_request_db_queries_sum{{{labels}}}") > before
+
+    @pytest.mark.django_db
+    def test_query_budget_warning(self, client, room, settings, caplog):
+        """Тест: запрос сверх бюджета SQL-запросов логируется и считается."""
+        settings.QUERY_BUDGET = 1
+        labels = 'view="booking-list",method="GET"'
+        before = metric_value(f"http_requests_over_query_budget_total{{{labels}}}")
+
+        with caplog.at_level(logging.WARNING, logger="core.middleware"):
+            client.get(reverse("booking-list", args=[room.id]))
+            client.get(reverse("room-list"))  # укладывается в бюджет
+
+        assert len(caplog.records) == 1
+        assert "2 SQL-запросов при бюджете 1" in caplog.records[0].getMessage()
+        assert metric_value(f"http_requests_over_query_budget_total{{{labels}}}") == before + 1
+
+    @pytest.mark.django_db
+    def test_async_handler(self, room):
+        """Тест: под ASGI учитываются запросы, выполненные через sync_to_async."""
+        response = async_to_sync(AsyncClient().get)(reverse("booking-list", args=[room.id]))
+
+        assert SERVER_TIMING.fullmatch(response["Server-Timing"]).group(1) == "2"
+
+
+class TestPrometheusFormat:
+    """Тесты текстового формата метрик."""
+
+    def test_histogram(self):
+        """Тест: накопительные корзины, сумма и количество."""
+        histogram = Histogram("test_seconds", "Тест", ("view",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, "a")
+        histogram.observe(0.5, "a")
+        histogram.observe(5, "a")
+
+        assert list(histogram.samples()) == [
+            'test_seconds_bucket{view="a",le="0.1"} 1',
+            'test_seconds_bucket{view="a",le="1.0"} 2',
+            'test_seconds_bucket{view="a",le="+Inf"} 3',
+            'test_seconds_sum{view="a"} 5.55',
+            'test_seconds_count{view="a"} 3',
+        ]
+
+    def test_counter_escapes_labels(self):
+        """Тест: кавычки в значениях меток экранируются."""
+        counter = Counter("test_total", "Тест", ("path",))
+        counter.inc('a"b')
+        counter.inc('a"b', amount=2)
+
+        assert list(counter.samples()) == ['test_total{path="a\\"b"} 3']
+
+
+class TestMultiprocessMetrics:
+    """Тесты суммирования метрик воркеров через METRICS_DIR."""
+
+    def test_render_sums_processes(self, tmp_path, settings):
+        """Тест: /metrics отдаёт сумму значений текущего процесса, других воркеров и архива."""
+        settings.METRICS_DIR = str(tmp_path)
+        sample = 'http_requests_total{view="other",method="GET",status="200"}'
+        other = {"http_requests_total": [[["other", "GET", 200], 2]]}
+        (tmp_path / "1.json").write_text(json.dumps(other))
+        (tmp_path / metrics.ARCHIVE_FILE).write_text(json.dumps(other))
+        metrics.REQUESTS.inc("other", "GET", 200)
+
+        assert metric_value(sample) == metrics.REQUESTS._values[("other", "GET", 200)] + 4
+        assert (tmp_path / f"{os.getpid()}.json").exists()
+
+    def test_archive_process(self, tmp_path):
+        """Тест: значения завершившихся воркеров накапливаются в архиве, файлы воркеров удаляются."""
+        histogram = [[["a", "GET"], [[1] * (len(metrics.DURATION_BUCKETS) + 1), 0.5]]]
+        for pid in (1, 2):
+            (tmp_path / f"{pid}.json").write_text(json.dumps({"http_request_duration_seconds": histogram}))
+            metrics.archive_process(str(tmp_path), pid)
+
+        assert sorted(path.name for path in tmp_path.glob("*.json")) == [metrics.ARCHIVE_FILE]
+        archive = json.loads((tmp_path / metrics.ARCHIVE_FILE).read_text())
+        assert archive["http_request_duration_seconds"] == [
+            [["a", "GET"], [[2] * (len(metrics.DURATION_BUCKETS) + 1), 1.0]]
+        ]
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+import pytest
+
+from core.pagination import InvalidCursorError, decode_cursor, encode_cursor, paginate, parse_limit
+from rooms.models import Room
+
+
+class TestPagination:
+    """Тесты keyset-пагинации."""
+
+    def test_parse_limit(self):
+        """Тест разбора параметра limit."""
+        assert parse_limit(None) == 50
+        assert parse_limit("10") == 10
+
+        for value in ["abc", "0", "100000"]:
+            with pytest.raises(InvalidCursorError):
+                parse_limit(value)
+
+    def test_cursor_round_trip(self):
+        """Тест: курсор сохраняет значения ключа сортировки."""
+        cursor = encode_cursor([Decimal("1500.50"), 42])
+
+        assert decode_cursor(cursor, Room.objects.all(), ["price", "id"]) == [Decimal("1500.50"), 42]
+
+    def test_invalid_cursor(self):
+        """Тест некорректных курсоров."""
+        for cursor in ["not-a-cursor", encode_cursor([1]), encode_cursor(["abc", 1])]:
+            with pytest.raises(InvalidCursorError):
+                decode_cursor(cursor, Room.objects.all(), ["price", "id"])
+
+    @pytest.mark.django_db
+    def test_paginate_walks_all_rows(self):
+        """Тест: обход страниц возвращает все записи ровно один раз и в нужном порядке."""
+        # Одинаковые цены проверяют разрешение «ничьих» по id
+        for price in [3000, 1000, 2000, 1000, 3000, 1000, 2000]:
+            Room.objects.create(description="Номер", price=price)
+        expected = list(Room.objects.order_by("-price", "-id").values_list("id", flat=True))
+
+        seen, cursor = [], None
+        while True:
+            page = paginate(Room.objects.all(), ["-price", "-id"], cursor, limit=3)
+            seen.extend(room.id for room in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert seen == expected
+
+    @pytest.mark.django_db
+    def test_paginate_values_queryset(self):
+        """Тест пагинации queryset.values() по дате создания."""
+        for i in range(3):
+            Room.objects.create(description=f"Номер {i}", price=1000)
+
+        page = paginate(Room.objects.values("id", "created_at"), ["created_at", "id"], None, limit=2)
+        next_page = paginate(Room.objects.values("id", "created_at"), ["created_at", "id"], page.next_cursor, limit=2)
+
+        assert len(page.items) == 2
+        assert len(next_page.items) == 1
+        assert next_page.next_cursor is None
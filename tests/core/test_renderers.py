@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.renderers import FastJSONRenderer, json_dumps
+
+DATA = [
+    {
+        "id": 1,
+        "description": 'Номер "люкс"\nс видом на море\t\x01',
+        "price": Decimal("1500.50"),
+        "created_at": datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+        "tags": ["a", None, True, 2.5],
+        10: "ключ-число",
+    }
+]
+
+
+class TestFastJSONRenderer:
+    """Тесты быстрого JSON-кодирования."""
+
+    def test_matches_drf_renderer(self):
+        """Тест: вывод байт в байт совпадает с JSONRenderer DRF."""
+        assert json_dumps(DATA) == JSONRenderer().render(DATA)
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+    def test_matches_drf_renderer_with_orjson(self):
+        """Тест: кодирование через orjson байт в байт совпадает с JSONRenderer DRF."""
+        pytest.importorskip("orjson")
+        data = [*DATA, {"line": "a\u2028b\u2029c", "big": 2**63, "float": 0.1, "nested": {"empty": [], "none": None}}]
+
+        assert renderers.orjson is not None
+        assert json_dumps(data) == JSONRenderer().render(data)
+
+    def test_matches_drf_renderer_without_orjson(self, monkeypatch):
+        """Тест: без orjson результат тот же."""
+        monkeypatch.setattr(renderers, "orjson", None)
+
+        assert json_dumps(DATA) == JSONRenderer().render(DATA)
+
+    def test_indent_falls_back_to_drf(self):
+        """Тест: форматированный вывод (indent) делегируется JSONRenderer."""
+        media_type = "application/json; indent=4"
+
+        assert FastJSONRenderer().render(DATA, media_type) == JSONRenderer().render(DATA, media_type)
+
+    def test_empty(self):
+        """Тест пустого ответа."""
+        assert FastJSONRenderer().render(None) == b""
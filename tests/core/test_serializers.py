@@ -0,0 +1,30 @@
+"""
+Тесты общих полей сериализаторов (core/serializers.py).
+"""
+
+import pytest
+from rest_framework import serializers
+
+from core.serializers import CommaSeparatedIdsField
+
+
+class TestCommaSeparatedIdsField:
+    """Тесты поля CommaSeparatedIdsField."""
+
+    def test_parses_sorted_unique_ids(self):
+        """Тест: id из строки — без повторов и по возрастанию."""
+        assert CommaSeparatedIdsField().run_validation("3,1,3,2") == [1, 2, 3]
+
+    def test_invalid_ids(self):
+        """Тест: нечисловой id — ошибка валидации."""
+        with pytest.raises(serializers.ValidationError) as e:
+            CommaSeparatedIdsField().run_validation("1,a")
+        assert e.value.detail == ["Укажите id целыми числами через запятую"]
+
+    def test_max_ids(self):
+        """Тест: id больше max_ids — ошибка с сообщением из error_messages."""
+        field = CommaSeparatedIdsField(max_ids=2, error_messages={"max_ids": "Не больше {max_ids} номеров"})
+        assert field.run_validation("1,2,2") == [1, 2]
+        with pytest.raises(serializers.ValidationError) as e:
+            field.run_validation("1,2,3")
+        assert e.value.detail == ["Не больше 2 номеров"]
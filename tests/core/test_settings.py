@@ -0,0 +1,176 @@
+import json
+import os
+import subprocess
+import sys
+from importlib.util import find_spec
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+import core
+from core.config.settings import DjangoSettings
+
+DATABASE_URL = "postgresql://user:password@db:5432/hotel"
+SECRET_KEY = "test-secret-key-for-settings-tests"
+
+
+def make_settings(**kwargs) -> DjangoSettings:
+    return DjangoSettings(DATABASE_URL=DATABASE_URL, SECRET_KEY=SECRET_KEY, _env_file=None, **kwargs)
+
+
+class TestDatabaseSettings:
+    """Тесты настроек соединений с БД."""
+
+    def test_persistent_connections(self):
+        """Тест: постоянные соединения и проверка соединения перед использованием."""
+        database = make_settings(DB_CONN_MAX_AGE=120).DATABASES["default"]
+
+        assert database["NAME"] == "hotel"
+        assert database["CONN_MAX_AGE"] == 120
+        assert database["CONN_HEALTH_CHECKS"] is True
+        assert "OPTIONS" not in database
+
+    @pytest.mark.skipif(find_spec("psycopg_pool") is None, reason="не установлен psycopg[pool]")
+    def test_pool(self):
+        """Тест: пул psycopg 3 заменяет постоянные соединения."""
+        database = make_settings(DB_POOL=True, DB_POOL_MIN_SIZE=4, DB_POOL_MAX_SIZE=8).DATABASES["default"]
+
+        assert database["CONN_MAX_AGE"] == 0
+        assert database["OPTIONS"]["pool"] == {"min_size": 4, "max_size": 8, "timeout": 30.0}
+
+    @pytest.mark.skipif(find_spec("psycopg_pool") is not None, reason="установлен psycopg[pool]")
+    def test_pool_requires_psycopg(self):
+        """Тест: без psycopg[pool] включённый пул даёт понятную ошибку."""
+        with pytest.raises(ValueError, match="psycopg"):
+            _ = make_settings(DB_POOL=True).DATABASES
+
+    def test_pool_size_validation(self):
+        """Тест: максимальный размер пула не может быть меньше минимального."""
+        with pytest.raises(ValidationError):
+            make_settings(DB_POOL_MIN_SIZE=10, DB_POOL_MAX_SIZE=5)
+
+    @pytest.mark.parametrize("env, conn_max_age", [({}, 0), ({"DB_CONN_MAX_AGE": "30"}, 30)])
+    def test_asgi_conn_max_age(self, env, conn_max_age):
+        """Тест: под ASGI соединения закрываются после запроса, если DB_CONN_MAX_AGE не задан явно.
+
+        core.asgi меняет настройки при импорте, поэтому проверяется в отдельном процессе.
+        """
+        script = "import core.asgi; from django.db import connection; print(connection.settings_dict['CONN_MAX_AGE'])"
+        env = {
+            **{key: value for key, value in os.environ.items() if key != "DB_CONN_MAX_AGE"},
+            **env,
+            "DJANGO_SETTINGS_MODULE": "core.config.settings",
+            "PYTHONPATH": str(Path(core.__file__).resolve().parent.parent),
+        }
+        output = subprocess.run(
+            [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True
+        ).stdout
+
+        assert output.strip().splitlines()[-1] == str(conn_max_age)
+
+
+class TestGunicornSettings:
+    """Тесты настроек сервера gunicorn."""
+
+    def test_workers_from_cpu_count(self, monkeypatch):
+        """Тест: без явных значений воркеры и потоки считаются от числа ядер."""
+        monkeypatch.setattr("core.config.settings.cpu_count", lambda: 4)
+
+        gthread = make_settings()
+        assert (gthread.GUNICORN_WORKERS, gthread.GUNICORN_THREADS) == (9, 4)
+
+        sync = make_settings(GUNICORN_WORKER_CLASS="sync")
+        assert (sync.GUNICORN_WORKERS, sync.GUNICORN_THREADS) == (9, 1)
+
+        uvicorn = make_settings(GUNICORN_WORKER_CLASS="uvicorn")
+        assert (uvicorn.GUNICORN_WORKERS, uvicorn.GUNICORN_THREADS) == (4, 1)
+
+    def test_explicit_workers(self):
+        """Тест: явно заданные значения не пересчитываются."""
+        settings = make_settings(GUNICORN_WORKERS=3, GUNICORN_THREADS=8)
+
+        assert (settings.GUNICORN_WORKERS, settings.GUNICORN_THREADS) == (3, 8)
+
+    def test_unknown_worker_class(self):
+        """Тест: неизвестный класс воркеров отклоняется."""
+        with pytest.raises(ValidationError):
+            make_settings(GUNICORN_WORKER_CLASS="eventlet")
+
+    @pytest.mark.parametrize(
+        "env, enabled",
+        [
+            ({"GUNICORN_WORKERS": "3"}, False),
+            ({"GUNICORN_WORKERS": "3", "CACHE_URL": "redis://redis:6379/0"}, True),
+            ({"GUNICORN_WORKERS": "1"}, True),
+        ],
+    )
+    def test_rooms_cache_needs_shared_backend(self, env, enabled):
+        """Тест: при нескольких воркерах без CACHE_URL конфигурация gunicorn отключает кэш номеров.
+
+        Конфигурация меняет модуль настроек при импорте, поэтому проверяется в отдельном процессе.
+        """
+        script = "import core.gunicorn_config; from django.conf import settings; print(settings.ROOMS_CACHE_ENABLED)"
+        env = {
+            **{key: value for key, value in os.environ.items() if key != "CACHE_URL"},
+            **env,
+            "DJANGO_SETTINGS_MODULE": "core.config.settings",
+            "PYTHONPATH": str(Path(core.__file__).resolve().parent.parent),
+        }
+        output = subprocess.run(
+            [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True
+        ).stdout
+
+        assert output.strip().splitlines()[-1] == str(enabled)
+
+
+class TestApiProfile:
+    """Тесты облегчённого профиля API-воркеров (API_PROFILE)."""
+
+    def test_api_profile(self):
+        """Тест: профиль убирает admin, сессии, аутентификацию и Browsable API; Django загружается без них.
+
+        Настройки модуля вычисляются при импорте, поэтому профиль проверяется в отдельном процессе.
+        """
+        script = """
+import json
+import django
+from django.conf import settings
+from django.urls import resolve, Resolver404
+
+django.setup()
+try:
+    resolve("/admin/")
+    admin_url = True
+except Resolver404:
+    admin_url = False
+print(json.dumps({
+    "apps": settings.INSTALLED_APPS,
+    "middleware": settings.MIDDLEWARE,
+    "rest_framework": settings.REST_FRAMEWORK,
+    "admin_url": admin_url,
+    "rooms_url": resolve("/rooms/list/").url_name,
+}))
+"""
+        env = {
+            **os.environ,
+            "API_PROFILE": "True",
+            "DJANGO_SETTINGS_MODULE": "core.config.settings",
+            "PYTHONPATH": str(Path(core.__file__).resolve().parent.parent),
+        }
+        output = subprocess.run(
+            [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True
+        ).stdout
+        profile = json.loads(output.strip().splitlines()[-1])
+
+        assert "django.contrib.admin" not in profile["apps"]
+        assert "django.contrib.sessions" not in profile["apps"]
+        assert {"rest_framework", "core", "rooms", "bookings", "reports"} <= set(profile["apps"])
+        assert "django.middleware.csrf.CsrfViewMiddleware" not in profile["middleware"]
+        assert "django.contrib.auth.middleware.AuthenticationMiddleware" not in profile["middleware"]
+        assert profile["middleware"][0] == "core.middleware.RequestMetricsMiddleware"
+        assert profile["rest_framework"]["DEFAULT_RENDERER_CLASSES"] == ["core.renderers.FastJSONRenderer"]
+        assert profile["rest_framework"]["DEFAULT_PARSER_CLASSES"] == ["rest_framework.parsers.JSONParser"]
+        assert profile["rest_framework"]["DEFAULT_AUTHENTICATION_CLASSES"] == []
+        assert profile["admin_url"] is False
+        assert profile["rooms_url"] == "room-list"
@@ -0,0 +1,29 @@
+import pytest
+from django.db import connection
+from django.urls import clear_url_caches, get_resolver
+
+from core.warmup import warm_app, warm_connections
+from rooms.serializers import RoomSerializer
+
+
+class TestWarmup:
+    """Тесты прогрева процесса перед приёмом запросов."""
+
+    def test_warm_app(self):
+        """Тест: резолвер заполнен, поля сериализаторов построены, из которых собирается ответ."""
+        clear_url_caches()
+
+        warm_app()
+
+        assert get_resolver()._populated
+        assert "room-stats" in get_resolver().reverse_dict
+        assert "price" in RoomSerializer().fields
+
+    @pytest.mark.django_db(transaction=True)
+    def test_warm_connections(self):
+        """Тест: соединение с БД открыто заранее."""
+        connection.close()
+
+        warm_connections()
+
+        assert connection.connection is not None
@@ -0,0 +1,142 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from bookings.models import Booking
+from bookings.services import BookingService
+from reports.models import BookedNight
+from reports.services import ReportService
+from rooms.models import Room
+from rooms.services import RoomService
+
+START = date(2026, 3, 1)
+
+
+def nights(room):
+    return list(BookedNight.objects.filter(room=room).order_by("day").values_list("day", "revenue"))
+
+
+class TestBookedNights:
+    """Тесты триггера, который ведёт агрегаты занятых ночей."""
+
+    @pytest.mark.django_db
+    def test_create_booking(self):
+        """Тест: бронь добавляет свои ночи с ценой номера, день выезда не занят."""
+        room = Room.objects.create(description="Номер", price=2500)
+
+        BookingService.create_booking(room.id, START, START + timedelta(days=3))
+
+        assert nights(room) == [(START + timedelta(days=i), Decimal("2500.00")) for i in range(3)]
+
+    @pytest.mark.django_db
+    def test_price_at_booking_time(self):
+        """Тест: изменение цены номера не меняет выручку уже созданных броней."""
+        room = Room.objects.create(description="Номер", price=2500)
+        BookingService.create_booking(room.id, START, START + timedelta(days=1))
+
+        Room.objects.filter(id=room.id).update(price=4000)
+        BookingService.create_booking(room.id, START + timedelta(days=1), START + timedelta(days=2))
+
+        assert [revenue for _, revenue in nights(room)] == [Decimal("2500.00"), Decimal("4000.00")]
+
+    @pytest.mark.django_db
+    def test_bulk_create_and_delete(self):
+        """Тест: пакетное создание и удаление броней обновляют агрегаты."""
+        room = Room.objects.create(description="Номер", price=1000)
+        items = [
+            {"room": room.id, "date_start": START, "date_end": START + timedelta(days=2)},
+            {"room": room.id, "date_start": START + timedelta(days=5), "date_end": START + timedelta(days=6)},
+        ]
+        first, _ = BookingService.create_bookings(items)
+        assert len(nights(room)) == 3
+
+        BookingService.delete_booking(first.id)
+
+        assert nights(room) == [(START + timedelta(days=5), Decimal("1000.00"))]
+
+    @pytest.mark.django_db
+    def test_update_booking(self):
+        """Тест: изменение дат брони переносит её ночи."""
+        room = Room.objects.create(description="Номер", price=1000)
+        booking = BookingService.create_booking(room.id, START, START + timedelta(days=2))
+
+        Booking.objects.filter(id=booking.id).update(
+            date_start=START + timedelta(days=10), date_end=START + timedelta(days=11)
+        )
+
+        assert nights(room) == [(START + timedelta(days=10), Decimal("1000.00"))]
+
+    @pytest.mark.django_db
+    def test_delete_room(self):
+        """Тест: удаление номера вместе с бронями удаляет его ночи."""
+        room = Room.objects.create(description="Номер", price=1000)
+        BookingService.create_booking(room.id, START, START + timedelta(days=4))
+
+        RoomService.delete_room(room.id)
+
+        assert not BookedNight.objects.exists()
+
+    @pytest.mark.django_db
+    def test_rebuild_and_check(self):
+        """Тест: сверка находит расхождения, пересчёт их устраняет."""
+        room = Room.objects.create(description="Номер", price=1000)
+        BookingService.create_booking(room.id, START, START + timedelta(days=4))
+        assert ReportService.count_mismatched_nights() == 0
+
+        BookedNight.objects.filter(day=START).delete()
+        assert ReportService.count_mismatched_nights() == 1
+
+        assert ReportService.rebuild_booked_nights() == 4
+        assert ReportService.count_mismatched_nights() == 0
+
+
+class TestReportService:
+    """Тесты отчётов ReportService."""
+
+    @pytest.fixture
+    def rooms(self):
+        cheap = Room.objects.create(description="Эконом", price=1000)
+        lux = Room.objects.create(description="Люкс", price=5000)
+        empty = Room.objects.create(description="Пустой", price=3000)
+        BookingService.create_booking(cheap.id, START - timedelta(days=2), START + timedelta(days=2))
+        BookingService.create_booking(lux.id, START + timedelta(days=3), START + timedelta(days=20))
+        return cheap, lux, empty
+
+    @pytest.mark.django_db
+    def test_by_room(self, rooms, django_assert_num_queries):
+        """Тест: отчёт по номерам одним запросом, ночи вне периода не учитываются."""
+        cheap, lux, empty = rooms
+
+        with django_assert_num_queries(1):
+            report = ReportService.get_occupancy_by_room(START, START + timedelta(days=10))
+
+        assert report.results == [
+            {"room_id": cheap.id, "nights": 2, "occupancy": 0.2, "revenue": Decimal("2000.00")},
+            {"room_id": lux.id, "nights": 7, "occupancy": 0.7, "revenue": Decimal("35000.00")},
+            {"room_id": empty.id, "nights": 0, "occupancy": 0.0, "revenue": Decimal("0.00")},
+        ]
+        assert report.total == {"rooms": 3, "nights": 9, "occupancy": 0.3, "revenue": Decimal("37000.00")}
+
+    @pytest.mark.django_db
+    def test_by_room_subset(self, rooms):
+        """Тест: отчёт только по выбранным номерам."""
+        cheap, _, empty = rooms
+
+        report = ReportService.get_occupancy_by_room(START, START + timedelta(days=10), [cheap.id, empty.id])
+
+        assert [row["room_id"] for row in report.results] == [cheap.id, empty.id]
+        assert report.total["nights"] == 2
+
+    @pytest.mark.django_db
+    def test_by_day(self, rooms):
+        """Тест: отчёт по дням — все дни периода, загрузка относительно числа номеров."""
+        report = ReportService.get_occupancy_by_day(START, START + timedelta(days=4))
+
+        assert [(row["day"], row["nights"], row["occupancy"]) for row in report.results] == [
+            (START, 1, 0.3333),
+            (START + timedelta(days=1), 1, 0.3333),
+            (START + timedelta(days=2), 0, 0.0),
+            (START + timedelta(days=3), 1, 0.3333),
+        ]
+        assert report.total["revenue"] == Decimal("7000.00")
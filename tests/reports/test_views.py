@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from rest_framework import status
+
+from bookings.services import BookingService
+from rooms.models import Room
+
+START = date(2026, 3, 1)
+
+
+@pytest.fixture
+def room():
+    room = Room.objects.create(description="Номер", price=2500)
+    BookingService.create_booking(room.id, START, START + timedelta(days=3))
+    return room
+
+
+class TestOccupancyReportView:
+    """Тесты эндпоинта reports/occupancy/."""
+
+    @pytest.mark.django_db
+    def test_by_room(self, client, room):
+        """Тест отчёта по номерам."""
+        response = client.get(reverse("report-occupancy"), {"date_start": "2026-03-01", "date_end": "2026-03-11"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "date_start": "2026-03-01",
+            "date_end": "2026-03-11",
+            "days": 10,
+            "total": {"rooms": 1, "nights": 3, "occupancy": 0.3, "revenue": "7500.00"},
+            "results": [{"room_id": room.id, "nights": 3, "occupancy": 0.3, "revenue": "7500.00"}],
+        }
+
+    @pytest.mark.django_db
+    def test_by_day(self, client, room):
+        """Тест отчёта по дням для выбранных номеров."""
+        response = client.get(
+            reverse("report-occupancy"),
+            {"date_start": "2026-03-02", "date_end": "2026-03-05", "room_ids": f"{room.id}", "group_by": "day"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["results"] == [
+            {"day": "2026-03-02", "nights": 1, "occupancy": 1.0, "revenue": "2500.00"},
+            {"day": "2026-03-03", "nights": 1, "occupancy": 1.0, "revenue": "2500.00"},
+            {"day": "2026-03-04", "nights": 0, "occupancy": 0.0, "revenue": "0.00"},
+        ]
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"date_start": "2026-03-05", "date_end": "2026-03-01"},
+            {"date_start": "2026-03-01"},
+            {"date_start": "2026-03-01", "date_end": "2026-03-05", "room_ids": "1,a"},
+            {"date_start": "2026-03-01", "date_end": "2026-03-05", "group_by": "week"},
+            {"date_start": "2010-01-01", "date_end": "2026-03-05"},
+        ],
+    )
+    def test_invalid_params(self, client, params):
+        """Тест: некорректные параметры — 400."""
+        response = client.get(reverse("report-occupancy"), params)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestOccupancyReportCommand:
+    """Тесты команды occupancy_report."""
+
+    @pytest.mark.django_db
+    def test_report_csv(self, room, capsys):
+        """Тест: отчёт выводится CSV с итоговой строкой."""
+        call_command("occupancy_report", "--date-start", "2026-03-01", "--date-end", "2026-03-11")
+
+        lines = capsys.readouterr().out.splitlines()
+        assert lines == ["room_id,nights,occupancy,revenue", f"{room.id},3,0.3,7500.00", "total,3,0.3,7500.00"]
+
+    @pytest.mark.django_db
+    def test_rebuild_and_check(self, room, capsys):
+        """Тест: пересчёт и сверка агрегатов без отчёта."""
+        call_command("occupancy_report", "--rebuild", "--check")
+
+        assert "занятых ночей: 3" in capsys.readouterr().err
+
+    @pytest.mark.django_db
+    def test_period_required(self):
+        """Тест: без периода и без --rebuild/--check — ошибка."""
+        with pytest.raises(CommandError):
+            call_command("occupancy_report")
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory
+from rest_framework import status
+
+from rooms import async_views
+from rooms import cache as rooms_cache
+from rooms.models import Room
+
+
+def call(view, request, *args):
+    """Вызов async-view из синхронного теста (запросы идут в той же транзакции теста)."""
+    return async_to_sync(view)(request, *args)
+
+
+class TestRoomAsyncViews:
+    """Тесты для async-версий views приложения rooms."""
+
+    factory = AsyncRequestFactory()
+
+    @pytest.mark.django_db
+    def test_create_room(self):
+        """Тест создания номера."""
+        request = self.factory.post(
+            "/rooms/create/", {"description": "Номер", "price": "2500.00"}, content_type="application/json"
+        )
+
+        response = call(async_views.create_room, request)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Room.objects.filter(id=json.loads(response.content)["room_id"]).exists()
+
+    @pytest.mark.django_db
+    def test_create_room_invalidates_cache_on_commit(self, django_capture_on_commit_callbacks):
+        """Тест: с Idempotency-Key версия кэша номеров меняется только после фиксации транзакции."""
+        version = rooms_cache.get_version()
+        request = self.factory.post(
+            "/rooms/create/",
+            {"description": "Номер", "price": "2500.00"},
+            content_type="application/json",
+            headers={"Idempotency-Key": "k"},
+        )
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            response = call(async_views.create_room, request)
+            assert rooms_cache.get_version() == version
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert callbacks
+        assert rooms_cache.get_version() != version
+
+    @pytest.mark.django_db
+    def test_create_room_form(self):
+        """Тест: form-data принимается, как у синхронной view на том же URL."""
+        request = self.factory.post("/rooms/create/", {"description": "Номер", "price": "2500.00"})
+
+        response = call(async_views.create_room, request)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Room.objects.get(id=json.loads(response.content)["room_id"]).description == "Номер"
+
+    @pytest.mark.django_db
+    def test_create_room_unparsable_body(self):
+        """Тест: некорректный JSON — 400, неподдерживаемый Content-Type — 415."""
+        request = self.factory.post("/rooms/create/", "{", content_type="application/json")
+        response = call(async_views.create_room, request)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert json.loads(response.content)["detail"].startswith("JSON parse error")
+
+        request = self.factory.post("/rooms/create/", "description", content_type="text/plain")
+        assert call(async_views.create_room, request).status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+    @pytest.mark.django_db
+    def test_create_room_invalid(self):
+        """Тест ошибок валидации и неразрешённого метода."""
+        request = self.factory.post(
+            "/rooms/create/", {"description": "Номер", "price": "-1"}, content_type="application/json"
+        )
+
+        response = call(async_views.create_room, request)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "price" in json.loads(response.content)
+        assert call(async_views.create_room, self.factory.get("/rooms/create/")).status_code == 405
+
+    @pytest.mark.django_db
+    def test_delete_room(self):
+        """Тест удаления номера."""
+        room = Room.objects.create(description="Номер", price=2500.00)
+
+        response = call(async_views.delete_room, self.factory.delete(f"/rooms/delete/{room.id}/"), room.id)
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not Room.objects.exists()
+        assert call(async_views.delete_room, self.factory.delete("/rooms/delete/1/"), room.id).status_code == 404
+
+    @pytest.mark.django_db
+    def test_list_rooms_matches_sync_view(self, client):
+        """Тест: ответы списка совпадают с синхронной версией, включая страницы, ETag и поток."""
+        for price in [3000, 1000, 2000]:
+            Room.objects.create(description=f"Номер за {price}", price=price)
+
+        for params in [{}, {"sort_by": "price_asc"}, {"sort_by": "price_asc", "limit": 2}]:
+            response = call(async_views.list_rooms, self.factory.get("/rooms/list/", params))
+
+            assert response.content == client.get("/rooms/list/", params).content
+
+        etag = response["ETag"]
+        request = self.factory.get("/rooms/list/", params, headers={"If-None-Match": etag})
+        assert call(async_views.list_rooms, request).status_code == status.HTTP_304_NOT_MODIFIED
+
+        response = call(async_views.list_rooms, self.factory.get("/rooms/list/", {"stream": "ndjson"}))
+
+        async def consume():
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        assert len(async_to_sync(consume)().splitlines()) == 3
+
+    @pytest.mark.django_db
+    def test_list_available_rooms(self):
+        """Тест поиска свободных номеров."""
+        room = Room.objects.create(description="Номер", price=2500.00)
+        request = self.factory.get("/rooms/available/", {"date_start": "2025-01-01", "date_end": "2025-01-03"})
+
+        response = call(async_views.list_available_rooms, request)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["id"] for item in json.loads(response.content)["results"]] == [room.id]
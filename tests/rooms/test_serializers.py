@@ -1,4 +1,9 @@
-from rooms.serializers import RoomCreateSerializer
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import json_dumps
+from rooms.models import Room
+from rooms.serializers import RoomCreateSerializer, RoomFastSerializer, RoomSerializer
 
 
 class TestRoomSerializer:
@@ -35,3 +40,15 @@ class TestRoomSerializer:
         assert not serializer.is_valid()
         assert "description" in serializer.errors
         assert "price" in serializer.errors
+
+    @pytest.mark.django_db
+    def test_room_fast_serializer_matches_model_serializer(self):
+        """Тест: быстрый сериализатор выдаёт тот же JSON, что RoomSerializer."""
+        Room.objects.create(description="Номер с «кавычками» и юникодом ✓", price="1234.50")
+        Room.objects.create(description="Дешевый", price=1)
+        rooms = Room.objects.order_by("id")
+
+        expected = JSONRenderer().render(RoomSerializer(rooms, many=True).data)
+
+        assert json_dumps(RoomFastSerializer.serialize(rooms)) == expected
+        assert json_dumps(RoomFastSerializer.serialize_objects(list(rooms))) == expected
@@ -1,6 +1,17 @@
+import io
+import random
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+
 import pytest
+from django.core.management import call_command
+from django.db import connection
 
+from bookings.models import Booking
+from rooms import transfer
 from rooms.models import Room
+from rooms.prices import PRICE_PERCENTILES
 from rooms.services import RoomService
 
 
@@ -32,6 +43,22 @@ class TestRoomService:
         # Проверяем, что номер удален из БД
         assert not Room.objects.filter(id=room.id).exists()
 
+    @pytest.mark.django_db
+    def test_delete_room_with_bookings_single_query(self, django_assert_num_queries):
+        """Тест: номер и его брони удаляются одним запросом, несуществующий номер — DoesNotExist."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+        other = Room.objects.create(description="Другой номер", price=3500.00)
+        for r in (room, other):
+            Booking.objects.create(room=r, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+
+        with django_assert_num_queries(1):
+            RoomService.delete_room(room.id)
+
+        assert not Booking.objects.filter(room_id=room.id).exists()
+        assert Booking.objects.filter(room=other).count() == 1
+        with pytest.raises(Room.DoesNotExist):
+            RoomService.delete_room(room.id)
+
     @pytest.mark.django_db
     def test_get_rooms_default_sorting(self):
         """Тест получения номеров с сортировкой по умолчанию."""
@@ -66,3 +93,197 @@ class TestRoomService:
 
         assert rooms[0] == room2  # Дорогой первый
         assert rooms[1] == room1  # Дешевый второй
+
+    @pytest.mark.django_db
+    def test_get_available_rooms(self):
+        """Тест поиска номеров, свободных на период."""
+        today = date.today()
+        busy = Room.objects.create(description="Занят", price=1000.00)
+        free = Room.objects.create(description="Свободен", price=2000.00)
+        checkout = Room.objects.create(description="Выезд в день заезда", price=3000.00)
+        Booking.objects.create(room=busy, date_start=today + timedelta(days=1), date_end=today + timedelta(days=4))
+        Booking.objects.create(room=checkout, date_start=today, date_end=today + timedelta(days=2))
+        Booking.objects.create(room=free, date_start=today + timedelta(days=10), date_end=today + timedelta(days=12))
+
+        rooms = RoomService.get_available_rooms_queryset(today + timedelta(days=2), today + timedelta(days=5))
+
+        assert set(rooms) == {free, checkout}
+
+    @pytest.mark.django_db
+    def test_get_available_rooms_price_filter_and_sorting(self):
+        """Тест поиска свободных номеров с фильтром по цене и сортировкой."""
+        Room.objects.create(description="Дешевый", price=500.00)
+        mid = Room.objects.create(description="Средний", price=1500.00)
+        high = Room.objects.create(description="Дорогой", price=2500.00)
+        Room.objects.create(description="Люкс", price=9000.00)
+
+        page = RoomService.get_available_rooms_page(
+            date.today(), date.today() + timedelta(days=1), price_min=1000, price_max=3000, sort_by="price_desc"
+        )
+
+        assert page.items == [high, mid]
+        assert page.next_cursor is None
+
+    @pytest.mark.django_db
+    def test_get_price_stats(self):
+        """Тест статистики цен: min/max/среднее, перцентили и гистограмма."""
+        for price in (100, 200, 300, 400, 1000):
+            Room.objects.create(description=f"Номер {price}", price=price)
+
+        stats = RoomService.get_price_stats(buckets=3)
+
+        assert stats["count"] == 5
+        assert stats["min"] == Decimal("100.00")
+        assert stats["max"] == Decimal("1000.00")
+        assert stats["avg"] == Decimal("400.00")
+        assert stats["percentiles"]["p50"] == Decimal("300.00")
+        assert stats["percentiles"]["p25"] == Decimal("200.00")
+        assert stats["percentiles"]["p90"] == Decimal("760.00")
+        # Столбцы по 300: максимальная цена попадает в последний
+        assert stats["histogram"] == [
+            {"price_from": Decimal("100.00"), "price_to": Decimal("400.00"), "count": 3},
+            {"price_from": Decimal("400.00"), "price_to": Decimal("700.00"), "count": 1},
+            {"price_from": Decimal("700.00"), "price_to": Decimal("1000.00"), "count": 1},
+        ]
+
+    @pytest.mark.django_db
+    def test_get_price_stats_available_rooms(self):
+        """Тест статистики цен только по номерам, свободным на период."""
+        today = date.today()
+        busy = Room.objects.create(description="Занят", price=1000.00)
+        Room.objects.create(description="Свободен", price=2000.00)
+        Booking.objects.create(room=busy, date_start=today, date_end=today + timedelta(days=3))
+
+        stats = RoomService.get_price_stats(today + timedelta(days=1), today + timedelta(days=2), buckets=2)
+
+        assert stats["count"] == 1
+        assert stats["min"] == stats["max"] == Decimal("2000.00")
+        assert stats["percentiles"]["p99"] == Decimal("2000.00")
+        assert [bucket["count"] for bucket in stats["histogram"]] == [1, 0]
+
+    @pytest.mark.django_db
+    def test_get_price_stats_empty(self):
+        """Тест статистики цен без номеров."""
+        stats = RoomService.get_price_stats()
+
+        assert stats["count"] == 0
+        assert stats["min"] is None
+        assert stats["percentiles"]["p50"] is None
+        assert stats["histogram"] == []
+
+    @pytest.mark.django_db
+    def test_get_price_stats_cached_prices(self, django_assert_num_queries):
+        """Тест: массив цен кэшируется, для периода читаются только занятые номера."""
+        today = date.today()
+        busy = Room.objects.create(description="Занят", price=1000.00)
+        Room.objects.create(description="Свободен", price=1000.00)
+        Booking.objects.create(room=busy, date_start=today, date_end=today + timedelta(days=3))
+        RoomService.get_price_stats()
+
+        with django_assert_num_queries(0):
+            assert RoomService.get_price_stats()["count"] == 2
+        with django_assert_num_queries(1):
+            assert RoomService.get_price_stats(today, today + timedelta(days=1))["count"] == 1
+
+    @pytest.mark.django_db
+    def test_get_price_stats_matches_sql(self):
+        """Тест: перцентили и столбцы совпадают с percentile_cont и width_bucket PostgreSQL."""
+        rng = random.Random(7)
+        Room.objects.bulk_create(
+            Room(description="Номер", price=Decimal(rng.randint(100_00, 500_00)) / 100) for _ in range(500)
+        )
+        buckets = 7
+
+        stats = RoomService.get_price_stats(buckets=buckets)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT percentile_cont(%s::numeric[]) WITHIN GROUP (ORDER BY price)
+                FROM {Room._meta.db_table}
+                """,
+                [[Decimal(p) / 100 for p in PRICE_PERCENTILES]],
+            )
+            (percentiles,) = cursor.fetchone()
+            cursor.execute(
+                f"""
+                SELECT least(width_bucket(price, min(price) OVER (), max(price) OVER (), %s), %s) AS bucket
+                FROM {Room._meta.db_table}
+                """,
+                [buckets, buckets],
+            )
+            counts = Counter(bucket for (bucket,) in cursor.fetchall())
+
+        assert stats["percentiles"] == {
+            f"p{p}": Decimal(value).quantize(Decimal("0.01"))
+            for p, value in zip(PRICE_PERCENTILES, percentiles, strict=False)
+        }
+        assert [bucket["count"] for bucket in stats["histogram"]] == [counts[i] for i in range(1, buckets + 1)]
+
+    @pytest.mark.django_db
+    def test_import_rooms_csv(self):
+        """Тест импорта номеров из CSV пачками."""
+        lines = ["description,price\n"] + [f"Номер {i},{1000 + i}.50\n" for i in range(25)]
+
+        result = RoomService.import_rooms(transfer.read_rows(lines, "csv"), batch_size=10)
+
+        assert result.created == 25
+        assert result.failed == 0
+        assert Room.objects.get(description="Номер 3").price == Decimal("1003.50")
+
+    @pytest.mark.django_db
+    def test_import_rooms_ndjson_atomic(self):
+        """Тест: в режиме atomic невалидная строка (в т.ч. не JSON) отменяет весь импорт."""
+        lines = ['{"description": "Номер", "price": "1500"}\n'] * 5 + [
+            '{"description": "Бесплатный", "price": "0"}\n',
+            "не json\n",
+        ]
+
+        result = RoomService.import_rooms(transfer.read_rows(lines, "ndjson"), atomic=True, batch_size=2)
+
+        assert result.created == 0
+        assert result.failed == 2
+        assert result.errors[0]["row"] == 6
+        assert "price" in result.errors[0]["errors"]  # validate_price
+        assert not Room.objects.exists()
+
+    @pytest.mark.django_db
+    def test_import_rooms_best_effort(self):
+        """Тест: в режиме best_effort записываются все корректные строки."""
+        lines = ["description,price\n", "Номер 1,1500\n", "Номер 2,-1\n", "Номер 3,abc\n", "Номер 4,2500\n"]
+
+        result = RoomService.import_rooms(transfer.read_rows(lines, "csv"), atomic=False)
+
+        assert result.created == 2
+        assert [error["row"] for error in result.errors] == [2, 3]
+        assert Room.objects.count() == 2
+
+    @pytest.mark.django_db
+    def test_export_rooms_csv_roundtrip(self):
+        """Тест: выгрузка CSV порциями содержит все номера и загружается обратно."""
+        for i in range(5):
+            Room.objects.create(description=f'Номер "{i}",\nс переносом', price=1000 + i)
+
+        chunks = list(transfer.export_csv(chunk_size=2))
+        body = b"".join(chunks).decode()
+
+        assert len(chunks) == 3
+        assert body.startswith("id,description,price,created_at\n")
+
+        Room.objects.all().delete()
+        result = RoomService.import_rooms(transfer.read_rows(io.StringIO(body), "csv"))
+
+        assert result.created == 5
+        assert set(Room.objects.values_list("description", flat=True)) == {
+            f'Номер "{i}",\nс переносом' for i in range(5)
+        }
+
+    @pytest.mark.django_db
+    def test_import_rooms_command(self, tmp_path):
+        """Тест команды manage.py import_rooms."""
+        path = tmp_path / "rooms.ndjson"
+        path.write_text('{"description": "Номер", "price": 1500}\n' * 3, encoding="utf-8")
+
+        call_command("import_rooms", str(path), stdout=io.StringIO())
+
+        assert Room.objects.count() == 3
@@ -1,7 +1,12 @@
+import json
+from datetime import date, timedelta
+
 import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 from rest_framework import status
 
+from bookings.models import Booking
 from rooms.models import Room
 
 
@@ -82,3 +87,338 @@ class TestRoomViews:
         # Проверяем сортировку по возрастанию цены
         assert response.data[0]["price"] == "1000.00"
         assert response.data[1]["price"] == "5000.00"
+
+    @pytest.mark.django_db
+    def test_list_rooms_paginated(self, client):
+        """Тест постраничного получения списка номеров."""
+        for price in [3000.00, 1000.00, 2000.00]:
+            Room.objects.create(description="Номер", price=price)
+
+        url = reverse("room-list")
+        response = client.get(url, {"sort_by": "price_asc", "limit": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [room["price"] for room in response.data["results"]] == ["1000.00", "2000.00"]
+        assert response.data["next"] is not None
+
+        response = client.get(url, {"sort_by": "price_asc", "limit": 2, "cursor": response.data["next"]})
+
+        assert [room["price"] for room in response.data["results"]] == ["3000.00"]
+        assert response.data["next"] is None
+
+    @pytest.mark.django_db
+    def test_list_rooms_invalid_cursor(self, client):
+        """Тест получения списка номеров с некорректным курсором."""
+        url = reverse("room-list")
+        response = client.get(url, {"cursor": "broken"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "error" in response.data
+
+    @pytest.mark.django_db
+    def test_list_rooms_stream(self, client):
+        """Тест потоковой выдачи списка номеров (JSON-массив)."""
+        Room.objects.create(description="Дорогой", price=5000.00)
+        Room.objects.create(description="Дешевый", price=1000.00)
+
+        url = reverse("room-list")
+        response = client.get(url, {"sort_by": "price_asc", "stream": "1"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "application/json"
+        # Содержимое совпадает с обычным ответом
+        assert json.loads(b"".join(response.streaming_content)) == client.get(url, {"sort_by": "price_asc"}).json()
+
+    @pytest.mark.django_db
+    def test_list_rooms_stream_ndjson(self, client):
+        """Тест потоковой выдачи списка номеров в формате NDJSON."""
+        Room.objects.create(description="Первый номер", price=1000.00)
+        Room.objects.create(description="Второй номер", price=2000.00)
+
+        response = client.get(reverse("room-list"), {"stream": "ndjson"})
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert [json.loads(line)["description"] for line in lines] == ["Второй номер", "Первый номер"]
+
+    @pytest.mark.django_db
+    def test_list_rooms_stream_invalid_format(self, client):
+        """Тест потоковой выдачи с неизвестным форматом."""
+        response = client.get(reverse("room-list"), {"stream": "xml"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "error" in response.data
+
+    @pytest.mark.django_db
+    def test_list_available_rooms(self, client):
+        """Тест поиска свободных номеров."""
+        busy = Room.objects.create(description="Занят", price=1000.00)
+        free = Room.objects.create(description="Свободен", price=2000.00)
+        Booking.objects.create(room=busy, date_start=date.today(), date_end=date.today() + timedelta(days=3))
+
+        url = reverse("room-available")
+        params = {"date_start": date.today().isoformat(), "date_end": (date.today() + timedelta(days=2)).isoformat()}
+        response = client.get(url, {**params, "sort_by": "price_asc", "limit": 10})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [room["id"] for room in response.data["results"]] == [free.id]
+        assert response.data["next"] is None
+
+    @pytest.mark.django_db
+    def test_list_available_rooms_invalid_params(self, client):
+        """Тест поиска свободных номеров с некорректными параметрами."""
+        url = reverse("room-available")
+
+        response = client.get(url, {"date_start": date.today().isoformat()})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "date_end" in response.data
+
+        response = client.get(url, {"date_start": "2025-01-05", "date_end": "2025-01-01"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "non_field_errors" in response.data
+
+    @pytest.mark.django_db
+    def test_list_rooms_cached(self, client, django_assert_num_queries):
+        """Тест: повторный запрос списка отдаётся из кэша без запросов к БД."""
+        Room.objects.create(description="Первый номер", price=1000.00)
+        url = reverse("room-list")
+
+        first = client.get(url, {"sort_by": "price_asc"})
+        with django_assert_num_queries(0):
+            second = client.get(url, {"sort_by": "price_asc"})
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.content == first.content
+        assert second["ETag"] == first["ETag"]
+
+    @pytest.mark.django_db
+    def test_list_rooms_not_modified(self, client, django_assert_num_queries):
+        """Тест: при совпадении If-None-Match возвращается 304."""
+        Room.objects.create(description="Первый номер", price=1000.00)
+        url = reverse("room-list")
+        etag = client.get(url)["ETag"]
+
+        with django_assert_num_queries(0):
+            response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert response.content == b""
+
+    @pytest.mark.django_db
+    def test_list_rooms_cache_invalidated(self, client, django_capture_on_commit_callbacks):
+        """Тест: создание и удаление номера сбрасывают кэш списка."""
+        url = reverse("room-list")
+        etag = client.get(url)["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            room_id = client.post(
+                reverse("room-create"), {"description": "Новый", "price": 1000}, content_type="application/json"
+            ).data["room_id"]
+
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert [room["id"] for room in response.json()] == [room_id]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.delete(reverse("room-delete", args=[room_id]))
+
+        assert client.get(url).json() == []
+
+    @pytest.mark.django_db
+    def test_list_rooms_cache_disabled(self, client, settings):
+        """Тест: с отключённым кэшем (несколько воркеров без CACHE_URL) список всегда читается из БД, без ETag."""
+        settings.ROOMS_CACHE_ENABLED = False
+        url = reverse("room-list")
+        assert client.get(url).json() == []
+
+        # Номер, созданный другим воркером: его кэш этот процесс не сбросил бы
+        room = Room.objects.create(description="Новый", price=1000.00)
+        response = client.get(url, headers={"If-None-Match": '"stale"'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["id"] for item in response.json()] == [room.id]
+        assert "ETag" not in response
+
+    @pytest.mark.django_db
+    def test_room_stats(self, client):
+        """Тест статистики цен номеров."""
+        Room.objects.create(description="Первый номер", price=1000.00)
+        Room.objects.create(description="Второй номер", price=3000.00)
+
+        response = client.get(reverse("room-stats"), {"buckets": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["count"] == 2
+        assert data["min"] == "1000.00"
+        assert data["max"] == "3000.00"
+        assert data["avg"] == "2000.00"
+        assert data["percentiles"]["p50"] == "2000.00"
+        assert data["histogram"] == [
+            {"price_from": "1000.00", "price_to": "2000.00", "count": 1},
+            {"price_from": "2000.00", "price_to": "3000.00", "count": 1},
+        ]
+
+    @pytest.mark.django_db
+    def test_room_stats_invalid_params(self, client):
+        """Тест статистики цен с некорректными параметрами."""
+        url = reverse("room-stats")
+
+        response = client.get(url, {"date_start": date.today().isoformat()})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "non_field_errors" in response.data
+
+        response = client.get(url, {"buckets": 0})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "buckets" in response.data
+
+    @pytest.mark.django_db
+    def test_room_stats_cache_invalidated(self, client, django_assert_num_queries, django_capture_on_commit_callbacks):
+        """Тест: статистика кэшируется и сбрасывается при изменении номеров и броней."""
+        room = Room.objects.create(description="Номер", price=1000.00)
+        url = reverse("room-stats")
+        today = date.today()
+        period = {"date_start": today.isoformat(), "date_end": (today + timedelta(days=2)).isoformat()}
+
+        assert client.get(url).json()["count"] == 1
+        assert client.get(url, period).json()["count"] == 1
+        with django_assert_num_queries(0):
+            assert client.get(url).json()["count"] == 1
+            assert client.get(url, period).json()["count"] == 1
+
+        # Бронь сбрасывает только статистику по свободным номерам
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(
+                reverse("booking-create"),
+                {"room": room.id, "date_start": period["date_start"], "date_end": period["date_end"]},
+                content_type="application/json",
+            )
+        assert client.get(url, period).json()["count"] == 0
+        with django_assert_num_queries(0):
+            assert client.get(url).json()["count"] == 1
+
+        # Бронь в других месяцах статистику периода не сбрасывает
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(
+                reverse("booking-create"),
+                {
+                    "room": room.id,
+                    "date_start": (today + timedelta(days=100)).isoformat(),
+                    "date_end": (today + timedelta(days=101)).isoformat(),
+                },
+                content_type="application/json",
+            )
+        with django_assert_num_queries(0):
+            assert client.get(url, period).json()["count"] == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(
+                reverse("room-create"), {"description": "Новый", "price": 2000}, content_type="application/json"
+            )
+        assert client.get(url).json()["count"] == 2
+        assert client.get(url, period).json()["count"] == 1
+
+    @pytest.mark.django_db
+    def test_import_rooms(self, client):
+        """Тест импорта номеров из загруженного CSV."""
+        upload = SimpleUploadedFile("rooms.csv", "description,price\nНомер 1,1500\nНомер 2,2500\n".encode())
+
+        response = client.post(reverse("room-import"), {"file": upload})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["created"] == 2
+        assert Room.objects.count() == 2
+
+    @pytest.mark.django_db
+    def test_import_rooms_invalid(self, client):
+        """Тест импорта с ошибками: atomic — 400 без записи, best_effort — 207."""
+        content = '{"description": "Номер", "price": 1500}\n{"description": "Номер", "price": -5}\n'.encode()
+
+        response = client.post(
+            reverse("room-import") + "?file_format=ndjson", {"file": SimpleUploadedFile("rooms.ndjson", content)}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["errors"][0]["row"] == 2
+        assert not Room.objects.exists()
+
+        response = client.post(
+            reverse("room-import") + "?file_format=ndjson&mode=best_effort",
+            {"file": SimpleUploadedFile("rooms.ndjson", content)},
+        )
+
+        assert response.status_code == status.HTTP_207_MULTI_STATUS
+        assert Room.objects.count() == 1
+
+    @pytest.mark.django_db
+    def test_import_rooms_without_file(self, client):
+        """Тест импорта без файла."""
+        response = client.post(reverse("room-import"))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.django_db
+    def test_export_rooms(self, client):
+        """Тест потоковой выгрузки номеров в CSV и NDJSON."""
+        room = Room.objects.create(description="Тестовый номер", price=2500.00)
+
+        response = client.get(reverse("room-export"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"].startswith("text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0] == "id,description,price,created_at"
+        assert lines[1].startswith(f"{room.id},Тестовый номер,2500.00,")
+
+        response = client.get(reverse("room-export"), {"file_format": "ndjson"})
+
+        assert json.loads(b"".join(response.streaming_content))["id"] == room.id
+
+
+class TestRoomQueryBudgets:
+    """Бюджеты SQL-запросов эндпоинтов номеров."""
+
+    @pytest.mark.django_db
+    def test_create_room(self, client, django_assert_num_queries):
+        """Тест: создание номера — один INSERT."""
+        with django_assert_num_queries(1):
+            response = client.post(
+                reverse("room-create"), {"description": "Номер", "price": "2500.00"}, content_type="application/json"
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    @pytest.mark.django_db
+    def test_delete_room(self, client, django_assert_num_queries):
+        """Тест: номер с бронями удаляется одним запросом, 404 — тоже один запрос."""
+        room = Room.objects.create(description="Номер", price=2500.00)
+        Booking.objects.create(room=room, date_start=date.today(), date_end=date.today() + timedelta(days=2))
+
+        with django_assert_num_queries(1):
+            assert client.delete(reverse("room-delete", args=[room.id])).status_code == 204
+        with django_assert_num_queries(1):
+            assert client.delete(reverse("room-delete", args=[room.id])).status_code == 404
+        assert not Booking.objects.exists()
+
+    @pytest.mark.django_db
+    def test_list_rooms(self, client, django_assert_num_queries):
+        """Тест: список номеров — один запрос, страница — один запрос, из кэша — ни одного."""
+        Room.objects.create(description="Номер", price=2500.00)
+
+        with django_assert_num_queries(1):
+            client.get(reverse("room-list"))
+        with django_assert_num_queries(0):
+            client.get(reverse("room-list"))
+        with django_assert_num_queries(1):
+            client.get(reverse("room-list"), {"limit": 10})
+
+    @pytest.mark.django_db
+    def test_list_available_rooms(self, client, django_assert_num_queries):
+        """Тест: поиск свободных номеров — один запрос (NOT EXISTS в том же SELECT)."""
+        Room.objects.create(description="Номер", price=2500.00)
+        params = {"date_start": date.today().isoformat(), "date_end": (date.today() + timedelta(days=2)).isoformat()}
+
+        with django_assert_num_queries(1):
+            assert client.get(reverse("room-available"), params).status_code == 200